@@ -1,49 +1,42 @@
 import os
 import csv
 import sys
+import json
+import time
+import hashlib
+import queue
+import logging
+import argparse
+import threading
 
 # Get the parent directory, add it to python path and import the modules
 parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(parent_dir)
+sys.path.append(os.path.join(parent_dir, "Certificate_Generator"))
+sys.path.append(os.path.join(parent_dir, "Email_Sender"))
 
-from Utilities.utils import check_body_template, check_csv, check_gmail_app_password, clean_csv_fieldnames, get_files, get_single_file, initialize_necessary_files, load_config, sort_csv
+from certificate_generator import CERTIFICATE_LAYOUTS, certificate_values, check_layout_fit, field_values, finish_output_bundle, generate_certificates, get_output_folder_path, issue_certificate, layout_columns, layout_problems, open_output_bundle, open_template_cache, prompt_certificate_layout, prompt_name_case, register_font, save_template_cache
+from send_email import SMTPSessionError, close_smtp_session, open_smtp_session, send_bulk_emails, send_email
+
+from Utilities.dedupe import normalize_email
+from Utilities.attendance import get_attendance_rules, iter_attended_rows, JOIN_KEYS, load_checkins
+from Utilities.bundle import add_bundle_arguments, bundle_options_from_args
+from Utilities.certificate_categories import CATEGORY_COLUMN, check_categories, get_certificate_routes, normalize_category
+from Utilities.certificate_index import DEFAULT_CERTIFICATE_INDEX_PATH, assign_certificate_id, certificate_row_key, open_certificate_index
+from Utilities.output_layout import add_output_layout_argument, is_sharded, open_output_folder
+from Utilities.recipient_index import DEFAULT_INDEX_PATH, filter_recipients, open_recipient_index, record_send, report_skipped_recipients
+from Utilities.structured_log import log_fields, start_structured_logging
+from Utilities.profiling import add_profile_arguments, profile_stage, start_profiling_from_args
+from Utilities.progress import finish_progress, progress_print, start_progress, update_progress
+from Utilities.utils import check_attachments, check_attendance, check_body_template, check_csv, check_gmail_app_password, clean_csv_fieldnames, get_files, get_single_file, get_spreadsheet_file, initialize_necessary_files, load_config, read_email_body_template, read_wordlist, select_font, sort_csv
 
 
 ## ===========================================================================
 ### Functions
 
-# Function to check active participants or valid attendance
-def check_attendance(csv_file_path):
-    """
-    Function to check active participants or valid attendance
-
-    Args:
-        csv_file_path (str): Path to the CSV file containing participant data.
-
-    Returns:
-        None
-
-    Exits:
-        Exits the program if no participant is marked 'Present' (i.e., "TRUE")
-        under the 'Attendance' column.
-    """
-    attendance_data = []
-
-    with open(csv_file_path, mode='r', newline='', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            attendance_data.append(row["Attendance"])
-
-    attendance_data = [item.strip().upper() for item in attendance_data]
-
-    if "TRUE" not in attendance_data:
-        print("\nError: No Active participants found in Spreadsheet\nNo participant is marked 'Present' under 'Attendance' column.\n\nExiting...\n")
-        exit(1)
-
-
 ## --------------------------------------------------------------------------
 # Functiont to extract spreadsheet and write necessary columns to wordlist and csv file
-def extract_spreadsheet(spreadsheet_file_path, tosend_csv_path, wordlist_file_path):
+def extract_spreadsheet(spreadsheet_file_path, tosend_csv_path, wordlist_file_path, event_name=None, recipient_index_path=DEFAULT_INDEX_PATH, checkin_file_paths=None, attendance_rules=None, certificate_index_path=DEFAULT_CERTIFICATE_INDEX_PATH, routes=None, field_columns=None):
     """
     Extracts specific columns from a spreadsheet file and creates a filtered CSV file
     and a wordlist text file for further processing.
@@ -51,13 +44,28 @@ def extract_spreadsheet(spreadsheet_file_path, tosend_csv_path, wordlist_file_pa
     Args:
         spreadsheet_file_path (str): Path to the input spreadsheet CSV file.
                                      The file must have "Full Name", "Email", and "Attendance" columns.
-        tosend_csv_path (str): Path to save the output CSV file containing "Full Name" and "Email" columns.
+        tosend_csv_path (str): Path to save the output CSV file containing "Full Name", "Email" and "Certificate ID" columns.
         wordlist_file_path (str): Path to save the text file containing "Full Name" entries.
+        event_name (str, optional): Event name used to skip attendees who already received this certificate.
+        recipient_index_path (str, optional): Path to the recipient index database.
+        checkin_file_paths (list, optional): Check-in logs to compute attendance from instead of the "Attendance" column.
+        attendance_rules (dict, optional): Join key and minimum sessions, see `Utilities.attendance.get_attendance_rules`.
+        certificate_index_path (str, optional): Path to the certificate index database.
+        routes (dict, optional): The configured certificate categories; when given, the
+                                 "Category" of each attendee is extracted as well.
+        field_columns (list, optional): Columns printed by the certificate layout fields (see
+                                        `certificate_generator.layout_columns`), extracted as well.
 
     Workflow:
         - Reads the spreadsheet file.
-        - Filters rows where the "Attendance" column is marked as "TRUE" (case-insensitive).
-        - Extracts "Full Name" and "Email" columns and writes them to the output CSV file.
+        - Filters rows where the "Attendance" column is marked as "TRUE" (case-insensitive),
+          or, when check-in logs are given, hash-joins the rows with the logs and keeps
+          those meeting the attendance rules.
+        - Drops attendees on the suppression list or already sent this event's certificate.
+        - Extracts "Full Name" and "Email" columns and writes them to the output CSV file,
+          with the certificate ID of each attendee (derived from the event and the email)
+          and, with certificate categories, the category of each attendee, followed by the
+          columns printed on the certificates.
         - Writes "Full Name" values to the wordlist text file.
 
     Raises:
@@ -74,26 +82,490 @@ def extract_spreadsheet(spreadsheet_file_path, tosend_csv_path, wordlist_file_pa
     # Process the file
     with open(spreadsheet_file_path, mode='r', encoding="utf-8") as sheet_csv_file:
         reader = csv.DictReader(sheet_csv_file)
-        try:
-            # Create and write to 'tosend.csv'
-            with open(tosend_csv_path, mode='w', newline='') as tosend_csv_file:
-                csv_writer = csv.writer(tosend_csv_file)
-                csv_writer.writerow(['Full Name', 'Email'])  # Write header row
-
-                # Create and write to 'wordlist.txt'
-                with open(wordlist_file_path, mode='w') as wordlist_file:
-                    for row in reader:
-                        if row['Attendance'].strip().upper() == 'TRUE':  # Check Attendance
-                            full_name = row['Full Name'].strip().title()
-                            csv_writer.writerow([full_name, row['Email'].strip()])
-                            wordlist_file.write(f"{full_name}\n")
-                    print("\n\'Full Name\' column successfully written to 'Wordlist\\wordlist.txt' file.")
-
-                print("\'Full Name\' and \'Email\' columns successfully extracted to \'tosend.csv\' file.")
-        except PermissionError:
-            print("\nFailed to write to \"tosend.csv\" file.\nEnsure that the file is not open on the system.\n")
+        if checkin_file_paths:
+            registration_column = JOIN_KEYS[attendance_rules["join_key"]][0]
+            if registration_column not in (reader.fieldnames or []):
+                print(f"\nError: The '{registration_column}' column is required to match the check-in logs.\n\nExiting...\n")
+                sys.exit(1)
+            checkin_sessions = load_checkins(checkin_file_paths, attendance_rules["join_key"])
+            attendees = list(iter_attended_rows(reader, checkin_sessions, attendance_rules))
+            if not attendees:
+                print(f"\nError: No registered participant attended at least {attendance_rules['min_sessions']} session(s) in the check-in logs.\n\nExiting...\n")
+                sys.exit(1)
+            print(f"\n{len(attendees)} attendee(s) matched with the check-in logs.")
+        else:
+            attendees = [row for row in reader if row['Attendance'].strip().upper() == 'TRUE']  # Check Attendance
+        fixed_columns = ['Full Name', 'Email', 'Certificate ID', CATEGORY_COLUMN]
+        field_columns = [column for column in field_columns or [] if column in reader.fieldnames and column not in fixed_columns]
+
+    # Single batched lookup against the recipient index
+    attendees, skipped = filter_recipients(attendees, recipient_index_path, event_name)
+    report_skipped_recipients(skipped)
+    if not attendees:
+        print("\nAll attendees have already received this certificate or are suppressed.\nNothing to send.\n\nExiting...\n")
+        sys.exit(0)
+
+    if routes:
+        uncategorized = [row['Full Name'].strip() for row in attendees if not normalize_category(row.get(CATEGORY_COLUMN))]
+        if uncategorized:
+            print(f"\nError: {len(uncategorized)} attendee(s) have no '{CATEGORY_COLUMN}': {', '.join(uncategorized[:5])}{', ...' if len(uncategorized) > 5 else ''}\nPlease fill in the category of every attendee.\n\nExiting...\n")
             sys.exit(1)
 
+    certificate_index = open_certificate_index(certificate_index_path)
+    try:
+        # Create and write to 'tosend.csv'
+        with open(tosend_csv_path, mode='w', newline='', encoding='utf-8') as tosend_csv_file:
+            csv_writer = csv.writer(tosend_csv_file)
+            csv_writer.writerow(['Full Name', 'Email', 'Certificate ID'] + ([CATEGORY_COLUMN] if routes else []) + field_columns)  # Write header row
+
+            # Create and write to 'wordlist.txt'
+            with open(wordlist_file_path, mode='w', encoding='utf-8') as wordlist_file:
+                for row in attendees:
+                    full_name = row['Full Name'].strip().title()
+                    email = row['Email'].strip()
+                    cert_id = assign_certificate_id(certificate_index, event_name, certificate_row_key(full_name, email), commit=False)
+                    csv_writer.writerow([full_name, email, cert_id] + ([normalize_category(row[CATEGORY_COLUMN])] if routes else []) + [row[column].strip() for column in field_columns])
+                    wordlist_file.write(f"{full_name}\n")
+                print("\n\'Full Name\' column successfully written to 'Wordlist\\wordlist.txt' file.")
+
+            print("\'Full Name\' and \'Email\' columns successfully extracted to \'tosend.csv\' file.")
+        certificate_index.commit()
+    except PermissionError:
+        print("\nFailed to write to \"tosend.csv\" file.\nEnsure that the file is not open on the system.\n")
+        sys.exit(1)
+    finally:
+        certificate_index.close()
+
+
+## --------------------------------------------------------------------------
+# Function to render and email the certificates as a pipeline
+def certify_and_email_pipelined(tosend_csv_path, template_file_path, font_file_path, layout, name_case, output_dir_path, body_template_file, sender_email, sender_password, email_subject, event_name, render_workers=2, send_workers=2, queue_size=32, use_cache=True, recipient_index_path=DEFAULT_INDEX_PATH, certificate_index_path=DEFAULT_CERTIFICATE_INDEX_PATH, routes=None, bundle_options=None, output_layout="auto"):
+    """
+    Generates the certificates and emails them through a bounded producer/consumer pipeline.
+
+    Render workers write each certificate and put it on a bounded queue; send workers, each
+    with its own SMTP session, take certificates off the queue and email them right away.
+    Rendering and sending therefore overlap, so the total time approaches the slower of the
+    two stages instead of their sum, and the bounded queue makes the renderers wait when the
+    senders fall behind, keeping memory flat.
+
+    Args:
+        tosend_csv_path (str): Path to the extracted CSV with "Full Name" and "Email" columns.
+        template_file_path (str): Path to the certificate template PDF; unused with `routes`.
+        font_file_path (str): Path to the TTF font for the names.
+        layout (dict): Layout profile of the certificate; unused with `routes`.
+        name_case (str): "upper" or "title".
+        output_dir_path (str): Preferred output directory; a counter is appended if it exists.
+        body_template_file (str): Path to the HTML email body template.
+        sender_email (str): The sender's email address.
+        sender_password (str): The sender's Gmail App Password.
+        email_subject (str): The subject of the emails.
+        event_name (str): Event name used for re-send protection and the certificate IDs.
+        render_workers (int, optional): Number of certificate render threads.
+        send_workers (int, optional): Number of email sending threads (SMTP sessions).
+        queue_size (int, optional): Maximum number of rendered certificates waiting to be sent.
+        use_cache (bool, optional): Reuse unchanged certificates of the previous run.
+        recipient_index_path (str, optional): Path to the recipient index database.
+        certificate_index_path (str, optional): Path to the certificate index database.
+        routes (dict, optional): Template and layout of each certificate category, for a
+                                 "Category" column in the CSV; rows are rendered grouped by template.
+        bundle_options (dict, optional): Also stream the certificates into a ZIP or tar
+                                         archive as they are rendered, see `Utilities.bundle`.
+        output_layout (str, optional): "flat", "sharded", or "auto" to shard large runs.
+
+    Returns:
+        tuple: (sent, failed) counts of emails.
+
+    Raises:
+        SMTPSessionError: If a sender cannot log in; a network error during the run stops it instead.
+    """
+
+    import smtplib
+
+    with profile_stage("load"), open(tosend_csv_path, "r", encoding="utf-8") as csv_file:
+        rows = list(csv.DictReader(csv_file))
+    # Keep the row indices of tosend.csv for the log
+    for row_index, row in enumerate(rows, start=2):
+        row["_row_index"] = row_index
+    rows, skipped = filter_recipients(rows, recipient_index_path, event_name)
+    report_skipped_recipients(skipped)
+    if not rows:
+        print("\nNo recipients left to send emails to.\n")
+        return 0, 0
+
+    confirm_send = input(f"\n\nYou are about to generate and email certificates to the {len(rows)} recipient(s) listed in \'{os.path.basename(tosend_csv_path)}\'\n\nType \'yes\' to confirm and proceed: ").strip().lower()
+    if confirm_send not in ["yes", "y"]:
+        print("\nEmail sending operation cancelled by the user.\n\nExiting...\n")
+        sys.exit(0)
+
+    with profile_stage("load"):
+        font_name = register_font(font_file_path)
+        templates = open_template_cache(routes or {None: (template_file_path, layout)}, font_file_path, name_case, output_dir_path, use_cache)
+        body_template = read_email_body_template(body_template_file)
+    # The rows fill in the certificate fields, so their index and template are kept beside them
+    tasks = [(row.pop("_row_index"), templates[row.get(CATEGORY_COLUMN) if routes else None], row) for row in rows]
+    tasks.sort(key=lambda task: task[1]["template_file_path"])
+    with profile_stage("validate"):
+        check_layout_fit([
+            (row["Full Name"], template["layout"], field_values(row["Full Name"].strip(), name_case, certificate_values(event_name, row["Email"], row.get("Certificate ID"), row)))
+            for _, template, row in tasks
+        ], font_name)
+
+    output_folder_path = open_output_folder(get_output_folder_path(output_dir_path), is_sharded(output_layout, len(rows)))
+
+    # Log in every sender up front, so authentication errors stop the run before any work starts
+    servers = [open_smtp_session(sender_email, sender_password) for _ in range(send_workers)]
+    recipient_index = open_recipient_index(recipient_index_path)
+    certificate_index = open_certificate_index(certificate_index_path)
+    bundle = open_output_bundle(output_folder_path, bundle_options)
+
+    render_queue = queue.Queue()
+    send_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    lock = threading.Lock()
+    counts = {"sent": 0, "failed": 0}
+
+    for task in tasks:
+        render_queue.put(task)
+
+    def render_worker():
+        while not stop_event.is_set():
+            try:
+                row_index, template, row = render_queue.get_nowait()
+            except queue.Empty:
+                return
+            name = row["Full Name"].strip()
+            row_key = certificate_row_key(name, row["Email"])
+            render_start = time.perf_counter()
+            try:
+                certificate_path, _, _ = issue_certificate(certificate_index, event_name, name, row_key, row["Email"], output_folder_path, template["template_bytes"], template["layout"], name_case, font_name, template["cache"], lock, row, bundle, template_hash=template["template_hash"])
+            except Exception as e:
+                logging.error(f"Failed to generate certificate for {name}: {e}", extra=log_fields("render", "failed", row_index, row["Email"].strip(), time.perf_counter() - render_start, e))
+                progress_print(f"Failed to generate certificate for \'{name}\': {e}")
+                with lock:
+                    counts["failed"] += 1
+                update_progress(progress, failed=True, latency=time.perf_counter() - render_start)
+                continue
+            # Blocks while the senders are behind (backpressure)
+            while not stop_event.is_set():
+                try:
+                    send_queue.put((row_index, row, certificate_path), timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def send_worker(server):
+        while True:
+            item = send_queue.get()
+            if item is None:
+                break
+            if stop_event.is_set():
+                continue
+            row_index, row, certificate_path = item
+            recipient_email = row["Email"].lower().strip()
+            name = row["Full Name"].title().strip()
+            body = body_template.replace("{{name}}", name)
+            send_start = time.perf_counter()
+            try:
+                try:
+                    sent_size = send_email(server, sender_email, recipient_email, name, email_subject, body, [certificate_path], row_index)
+                except smtplib.SMTPServerDisconnected:
+                    close_smtp_session(server)
+                    server = open_smtp_session(sender_email, sender_password)
+                    sent_size = send_email(server, sender_email, recipient_email, name, email_subject, body, [certificate_path], row_index)
+            except Exception as e:
+                # Network errors end the run for every worker, the other send errors are handled by send_email
+                logging.error(f"Stopping the senders: {e}", extra=log_fields("send", "error", row_index, recipient_email, time.perf_counter() - send_start, e))
+                stop_event.set()
+                sent_size = 0
+            with lock:
+                if sent_size:
+                    record_send(recipient_index, recipient_email, name, event_name)
+                    counts["sent"] += 1
+                else:
+                    counts["failed"] += 1
+            update_progress(progress, failed=not sent_size, latency=time.perf_counter() - send_start, size=sent_size)
+        close_smtp_session(server)
+
+    print(f"\n\nGenerating and emailing the certificates ({render_workers} render / {send_workers} send workers)......\n")
+    start_time = time.perf_counter()
+    progress = start_progress("Certifying and emailing", len(rows), "sent")
+
+    renderers = [threading.Thread(target=render_worker, daemon=True) for _ in range(render_workers)]
+    senders = [threading.Thread(target=send_worker, args=(server,), daemon=True) for server in servers]
+    for worker in renderers + senders:
+        worker.start()
+
+    try:
+        for worker in renderers:
+            while worker.is_alive():
+                worker.join(timeout=0.5)
+        for _ in senders:
+            send_queue.put(None)
+        for worker in senders:
+            while worker.is_alive():
+                worker.join(timeout=0.5)
+    except KeyboardInterrupt:
+        stop_event.set()
+        finish_output_bundle(bundle, keep=False)
+        print("\n\nKeyboard Interrupt!\nAll certificates aren't generated and emailed!\n\nExiting...\n")
+        sys.exit(1)
+    finally:
+        recipient_index.close()
+        certificate_index.close()
+        save_template_cache(output_folder_path, templates)
+    finish_progress(progress)
+    finish_output_bundle(bundle)
+
+    if stop_event.is_set():
+        print("\nThe pipeline was stopped because of a network error.\n")
+        counts["failed"] += len(rows) - counts["sent"] - counts["failed"]
+
+    print(f"\nProcessed {len(rows)} recipient(s) in {time.perf_counter() - start_time:.1f}s.\nSaved all certificates to \"{os.path.basename(output_folder_path)}\" directory.")
+
+    return counts["sent"], counts["failed"]
+
+
+## --------------------------------------------------------------------------
+# Function to get the digest of a spreadsheet row
+def row_digest(row):
+    """
+    Returns a content hash of a spreadsheet row, so edited rows count as new.
+
+    Args:
+        row (dict): A spreadsheet row.
+
+    Returns:
+        str: The hex digest of the row.
+    """
+
+    return hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+## --------------------------------------------------------------------------
+# Function to get the modification signature of the watched files
+def get_watch_signature(file_paths):
+    """
+    Returns the (path, mtime, size) of each file, which changes whenever any of them is written.
+
+    Args:
+        file_paths (list): Paths of the watched files.
+
+    Returns:
+        tuple: The signature of the files.
+    """
+
+    signature = []
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+            signature.append((file_path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((file_path, None, None))
+
+    return tuple(signature)
+
+
+## --------------------------------------------------------------------------
+# Function to keep processing new spreadsheet rows as they arrive
+def watch_spreadsheet(spreadsheet_dir_path, checkins_dir_path, template_file_path, font_file_path, layout, name_case, output_dir_path, body_template_file, sender_email, sender_password, email_subject, event_name, attendance_rules, interval=5, recipient_index_path=DEFAULT_INDEX_PATH, certificate_index_path=DEFAULT_CERTIFICATE_INDEX_PATH, routes=None, output_layout="auto"):
+    """
+    Polls the spreadsheet (and check-in logs) and certifies and emails only the rows not handled yet.
+
+    The font, template, email body, certificate cache and SMTP session are loaded once and
+    kept warm between ticks. A tick does nothing unless a watched file changed; then every row
+    whose content hash was not handled before is validated, checked for attendance, looked up in
+    the recipient index, rendered and emailed. Rows that have not attended yet stay pending, so
+    they are picked up as soon as they are marked or checked in, and so do rows whose email
+    failed, which are retried on the next tick.
+
+    Args:
+        spreadsheet_dir_path (str): Directory holding the single CSV, XLSX or ODS spreadsheet.
+        checkins_dir_path (str): Directory holding the optional check-in logs.
+        template_file_path (str): Path to the certificate template PDF; unused with `routes`.
+        font_file_path (str): Path to the TTF font for the names.
+        layout (dict): Layout profile of the certificate; unused with `routes`.
+        name_case (str): "upper" or "title".
+        output_dir_path (str): Preferred output directory; a counter is appended if it exists.
+        body_template_file (str): Path to the HTML email body template.
+        sender_email (str): The sender's email address.
+        sender_password (str): The sender's Gmail App Password.
+        email_subject (str): The subject of the emails.
+        event_name (str): Event name used for re-send protection and the certificate IDs.
+        attendance_rules (dict): Attendance rules used when check-in logs are present.
+        interval (float, optional): Seconds between two polls.
+        recipient_index_path (str, optional): Path to the recipient index database.
+        certificate_index_path (str, optional): Path to the certificate index database.
+        routes (dict, optional): Template and layout of each certificate category, chosen by
+                                 the "Category" column; rows without a configured category are skipped.
+        output_layout (str, optional): "sharded" to write the certificates into shard
+                                       subfolders; "auto" stays flat, the number of rows is unknown.
+
+    Returns:
+        tuple: (sent, failed) counts of emails when the watch is stopped with Ctrl+C.
+
+    Raises:
+        SMTPSessionError: If the first login fails; later network errors are retried on the next tick.
+    """
+
+    import smtplib
+    from Utilities.spreadsheet_readers import SPREADSHEET_EXTENSIONS, iter_spreadsheet_rows
+
+    with profile_stage("load"):
+        font_name = register_font(font_file_path)
+        templates = open_template_cache(routes or {None: (template_file_path, layout)}, font_file_path, name_case, output_dir_path)
+        body_template = read_email_body_template(body_template_file)
+
+    output_folder_path = open_output_folder(get_output_folder_path(output_dir_path), is_sharded(output_layout))
+
+    # Log in once up front, so a wrong password stops the watch right away
+    server = open_smtp_session(sender_email, sender_password)
+    recipient_index = open_recipient_index(recipient_index_path)
+    certificate_index = open_certificate_index(certificate_index_path)
+    handled = set()
+    failing = set()
+    last_signature = None
+    warned = set()
+    sent = failed = 0
+
+    print(f"\n\nWatching \"{os.path.basename(spreadsheet_dir_path)}\" for new rows every {interval}s. Press Ctrl+C to stop.\n")
+    try:
+        while True:
+            spreadsheet_files = [file for extension in SPREADSHEET_EXTENSIONS for file in get_files(spreadsheet_dir_path, extension)]
+            checkin_file_paths = [os.path.join(checkins_dir_path, file) for file in sorted(get_files(checkins_dir_path, 'CSV'))]
+
+            if len(spreadsheet_files) != 1:
+                if "files" not in warned:
+                    print(f"Waiting for exactly one spreadsheet in \"{os.path.basename(spreadsheet_dir_path)}\" (found {len(spreadsheet_files)})...")
+                    warned.add("files")
+                time.sleep(interval)
+                continue
+            warned.discard("files")
+
+            spreadsheet_file_path = os.path.join(spreadsheet_dir_path, spreadsheet_files[0])
+            signature = get_watch_signature([spreadsheet_file_path] + checkin_file_paths)
+            if signature == last_signature:
+                time.sleep(interval)
+                continue
+
+            try:
+                rows = list(iter_spreadsheet_rows(spreadsheet_file_path))
+            except Exception as e:
+                # The file may be in the middle of being written, try again next tick
+                logging.warning(f"Could not read {spreadsheet_files[0]}: {e}", extra=log_fields("load", "error", error=e))
+                time.sleep(interval)
+                continue
+
+            # Content hash watermark: only rows not handled in an earlier tick are looked at
+            new_rows = []
+            for row in rows:
+                digest = row_digest(row)
+                if digest not in handled:
+                    new_rows.append((digest, row))
+
+            if checkin_file_paths:
+                checkin_sessions = load_checkins(checkin_file_paths, attendance_rules["join_key"])
+                attended = {id(row) for row in iter_attended_rows((row for _, row in new_rows), checkin_sessions, attendance_rules)}
+            elif rows and "Attendance" not in rows[0]:
+                if "attendance" not in warned:
+                    print("Waiting for an \'Attendance\' column or check-in logs to tell who attended...")
+                    warned.add("attendance")
+                attended = set()
+            else:
+                attended = {id(row) for _, row in new_rows if (row.get("Attendance") or "").strip().upper() == "TRUE"}
+
+            pending = []
+            seen_emails = set()
+            for digest, row in new_rows:
+                name = (row.get("Full Name") or "").strip()
+                email_key = normalize_email(row.get("Email"))
+                if not name or "@" not in email_key or email_key in seen_emails:
+                    print(f"Skipping invalid or repeated row: {name or '<no name>'} <{(row.get('Email') or '').strip()}>")
+                    handled.add(digest)
+                elif routes and normalize_category(row.get(CATEGORY_COLUMN)) not in routes:
+                    if id(row) in attended:
+                        print(f"Skipping row without a configured category: {name} <{(row.get('Email') or '').strip()}>")
+                        handled.add(digest)
+                elif id(row) in attended:
+                    seen_emails.add(email_key)
+                    pending.append((digest, row))
+
+            pending_rows, skipped = filter_recipients([row for _, row in pending], recipient_index_path, event_name)
+            report_skipped_recipients(skipped)
+            skipped_ids = {id(row) for row, _ in skipped}
+            handled.update(digest for digest, row in pending if id(row) in skipped_ids)
+
+            for digest, row in pending:
+                if id(row) in skipped_ids:
+                    continue
+                name = row["Full Name"].strip().title()
+                recipient_email = row["Email"].lower().strip()
+
+                row_key = certificate_row_key(name, recipient_email)
+                template = templates[normalize_category(row.get(CATEGORY_COLUMN)) if routes else None]
+                cert_id = assign_certificate_id(certificate_index, event_name, row_key)
+                problems = layout_problems(template["layout"], field_values(name, name_case, certificate_values(event_name, recipient_email, cert_id, row)), font_name)
+                if problems:
+                    # Stays skipped until the row is edited
+                    print(f"Skipping {name} <{recipient_email}>: {'; '.join(problems)}")
+                    handled.add(digest)
+                    continue
+                render_start = time.perf_counter()
+                try:
+                    certificate_path, _, _ = issue_certificate(certificate_index, event_name, name, row_key, recipient_email, output_folder_path, template["template_bytes"], template["layout"], name_case, font_name, template["cache"], values=row, template_hash=template["template_hash"])
+                except Exception as e:
+                    # Stays skipped until the row is edited
+                    logging.error(f"Failed to generate certificate for {name}: {e}", extra=log_fields("render", "failed", email=recipient_email, latency=time.perf_counter() - render_start, error=e))
+                    print(f"Skipping {name} <{recipient_email}>: failed to generate the certificate: {e}")
+                    handled.add(digest)
+                    failed += 1
+                    continue
+                body = body_template.replace("{{name}}", name)
+                try:
+                    if server is None:
+                        server = open_smtp_session(sender_email, sender_password)
+                    try:
+                        sent_size = send_email(server, sender_email, recipient_email, name, email_subject, body, [certificate_path])
+                    except smtplib.SMTPServerDisconnected:
+                        # Idle sessions are dropped by the server between ticks
+                        close_smtp_session(server)
+                        server = open_smtp_session(sender_email, sender_password)
+                        sent_size = send_email(server, sender_email, recipient_email, name, email_subject, body, [certificate_path])
+                except (SMTPSessionError, smtplib.SMTPServerDisconnected):
+                    # Network trouble: keep the row pending and retry on the next tick
+                    if server is not None:
+                        close_smtp_session(server)
+                    server = None
+                    signature = None
+                    break
+
+                if sent_size:
+                    record_send(recipient_index, recipient_email, name, event_name)
+                    print(f"Email sent to {recipient_email}")
+                    handled.add(digest)
+                    failing.discard(digest)
+                    sent += 1
+                else:
+                    # Kept pending and retried on the next tick
+                    print(f"Retrying {recipient_email} on the next tick")
+                    failing.add(digest)
+                    signature = None
+
+            if pending_rows:
+                save_template_cache(output_folder_path, templates)
+            last_signature = signature
+            time.sleep(interval)
+
+    except KeyboardInterrupt:
+        print(f"\n\nStopped watching.\n")
+    finally:
+        if server is not None:
+            close_smtp_session(server)
+        recipient_index.close()
+        certificate_index.close()
+
+    return sent, failed + len(failing)
+
 
 ## ===========================================================================
 # === MAIN ENTRY POINT ===
@@ -118,14 +590,28 @@ if __name__ == "__main__":
             - `Spreadsheet`: Directory for input CSV files containing attendee details.
             - `Certificate_Template`: Directory for certificate templates.
             - `Wordlist`: Directory for wordlists used in certificate generation.
+            - `Checkins`: Optional directory for check-in logs (CSV) used to compute attendance.
 
     Key Components:
         - **Spreadsheet Extraction**:
             Extracts "Full Name" and "Email" columns for attendees marked as present.
         - **Certificate Generation**:
-            Calls `certificate_generator.py` to create certificates.
+            Calls `generate_certificates` from `certificate_generator.py` in-process.
         - **Email Sending**:
-            Calls `send_email.py` to send personalized emails with certificates.
+            Calls `send_bulk_emails` from `send_email.py` in-process, with the generated certificates.
+
+    Options:
+        --pipelined: Render and email the certificates at the same time through a bounded
+                     queue (see `certify_and_email_pipelined`) instead of one stage after the other.
+        --render-workers, --send-workers, --queue-size: Tune the pipelined mode.
+        --watch: Keep running and certify and email new spreadsheet rows as they arrive
+                 (see `watch_spreadsheet`); --interval sets the polling period in seconds.
+        --no-cache: Render every certificate instead of reusing the unchanged ones of the previous run.
+        --profile [REPORT]: Write the stage timings and memory peaks of the run to a JSON report
+                            (see `Utilities.profiling`); --profile-cprofile adds a cProfile.
+
+    Exit Status:
+        0 if every email was sent, 1 otherwise.
 
     Raises:
         - KeyError: If required columns are missing in the spreadsheet.
@@ -135,79 +621,204 @@ if __name__ == "__main__":
 
     Dependencies:
         - `Utilities.utils` module for common file handling and validation functions.
-        - External scripts: `certificate_generator.py` and `send_email.py`.
+        - Modules: `certificate_generator.py` and `send_email.py`, imported in the same process.
 
     Logs:
-        - Actions and errors are logged in the `email_log.txt` file for review.
+        - Actions and errors are logged as JSON lines in the `cert-email_log.jsonl` file for review
+          (see `Utilities.structured_log`).
     """
 
+    parser = argparse.ArgumentParser(description="Extract attendees, generate their certificates and email them.")
+    parser.add_argument("--pipelined", action="store_true", help="overlap certificate generation with emailing")
+    parser.add_argument("--render-workers", type=int, default=2, help="certificate render threads in pipelined mode (default: 2)")
+    parser.add_argument("--send-workers", type=int, default=2, help="SMTP sessions in pipelined mode (default: 2)")
+    parser.add_argument("--queue-size", type=int, default=32, help="rendered certificates waiting to be sent (default: 32)")
+    parser.add_argument("--watch", action="store_true", help="keep running and process new spreadsheet rows as they arrive")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between two polls in watch mode (default: 5)")
+    parser.add_argument("--no-cache", action="store_true", help="render every certificate again instead of reusing unchanged ones")
+    add_bundle_arguments(parser)
+    add_output_layout_argument(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    bundle_options = bundle_options_from_args(args)
+
+    if args.interval <= 0:
+        print("\nError: --interval must be greater than 0.\n\nExiting...\n")
+        sys.exit(1)
+    if min(args.render_workers, args.send_workers, args.queue_size) < 1:
+        print("\nError: --render-workers, --send-workers and --queue-size must be at least 1.\n\nExiting...\n")
+        sys.exit(1)
+    if args.watch and bundle_options:
+        print("\nError: --bundle is not available in watch mode, bundle the output folder with 'python Utilities/bundle.py' afterwards.\n\nExiting...\n")
+        sys.exit(1)
+
+    start_profiling_from_args(args, "extract_certify_and_email")
+
     CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH = os.path.abspath(os.path.dirname(__file__))
     ROOT_REPO_PATH = os.path.abspath(os.path.dirname(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH))
-
-    CERTIFICATE_GENERATOR_DIR_PATH = os.path.join(ROOT_REPO_PATH, "Certificate_Generator")
-    EMAIL_SENDER_DIR_PATH = os.path.join(ROOT_REPO_PATH, "Email_Sender")
+    FONTS_DIR_PATH = os.path.join(ROOT_REPO_PATH, 'Fonts')
 
     CERTIFICATE_TEMPLATE_DIR_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, 'Certificate_Template')
     WORDLIST_DIR_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "Wordlist")
     SPREADSHEET_DIR_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "Spreadsheet")
+    CHECKINS_DIR_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "Checkins")
+    OUTPUT_DIR_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "Generated_Certificates")
     BODY_TEMPLATE_FILE_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "cert-email_html_body_template.html")
-    LOG_FILE_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "cert-email_log.txt")
+    LOG_FILE_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "cert-email_log.jsonl")
 
     print("\n" + " Certificate_Email_Automation ".center(40, "-"))
 
     os.makedirs(CERTIFICATE_TEMPLATE_DIR_PATH, exist_ok=True)
     os.makedirs(SPREADSHEET_DIR_PATH, exist_ok=True)
+    os.makedirs(CHECKINS_DIR_PATH, exist_ok=True)
 
-    config = load_config(os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "cert-email_config.json"))
+    with profile_stage("load"):
+        config = load_config(os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "cert-email_config.json"))
     initialize_necessary_files(BODY_TEMPLATE_FILE_PATH)
 
     sender_email = config.get("sender_email", "").strip()
     email_subject = config.get("email_subject", "").strip()
     passwd = config.get("gmail_app_password", "").strip()
+    event_name = config.get("event_name", "").strip() or email_subject
 
     if sender_email == "" or email_subject in ["", "Subject"]:
         print("\nError: Please configure all fields properly in the config file before running the script.\n\nExiting...\n")
         sys.exit(1)
     check_gmail_app_password(passwd)
 
-    csv_files = get_files(SPREADSHEET_DIR_PATH, 'CSV')
-    spreadsheet_file = get_single_file('Spreadsheet', SPREADSHEET_DIR_PATH, 'CSV')
-    spreadsheet_file_path = os.path.join(SPREADSHEET_DIR_PATH, spreadsheet_file)
+    # With certificate categories each row picks its template and layout, otherwise there is one template
+    routes = get_certificate_routes(config, CERTIFICATE_TEMPLATE_DIR_PATH, CERTIFICATE_LAYOUTS)
+    field_columns = layout_columns(list(CERTIFICATE_LAYOUTS.values()) + [layout for _, layout in routes.values()])
+    if routes:
+        template_file_path = None
+        print(f"\nCertificate categories: {', '.join(routes)}")
+    else:
+        template_file = get_single_file('Certificate_Template', CERTIFICATE_TEMPLATE_DIR_PATH, 'PDF')
+        template_file_path = os.path.join(CERTIFICATE_TEMPLATE_DIR_PATH, template_file)
+
+    if args.watch:
+        # === WATCH MODE ===
+        check_body_template(BODY_TEMPLATE_FILE_PATH)
+        attendance_rules = get_attendance_rules(config)
+
+        print("\n" + " Certificate Generator ".center(35, "-"))
+        layout = None if routes else prompt_certificate_layout()
+        font_file_path = os.path.join(FONTS_DIR_PATH, select_font(FONTS_DIR_PATH))
+        name_case = prompt_name_case()
+
+        confirm_watch = input("\n\nWatch mode emails a certificate to every new attendee without asking again.\n\nType \'yes\' to confirm and proceed: ").strip().lower()
+        if confirm_watch not in ["yes", "y"]:
+            print("\nWatch mode cancelled by the user.\n\nExiting...\n")
+            sys.exit(0)
+
+        initialize_necessary_files(log_file=LOG_FILE_PATH)
+        start_structured_logging(LOG_FILE_PATH)
+
+        try:
+            sent, failed = watch_spreadsheet(
+                SPREADSHEET_DIR_PATH, CHECKINS_DIR_PATH, template_file_path, font_file_path, layout, name_case, OUTPUT_DIR_PATH,
+                BODY_TEMPLATE_FILE_PATH, sender_email, passwd, email_subject, event_name, attendance_rules, args.interval, routes=routes, output_layout=args.output_layout,
+            )
+        except SMTPSessionError as e:
+            print(f"\n{e}\n\nExiting...\n")
+            sys.exit(1)
+        print(f"{sent} email(s) sent, {failed} failed while watching.\n")
+        sys.exit(1 if failed else 0)
+
+    # Workbooks are converted with only the columns read below: the recipient, attendance and category columns and the layout fields
+    spreadsheet_columns = ["Full Name", "Email", "Attendance", CATEGORY_COLUMN] + [columns[0] for columns in JOIN_KEYS.values()] + field_columns
+    spreadsheet_file_path = get_spreadsheet_file('Spreadsheet', SPREADSHEET_DIR_PATH, os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "tmp"), spreadsheet_columns)
 
     tosend_csv_path = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "tosend.csv")
-    certificate_script_path = os.path.join(CERTIFICATE_GENERATOR_DIR_PATH, "certificate_generator.py")
-    email_script_path = os.path.join(EMAIL_SENDER_DIR_PATH, "send_email.py")
 
     os.makedirs(WORDLIST_DIR_PATH, exist_ok=True)
     text_files = get_files(WORDLIST_DIR_PATH, 'TXT')
     if not text_files:
-        with open(os.path.join(WORDLIST_DIR_PATH, 'wordlist.txt'), 'w') as tosend_csv_file:
+        with open(os.path.join(WORDLIST_DIR_PATH, 'wordlist.txt'), 'w', encoding='utf-8') as tosend_csv_file:
             pass
 
     wordlist_file_path = os.path.join(WORDLIST_DIR_PATH, 'wordlist.txt')
 
-    check_body_template(BODY_TEMPLATE_FILE_PATH)
+    # Attendance comes from the check-in logs if any, otherwise from the 'Attendance' column
+    checkin_file_paths = [os.path.join(CHECKINS_DIR_PATH, file) for file in sorted(get_files(CHECKINS_DIR_PATH, 'CSV'))]
+    attendance_rules = get_attendance_rules(config) if checkin_file_paths else None
 
-    clean_csv_fieldnames(spreadsheet_file_path)
+    with profile_stage("validate"):
+        check_body_template(BODY_TEMPLATE_FILE_PATH)
 
-    # Open the file and ensure it has the correct contents as needed
-    check_csv(spreadsheet_file_path, "Other", "Attendance")
+        clean_csv_fieldnames(spreadsheet_file_path)
 
-    check_attendance(spreadsheet_file_path)
+        # Open the file and ensure it has the correct contents as needed
+        if checkin_file_paths:
+            check_csv(spreadsheet_file_path, "Other")
+        else:
+            check_csv(spreadsheet_file_path, "Other", "Attendance")
+            check_attendance(spreadsheet_file_path)
+        if routes:
+            check_categories(spreadsheet_file_path, routes)
 
-    sort_csv(spreadsheet_file_path)
+    with profile_stage("sort"):
+        sort_csv(spreadsheet_file_path)
 
-    extract_spreadsheet(spreadsheet_file_path, tosend_csv_path, wordlist_file_path)
+    with profile_stage("load"):
+        extract_spreadsheet(spreadsheet_file_path, tosend_csv_path, wordlist_file_path, event_name, checkin_file_paths=checkin_file_paths, attendance_rules=attendance_rules, routes=routes, field_columns=field_columns)
 
     print("\nSorting extracted 'tosend.csv' file contents:",end='')
-    sort_csv(tosend_csv_path)
+    with profile_stage("sort"):
+        sort_csv(tosend_csv_path)
+
+    # === CERTIFICATE GENERATION ===
+    print("\n" + " Certificate Generator ".center(35, "-"))
+    with profile_stage("validate"):
+        read_wordlist(wordlist_file_path)  # Validates the names
+    with profile_stage("load"), open(tosend_csv_path, "r", encoding="utf-8") as tosend_csv_file:
+        recipients = list(csv.DictReader(tosend_csv_file))
+    layout = None if routes else prompt_certificate_layout()
+    font_file_path = os.path.join(FONTS_DIR_PATH, select_font(FONTS_DIR_PATH))
+    name_case = prompt_name_case()
+
+    initialize_necessary_files(log_file=LOG_FILE_PATH)
+    start_structured_logging(LOG_FILE_PATH)
+
+    if args.pipelined:
+        # === CERTIFICATE GENERATION AND EMAIL SENDING, OVERLAPPED ===
+        try:
+            sent, failed = certify_and_email_pipelined(
+                tosend_csv_path, template_file_path, font_file_path, layout, name_case, OUTPUT_DIR_PATH,
+                BODY_TEMPLATE_FILE_PATH, sender_email, passwd, email_subject, event_name,
+                args.render_workers, args.send_workers, args.queue_size, not args.no_cache, routes=routes, bundle_options=bundle_options, output_layout=args.output_layout,
+            )
+        except SMTPSessionError as e:
+            print(f"\n{e}\n\nExiting...\n")
+            sys.exit(1)
+    else:
+        certificates_dir = generate_certificates(
+            template_file_path, [row["Full Name"] for row in recipients], font_file_path, layout, name_case, OUTPUT_DIR_PATH, {
+                "event": event_name,
+                "emails": [row["Email"] for row in recipients],
+                "rows": recipients,
+                "categories": [row.get(CATEGORY_COLUMN) for row in recipients] if routes else None,
+                "routes": routes,
+                "use_cache": not args.no_cache,
+                "bundle_options": bundle_options,
+                "output_layout": args.output_layout,
+            },
+        )
+        print("\n\nCertificates generation successfull!\n\nSaved all certificates to \"" + os.path.basename(certificates_dir) + "\" directory.\n")
+
+        # === EMAIL SENDING ===
+        print("\n" + " Email Sender ".center(24, "-"))
+        with profile_stage("validate"):
+            check_attachments(tosend_csv_path, certificates_dir, "Other", quiet=True)
 
-    try:
-        certificate_script_status = os.system(f'python "{certificate_script_path}" extract_certify_and_email_script')
-        if certificate_script_status == 0:
-            os.system(f'python "{email_script_path}" extract_certify_and_email_script')
-    except (KeyboardInterrupt, EOFError):
-        sys.exit(1)
-    except Exception as e:
-        print(f"\n\nAn error occured while executing the script.\n{e}\n")
-        sys.exit(1)
+        try:
+            sent, failed = send_bulk_emails(tosend_csv_path, BODY_TEMPLATE_FILE_PATH, sender_email, passwd, email_subject, "Other", certificates_dir, event_name)
+        except SMTPSessionError as e:
+            print(f"\n{e}\n\nExiting...\n")
+            sys.exit(1)
+        except (KeyboardInterrupt, EOFError):
+            print("\n\nKeyboard Interrupt!\n\nExiting...\n")
+            sys.exit(1)
+
+    print(f"\n{sent} email(s) sent, {failed} failed.\n")
+    sys.exit(1 if failed else 0)
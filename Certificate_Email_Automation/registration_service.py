@@ -0,0 +1,799 @@
+import io
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import argparse
+import threading
+from collections import OrderedDict, deque
+from urllib.parse import parse_qsl, urlsplit
+
+# Get the parent directory, add it to python path and import the modules
+parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(parent_dir)
+sys.path.append(os.path.join(parent_dir, "Certificate_Generator"))
+sys.path.append(os.path.join(parent_dir, "Email_Sender"))
+sys.path.append(os.path.join(parent_dir, "QRCode_Generator"))
+
+from certificate_generator import CERTIFICATE_LAYOUTS, certificate_values, field_values, get_output_folder_path, issue_certificate, layout_problems, load_template, register_font, render_certificate
+from send_email import SMTPSessionError, close_smtp_session, open_smtp_session, send_email
+from qrcode_generator import add_center_image, add_title, dots_qr_gen, qr_matrix, qr_svg, standard_qr_gen, warm_batch_assets
+
+from Utilities.dedupe import normalize_email
+from Utilities.certificate_index import DEFAULT_CERTIFICATE_INDEX_PATH, assign_certificate_id, certificate_row_key, open_certificate_index
+from Utilities.stage_cache import file_digest
+from Utilities.recipient_index import DEFAULT_INDEX_PATH, lookup_recipients, open_recipient_index, record_send
+from Utilities.structured_log import log_fields, start_structured_logging
+from Utilities.utils import check_body_template, check_gmail_app_password, get_files, get_single_file, initialize_necessary_files, is_valid_name, load_config, read_email_body_template
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+MAX_CONCURRENCY = 4         # Render requests handled at the same time, the others wait
+ADMISSION_TIMEOUT = 2.0     # Seconds a request waits for a free slot before a 503
+EMAIL_QUEUE_SIZE = 256      # Emails waiting to be sent before new ones are refused
+MAX_REQUEST_BYTES = 64 * 1024
+QR_CACHE_SIZE = 256         # Rendered QR codes kept, badges are often requested more than once
+QR_MASK_PATTERN = 0         # Fixed QR mask: any mask scans, and searching for the best one is most of the encoding
+LATENCY_WINDOW = 1000       # Requests per endpoint in the latency percentiles
+EMAIL_JOBS_KEPT = 10000     # Finished email jobs whose status can still be looked up
+
+QR_FORMATS = {"png": ("PNG", "image/png"), "jpeg": ("JPEG", "image/jpeg"), "svg": ("SVG", "image/svg+xml")}
+
+
+## ===========================================================================
+### Classes
+
+## --------------------------------------------------------------------------
+# Error answered to the client with an HTTP status
+class RequestError(Exception):
+    """
+    Raised by the endpoints for a request that cannot be served, e.g. a missing field.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to encode a JSON response
+def json_bytes(payload):
+    """
+    Returns a JSON response body.
+    """
+
+    return json.dumps(payload).encode("utf-8")
+
+
+## --------------------------------------------------------------------------
+# Function to read a text field of a request
+def get_field(params, field, required=True, default=""):
+    """
+    Returns a stripped text field of the request parameters.
+
+    Args:
+        params (dict): Query string and JSON body of the request.
+        field (str): Name of the field.
+        required (bool, optional): Answer 400 if the field is missing or empty.
+        default (str, optional): Value of a missing optional field.
+
+    Returns:
+        str: The field value.
+
+    Raises:
+        RequestError: If a required field is missing or the field is not a string (e.g. a JSON number).
+    """
+
+    value = params.get(field, default)
+    if not isinstance(value, str):
+        raise RequestError(400, f"The '{field}' field must be a string")
+    value = value.strip()
+    if required and not value:
+        raise RequestError(400, f"The '{field}' field is required")
+    return value
+
+
+## --------------------------------------------------------------------------
+# Function to read the name and email of a request
+def get_recipient(params, email_required=False):
+    """
+    Returns the validated name and email of a request.
+
+    Names follow the wordlist rules of the certificate generator (letters of any script and spaces).
+
+    Raises:
+        RequestError: If the name or the email is invalid.
+    """
+
+    name = " ".join(get_field(params, "name").split())
+    if not is_valid_name(name):
+        raise RequestError(400, "Invalid name, only letters and spaces are allowed")
+
+    email = get_field(params, "email", required=email_required) or None
+    if email and "@" not in normalize_email(email):
+        raise RequestError(400, f"Invalid email address '{email}'")
+
+    return name, email
+
+
+## --------------------------------------------------------------------------
+# Function to read the certificate field values of a request
+def get_certificate_values(service, params, name, email):
+    """
+    Returns the values of the certificate fields of a request (its other parameters, e.g. a
+    column printed by the layout), checked to fit the layout before anything is rendered.
+
+    Raises:
+        RequestError: If a field has no value or its text does not fit.
+    """
+
+    values = {field: str(value) for field, value in params.items() if not field.startswith("_")}
+    # The ID is reserved before the fit check, so the text checked is the (possibly lengthened) ID printed
+    with service["index_lock"]:
+        cert_id = assign_certificate_id(service["certificate_index"], service["event"], certificate_row_key(name, email))
+    problems = layout_problems(service["layout"], field_values(name, service["name_case"], certificate_values(service["event"], email, cert_id, values)), service["font_name"])
+    if problems:
+        raise RequestError(400, f"The certificate cannot be laid out: {'; '.join(problems)}")
+
+    return values
+
+
+## --------------------------------------------------------------------------
+# Function to issue a certificate for a request
+def issue_service_certificate(service, name, email, values=None):
+    """
+    Writes and records the certificate of a recipient, like the automation script does.
+
+    The same name (or email) always gets the same certificate ID, so a repeated request
+    renders the same certificate again.
+
+    Returns:
+        tuple: (certificate_id, certificate_path)
+    """
+
+    certificate_path, _, cert_id = issue_certificate(
+        service["certificate_index"], service["event"], name, certificate_row_key(name, email), email, service["output_folder_path"],
+        service["template_bytes"], service["layout"], service["name_case"], service["font_name"], lock=service["index_lock"], values=values, template_hash=service["template_hash"],
+    )
+
+    return cert_id, certificate_path
+
+
+## --------------------------------------------------------------------------
+# Endpoint rendering a certificate
+def certificate_endpoint(service, params):
+    """
+    POST /certificate {"name", "email"?}: issues the certificate of a recipient and returns
+    the PDF, with its ID in the X-Certificate-Id header. Other parameters fill in the layout
+    fields naming them.
+    """
+
+    name, email = get_recipient(params)
+    values = get_certificate_values(service, params, name, email)
+    cert_id, certificate_path = issue_service_certificate(service, name, email, values)
+    with open(certificate_path, "rb") as certificate_file:
+        certificate = certificate_file.read()
+
+    headers = {
+        "X-Certificate-Id": cert_id,
+        "Content-Disposition": f"inline; filename=\"{os.path.basename(certificate_path)}\"",
+    }
+    return 200, "application/pdf", certificate, headers
+
+
+## --------------------------------------------------------------------------
+# Endpoint rendering a QR code
+def qr_endpoint(service, params):
+    """
+    GET or POST /qr {"payload", "style"?, "bg_color"?, "title"?, "center_image"?, "format"?}:
+    returns the QR code image, built like the batch mode of the QR Code Generator.
+    """
+
+    payload = get_field(params, "payload")
+    qr_style = get_field(params, "style", required=False, default="standard")
+    bg_color = get_field(params, "bg_color", required=False, default="white")
+    title = get_field(params, "title", required=False)
+    extension = get_field(params, "format", required=False, default="png").lower()
+    center_image = str(params.get("center_image", True)).strip().lower() not in ("false", "0", "no")
+
+    if qr_style not in ("standard", "dots"):
+        raise RequestError(400, "The 'style' must be 'standard' or 'dots'")
+    if bg_color not in ("white", "black"):
+        raise RequestError(400, "The 'bg_color' must be 'white' or 'black'")
+    if extension not in QR_FORMATS:
+        raise RequestError(400, f"The 'format' must be one of {', '.join(QR_FORMATS)}")
+    image_format, content_type = QR_FORMATS[extension]
+
+    key = (payload, qr_style, bg_color, title, center_image, image_format)
+    with service["qr_cache_lock"]:
+        image = service["qr_cache"].get(key)
+        if image is not None:
+            service["qr_cache"].move_to_end(key)
+            return 200, content_type, image, {"X-Cache": "hit"}
+
+    if image_format == "SVG":
+        image = qr_svg(qr_matrix(payload, qr_style, "H", mask_pattern=QR_MASK_PATTERN), qr_style, bg_color, title, center_image).encode("utf-8")
+    else:
+        qr_func = standard_qr_gen if qr_style == "standard" else dots_qr_gen
+        qr_image = qr_func(payload, "H", bg_color, QR_MASK_PATTERN)
+        if center_image:
+            qr_image = add_center_image(qr_image, bg_color)
+        if title:
+            qr_image = add_title(qr_image, title, bg_color, service["font_file_path"])
+        output = io.BytesIO()
+        # Fast zlib level: the badges are served once and printed, not stored
+        qr_image.save(output, format=image_format, **({"compress_level": 1} if image_format == "PNG" else {}))
+        image = output.getvalue()
+
+    with service["qr_cache_lock"]:
+        service["qr_cache"][key] = image
+        if len(service["qr_cache"]) > QR_CACHE_SIZE:
+            service["qr_cache"].popitem(last=False)
+
+    return 200, content_type, image, {"X-Cache": "miss"}
+
+
+## --------------------------------------------------------------------------
+# Endpoint queueing an email
+def email_endpoint(service, params):
+    """
+    POST /email {"name", "email", "certificate"?, "force"?}: queues the email of a recipient,
+    with their certificate attached unless "certificate" is false, and returns its job ID.
+
+    Recipients on the suppression list, or already emailed for the event, are refused with
+    409 unless "force" is true for the latter, as are recipients with an email still queued.
+    """
+
+    if not service["email_queue_enabled"]:
+        raise RequestError(503, "Email sending is turned off (--no-email)")
+
+    name, email = get_recipient(params, email_required=True)
+    attach_certificate = str(params.get("certificate", True)).strip().lower() not in ("false", "0", "no")
+    force = str(params.get("force", False)).strip().lower() in ("true", "1", "yes")
+    values = get_certificate_values(service, params, name, email) if attach_certificate else None
+
+    with service["recipient_lock"]:
+        suppressed, already_sent = lookup_recipients(service["recipient_index"], [email], service["event"])
+    email_key = normalize_email(email)
+    if email_key in suppressed:
+        raise RequestError(409, f"'{email}' is on the suppression list ({suppressed[email_key]})")
+    if email_key in already_sent and not force:
+        raise RequestError(409, f"'{email}' was already emailed for '{service['event']}'")
+
+    with service["metrics_lock"]:
+        if email_key in service["pending"]:
+            raise RequestError(409, f"An email to '{email}' is already queued")
+        service["pending"].add(email_key)
+        service["next_job"] += 1
+        job = {"id": service["next_job"], "name": name, "email": email, "certificate": attach_certificate, "values": values, "status": "queued"}
+        service["jobs"][job["id"]] = job
+        while len(service["jobs"]) > EMAIL_JOBS_KEPT:
+            service["jobs"].popitem(last=False)
+
+    try:
+        service["email_queue"].put_nowait(job)
+    except queue.Full:
+        with service["metrics_lock"]:
+            job["status"] = "refused"
+            service["pending"].discard(email_key)
+        raise RequestError(503, "Too many emails waiting to be sent, please retry")
+
+    return 202, "application/json", json_bytes({"job": job["id"], "status": "queued", "queued": service["email_queue"].qsize()}), {}
+
+
+## --------------------------------------------------------------------------
+# Endpoint returning the status of an email job
+def email_status_endpoint(service, params):
+    """
+    GET /email/<job>: returns the status of a queued email ("queued", "sending", "sent" or "failed").
+    """
+
+    job_id = params["_path"].rsplit("/", 1)[-1]
+    with service["metrics_lock"]:
+        job = service["jobs"].get(int(job_id)) if job_id.isdigit() else None
+        status = {key: job[key] for key in ("id", "email", "status", "certificate_id") if key in job} if job is not None else None
+    if status is None:
+        raise RequestError(404, f"Unknown email job '{job_id}'")
+
+    return 200, "application/json", json_bytes(status), {}
+
+
+## --------------------------------------------------------------------------
+# Endpoint answering health checks
+def health_endpoint(service, params):
+    """
+    GET /health: answers 200 while the service runs, with the number of live SMTP senders.
+    """
+
+    alive = sum(worker.is_alive() for worker in service["senders"])
+    return 200, "application/json", json_bytes({"status": "ok", "uptime_seconds": round(time.time() - service["started_at"], 1), "senders": alive}), {}
+
+
+## --------------------------------------------------------------------------
+# Endpoint returning the metrics of the service
+def metrics_endpoint(service, params):
+    """
+    GET /metrics: request counts, status codes and latency percentiles per endpoint, requests
+    in flight, QR cache hits and the email queue.
+    """
+
+    with service["metrics_lock"]:
+        endpoints = {}
+        for path, stats in service["metrics"].items():
+            latencies = sorted(stats["latencies"])
+            endpoints[path] = {
+                "requests": stats["requests"],
+                "statuses": dict(stats["statuses"]),
+                "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+                "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2) if latencies else None,
+                "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+            }
+        emails = dict(service["email_counts"])
+        in_flight = service["in_flight"]
+
+    metrics = {
+        "uptime_seconds": round(time.time() - service["started_at"], 1),
+        "in_flight": in_flight,
+        "max_concurrency": service["max_concurrency"],
+        "qr_cache_entries": len(service["qr_cache"]),
+        "email_queue": service["email_queue"].qsize(),
+        "emails": emails,
+        "endpoints": endpoints,
+    }
+    return 200, "application/json", json_bytes(metrics), {}
+
+
+ROUTES = {
+    ("POST", "/certificate"): (certificate_endpoint, True),
+    ("GET", "/qr"): (qr_endpoint, True),
+    ("POST", "/qr"): (qr_endpoint, True),
+    ("POST", "/email"): (email_endpoint, False),
+    ("GET", "/email/<job>"): (email_status_endpoint, False),
+    ("GET", "/health"): (health_endpoint, False),
+    ("GET", "/metrics"): (metrics_endpoint, False),
+}
+
+
+## --------------------------------------------------------------------------
+# Function to record a served request in the metrics
+def record_request(service, path, status, latency):
+    """
+    Counts a request and its status, and keeps its latency for the percentiles.
+    """
+
+    with service["metrics_lock"]:
+        stats = service["metrics"].setdefault(path, {"requests": 0, "statuses": {}, "latencies": deque(maxlen=LATENCY_WINDOW)})
+        stats["requests"] += 1
+        stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+        stats["latencies"].append(latency)
+
+
+## --------------------------------------------------------------------------
+# Function to send the queued emails over a warm SMTP session
+def send_worker(service, server):
+    """
+    Takes email jobs off the queue and sends them over its own SMTP session, rendering the
+    certificate first if the job attaches one. A dropped session is reopened; a job whose
+    sending fails is marked failed and the worker carries on with the next one.
+
+    Args:
+        service (dict): The service state, see `start_service`.
+        server (smtplib.SMTP or None): A logged in SMTP session, opened again when None.
+
+    Returns:
+        None
+    """
+
+    import smtplib
+
+    while True:
+        job = service["email_queue"].get()
+        if job is None:
+            break
+        # The jobs are read by /email/<job> under the metrics lock
+        with service["metrics_lock"]:
+            job["status"] = "sending"
+        send_start = time.perf_counter()
+        sent_size = 0
+        try:
+            attachment_paths = []
+            if job["certificate"]:
+                cert_id, certificate_path = issue_service_certificate(service, job["name"], job["email"], job["values"])
+                with service["metrics_lock"]:
+                    job["certificate_id"] = cert_id
+                attachment_paths.append(certificate_path)
+            body = service["body_template"].replace("{{name}}", job["name"].title())
+            if server is None:
+                server = open_smtp_session(service["sender_email"], service["sender_password"])
+            try:
+                sent_size = send_email(server, service["sender_email"], job["email"], job["name"], service["email_subject"], body, attachment_paths)
+            except smtplib.SMTPServerDisconnected:
+                close_smtp_session(server)
+                server = open_smtp_session(service["sender_email"], service["sender_password"])
+                sent_size = send_email(server, service["sender_email"], job["email"], job["name"], service["email_subject"], body, attachment_paths)
+        except Exception as e:
+            # Network errors (see send_email) only fail this job, the session is reopened for the next one
+            logging.error(f"Email job {job['id']} to {job['email']} failed: {e!r}", extra=log_fields("send", "failed", email=job["email"], latency=time.perf_counter() - send_start, error=e))
+            if server is not None:
+                close_smtp_session(server)
+                server = None
+
+        if sent_size:
+            with service["recipient_lock"]:
+                record_send(service["recipient_index"], job["email"], job["name"], service["event"])
+        with service["metrics_lock"]:
+            job["status"] = "sent" if sent_size else "failed"
+            service["email_counts"][job["status"]] += 1
+            service["pending"].discard(normalize_email(job["email"]))
+
+    if server is not None:
+        close_smtp_session(server)
+
+
+## --------------------------------------------------------------------------
+# Function to read the JSON body of a request
+def read_json_body(handler):
+    """
+    Returns the JSON object sent as the request body, or an empty dict without a body.
+
+    Raises:
+        RequestError: If the body is too large or not a JSON object.
+    """
+
+    length = int(handler.headers.get("Content-Length") or 0)
+    if length > MAX_REQUEST_BYTES:
+        handler.close_connection = True  # The body is left unread
+        raise RequestError(413, f"Request body larger than {MAX_REQUEST_BYTES} bytes")
+    if not length:
+        return {}
+    try:
+        body = json.loads(handler.rfile.read(length))
+    except ValueError:
+        raise RequestError(400, "The request body is not valid JSON")
+    if not isinstance(body, dict):
+        raise RequestError(400, "The request body must be a JSON object")
+    return body
+
+
+## --------------------------------------------------------------------------
+# Function to write a response
+def write_response(handler, status, content_type, body, headers=None):
+    """
+    Writes the status, headers and body of a response on a keep-alive connection.
+    """
+
+    handler.send_response(status)
+    handler.send_header("Content-Type", content_type)
+    handler.send_header("Content-Length", str(len(body)))
+    for header, value in (headers or {}).items():
+        handler.send_header(header, value)
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+## --------------------------------------------------------------------------
+# Function to serve a request
+def handle_request(handler, service, method):
+    """
+    Routes a request to its endpoint in ROUTES and writes the result. The render endpoints
+    wait up to ADMISSION_TIMEOUT for one of the `max_concurrency` slots, and are answered
+    503 with a Retry-After header when the service stays busy.
+
+    Args:
+        handler (http.server.BaseHTTPRequestHandler): Handler of the connection.
+        service (dict): The service state, see `start_service`.
+        method (str): "GET" or "POST".
+
+    Returns:
+        None
+    """
+
+    start_time = time.perf_counter()
+    url = urlsplit(handler.path)
+    path = url.path.rstrip("/") or "/"
+    # The job ID is the last part of the path, e.g. /email/42
+    route_path = "/email/<job>" if method == "GET" and path.startswith("/email/") else path
+    route = ROUTES.get((method, route_path))
+
+    if route is None:
+        handler.close_connection = True  # The body of the request is left unread
+        write_response(handler, 404, "application/json", json_bytes({"error": f"No endpoint {method} {path}"}))
+        return
+    endpoint, limited = route
+
+    try:
+        params = dict(parse_qsl(url.query))
+        params.update(read_json_body(handler))
+        params["_path"] = path
+
+        if not limited:
+            status, content_type, body, headers = endpoint(service, params)
+        elif service["slots"].acquire(timeout=ADMISSION_TIMEOUT):
+            with service["metrics_lock"]:
+                service["in_flight"] += 1
+            try:
+                status, content_type, body, headers = endpoint(service, params)
+            finally:
+                with service["metrics_lock"]:
+                    service["in_flight"] -= 1
+                service["slots"].release()
+        else:
+            raise RequestError(503, "The service is busy, please retry")
+    except RequestError as e:
+        status, content_type, body, headers = e.status, "application/json", json_bytes({"error": str(e)}), {}
+        if e.status == 503:
+            headers["Retry-After"] = "1"
+    except Exception as e:
+        logging.error(f"Request {method} {path} failed: {e}", extra=log_fields("serve", "failed", error=e))
+        status, content_type, body, headers = 500, "application/json", json_bytes({"error": f"{type(e).__name__}: {e}"}), {}
+
+    write_response(handler, status, content_type, body, headers)
+    record_request(service, route_path, status, time.perf_counter() - start_time)
+
+
+## --------------------------------------------------------------------------
+# Function to create the HTTP server of the service
+def create_server(host, port, service):
+    """
+    Creates the threading HTTP server of the service, one thread per connection.
+
+    http.server is only imported here, so `--help` starts without it. HTTP/1.1 keep-alive
+    lets a client reuse its connection, Nagle's algorithm is off so small responses are not
+    held back by the client's delayed ACKs, and the listen backlog absorbs bursts of
+    connections: requests beyond the concurrency limit wait instead of being reset.
+
+    Args:
+        host (str): Address to listen on.
+        port (int): Port to listen on.
+        service (dict): The service state, see `start_service`.
+
+    Returns:
+        http.server.ThreadingHTTPServer: The server, ready for `serve_forever`.
+
+    Raises:
+        OSError: If the address cannot be listened on.
+    """
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class ServiceHTTPServer(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+    class ServiceRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+        server_version = "RegistrationService/1.0"
+
+        def do_GET(self):
+            handle_request(self, service, "GET")
+
+        def do_POST(self):
+            handle_request(self, service, "POST")
+
+        def log_message(self, format, *args):
+            pass  # Every request is counted in /metrics, errors go to the JSON log
+
+    return ServiceHTTPServer((host, port), ServiceRequestHandler)
+
+
+## --------------------------------------------------------------------------
+# Function to load the assets and start the workers of the service
+def start_service(template_file_path, font_file_path, layout, name_case, event, output_dir_path, body_template=None, sender_email=None, sender_password=None, email_subject=None, send_workers=2, max_concurrency=MAX_CONCURRENCY, recipient_index_path=DEFAULT_INDEX_PATH, certificate_index_path=DEFAULT_CERTIFICATE_INDEX_PATH):
+    """
+    Loads the template, font and logos once, renders a warm-up certificate and QR code so
+    the first request does not pay for the imports, and logs in the SMTP senders.
+
+    Args:
+        template_file_path (str): Path to the certificate template PDF.
+        font_file_path (str): TTF font of the names and the QR titles.
+        layout (dict): Layout profile of the certificates.
+        name_case (str): "upper" or "title".
+        event (str): Event of the certificate IDs and the re-send protection.
+        output_dir_path (str): Preferred output directory of the certificates.
+        body_template (str, optional): HTML email body; emailing is off without it.
+        sender_email (str, optional): The sender's email address.
+        sender_password (str, optional): The sender's Gmail App Password.
+        email_subject (str, optional): The subject of the emails.
+        send_workers (int, optional): Number of email sending threads (SMTP sessions).
+        max_concurrency (int, optional): Render requests handled at the same time.
+        recipient_index_path (str, optional): Path to the recipient index database.
+        certificate_index_path (str, optional): Path to the certificate index database.
+
+    Returns:
+        dict: The service state, shared by the request handlers and the send workers.
+
+    Raises:
+        SMTPSessionError: If a sender cannot log in.
+    """
+
+    output_folder_path = get_output_folder_path(output_dir_path)
+    os.makedirs(output_folder_path, exist_ok=True)
+
+    service = {
+        "template_bytes": load_template(template_file_path),
+        "template_hash": file_digest(template_file_path),
+        "font_name": register_font(font_file_path),
+        "font_file_path": font_file_path,
+        "layout": layout,
+        "name_case": name_case,
+        "event": event,
+        "output_folder_path": output_folder_path,
+        "certificate_index": open_certificate_index(certificate_index_path),
+        "index_lock": threading.Lock(),
+        "recipient_index": open_recipient_index(recipient_index_path),
+        "recipient_lock": threading.Lock(),
+        "qr_cache": OrderedDict(),
+        "qr_cache_lock": threading.Lock(),
+        "slots": threading.BoundedSemaphore(max_concurrency),
+        "max_concurrency": max_concurrency,
+        "in_flight": 0,
+        "body_template": body_template,
+        "sender_email": sender_email,
+        "sender_password": sender_password,
+        "email_subject": email_subject,
+        "email_queue_enabled": body_template is not None,
+        "email_queue": queue.Queue(maxsize=EMAIL_QUEUE_SIZE),
+        "senders": [],
+        "jobs": OrderedDict(),
+        "pending": set(),
+        "next_job": 0,
+        "email_counts": {"sent": 0, "failed": 0},
+        "metrics": {},
+        "metrics_lock": threading.Lock(),
+        "started_at": time.time(),
+    }
+
+    # Warm up: imports, font metrics, logo and title font caches
+    render_certificate("Warm Up", service["template_bytes"], layout, name_case, service["font_name"], "WARMUP")
+    for bg_color in ("white", "black"):
+        warm_batch_assets(bg_color, True, font_file_path)
+    add_title(add_center_image(standard_qr_gen("warm-up", "H", "white"), "white"), "Warm Up", "white", font_file_path)
+
+    if service["email_queue_enabled"]:
+        # Log in every sender up front, so authentication errors stop the service before it starts
+        servers = [open_smtp_session(sender_email, sender_password) for _ in range(send_workers)]
+        service["senders"] = [threading.Thread(target=send_worker, args=(service, server), daemon=True) for server in servers]
+        for worker in service["senders"]:
+            worker.start()
+
+    return service
+
+
+## --------------------------------------------------------------------------
+# Function to stop the service after the queued emails are sent
+def stop_service(service):
+    """
+    Lets the send workers finish the queued emails, then closes the indexes.
+
+    Args:
+        service (dict): The service state, see `start_service`.
+
+    Returns:
+        None
+    """
+
+    for _ in service["senders"]:
+        service["email_queue"].put(None)
+    for worker in service["senders"]:
+        worker.join()
+    service["certificate_index"].close()
+    service["recipient_index"].close()
+
+
+### ===========================================================================
+## Main
+#
+
+if __name__ == "__main__":
+    """
+    Runs a local HTTP service rendering certificates and QR badges on demand and emailing
+    certificates, for a registration desk.
+
+    The template, font, logos and SMTP sessions are loaded once when the service starts, so
+    each request only renders. Endpoints:
+
+        POST /certificate   {"name", "email"?}                      -> PDF (X-Certificate-Id header)
+        GET|POST /qr        {"payload", "style"?, "bg_color"?, "title"?, "center_image"?, "format"?} -> image
+        POST /email         {"name", "email", "certificate"?, "force"?} -> 202 {"job"}
+        GET /email/<job>    -> {"status"}
+        GET /health, GET /metrics
+
+    Uses the certificate template, body template and config file of the Certificate Email
+    Automation, and logs to `cert-email_log.jsonl`.
+
+    Arguments:
+        --font NAME: TTF file in the Fonts directory (required if there are several).
+        --layout, --name-case: Certificate layout profile and name case (default: event, title).
+        --host, --port: Address to listen on (default: 127.0.0.1:8765).
+        --max-concurrency: Render requests handled at the same time (default: 4).
+        --send-workers: SMTP sessions sending the queued emails (default: 2).
+        --no-email: Only render, without logging in to the mail server.
+    """
+
+    parser = argparse.ArgumentParser(description="Render certificates and QR codes on demand, and email certificates, over local HTTP.")
+    parser.add_argument("--font", help="TTF file in the Fonts directory, for the names and the QR titles")
+    parser.add_argument("--layout", choices=sorted(CERTIFICATE_LAYOUTS), default="event", help="certificate layout profile (default: event)")
+    parser.add_argument("--name-case", choices=["title", "upper"], default="title", help="case of the names on the certificates (default: title)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENCY, help=f"render requests handled at the same time (default: {MAX_CONCURRENCY})")
+    parser.add_argument("--send-workers", type=int, default=2, help="SMTP sessions sending the queued emails (default: 2)")
+    parser.add_argument("--no-email", action="store_true", help="only render certificates and QR codes, without emailing")
+    args = parser.parse_args()
+
+    if min(args.max_concurrency, args.send_workers) < 1:
+        print("\nError: --max-concurrency and --send-workers must be at least 1.\n\nExiting...\n")
+        sys.exit(1)
+
+    CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH = os.path.abspath(os.path.dirname(__file__))
+    ROOT_REPO_PATH = os.path.abspath(os.path.dirname(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH))
+    FONTS_DIR_PATH = os.path.join(ROOT_REPO_PATH, 'Fonts')
+    CERTIFICATE_TEMPLATE_DIR_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, 'Certificate_Template')
+    OUTPUT_DIR_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "Generated_Certificates")
+    BODY_TEMPLATE_FILE_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "cert-email_html_body_template.html")
+    LOG_FILE_PATH = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "cert-email_log.jsonl")
+
+    print("\n" + " Registration Service ".center(40, "-"))
+
+    config = load_config(os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "cert-email_config.json"))
+    sender_email = config.get("sender_email", "").strip()
+    email_subject = config.get("email_subject", "").strip()
+    passwd = config.get("gmail_app_password", "").strip()
+    event_name = config.get("event_name", "").strip() or email_subject or CERTIFICATE_LAYOUTS[args.layout]["title"]
+
+    body_template = None
+    if not args.no_email:
+        if sender_email == "" or email_subject in ["", "Subject"]:
+            print("\nError: Please configure all fields properly in the config file, or run with --no-email.\n\nExiting...\n")
+            sys.exit(1)
+        check_gmail_app_password(passwd)
+        initialize_necessary_files(BODY_TEMPLATE_FILE_PATH)
+        check_body_template(BODY_TEMPLATE_FILE_PATH)
+        body_template = read_email_body_template(BODY_TEMPLATE_FILE_PATH)
+
+    template_file = get_single_file('Certificate_Template', CERTIFICATE_TEMPLATE_DIR_PATH, 'PDF')
+    font_files = sorted(get_files(FONTS_DIR_PATH, 'TTF'))
+    font_file = args.font or (font_files[0] if len(font_files) == 1 else None)
+    if font_file not in font_files:
+        print(f"\n{'Font ' + repr(args.font) + ' not found' if args.font else 'Please choose a font with --font'}. Fonts available:")
+        print("\n".join(f"  {file}" for file in font_files) or "  (none, add a TTF file to the Fonts directory)")
+        print("\nExiting...\n")
+        sys.exit(1)
+    font_file_path = os.path.join(FONTS_DIR_PATH, font_file)
+
+    initialize_necessary_files(log_file=LOG_FILE_PATH)
+    start_structured_logging(LOG_FILE_PATH)
+
+    try:
+        service = start_service(
+            os.path.join(CERTIFICATE_TEMPLATE_DIR_PATH, template_file), font_file_path, CERTIFICATE_LAYOUTS[args.layout], args.name_case,
+            event_name, OUTPUT_DIR_PATH, body_template, sender_email, passwd, email_subject, args.send_workers, args.max_concurrency,
+        )
+    except SMTPSessionError as e:
+        print(f"\n{e}\n\nExiting...\n")
+        sys.exit(1)
+
+    try:
+        server = create_server(args.host, args.port, service)
+    except OSError as e:
+        print(f"\nError: Cannot listen on {args.host}:{args.port}\n{e}\n\nExiting...\n")
+        sys.exit(1)
+
+    print(f"\nServing on http://{args.host}:{args.port} (event '{event_name}', {'emailing with ' + str(args.send_workers) + ' sender(s)' if body_template else 'emailing off'}).")
+    print(f"Certificates are saved to \"{os.path.basename(service['output_folder_path'])}\". Press Ctrl+C to stop.\n")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n\nStopping... {service['email_queue'].qsize()} queued email(s) are sent first.\n")
+    finally:
+        server.server_close()
+        stop_service(service)
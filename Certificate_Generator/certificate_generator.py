@@ -1,135 +1,1288 @@
+import io
 import os
+import re
 import sys
+import math
+import argparse
+import unicodedata
+from datetime import date
+from contextlib import nullcontext
 
 # Get the parent directory, add it to python path and import the modules
 parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(parent_dir)
+sys.path.append(os.path.join(parent_dir, "QRCode_Generator"))
 
-from Utilities.utils import get_files, get_single_file, read_wordlist, select_font
-
-try:
-    from PyPDF2 import PdfWriter, PdfReader
-    from reportlab.lib.colors import HexColor
-    from reportlab.lib.pagesizes import A4, landscape
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    from reportlab.pdfgen import canvas
-except ImportError:
-    print("\nThis script requires the \'reportlab\' and \'PyPDF2\' modules.\n\nPlease install them using \'pip install reportlab PyPDF2\' and try again.\n")
-    sys.exit(1)
+from Utilities.asset_cache import read_asset_bytes, register_pdf_font
+from Utilities.bundle import add_bundle_arguments, add_to_bundle, bundle_options_from_args, close_bundle, describe_bundle, open_bundle
+from Utilities.glyph_coverage import describe_characters, load_coverage_index, missing_characters, pick_covering_font
+from Utilities.output_layout import add_output_layout_argument, atomic_write, certificate_paths, claim_certificate_path, is_sharded, open_output_folder
+from Utilities.certificate_index import DEFAULT_CERTIFICATE_INDEX_PATH, assign_certificate_id, certificate_row_key, open_certificate_index, record_certificate
+from Utilities.profiling import add_profile_arguments, profile_stage, start_profiling_from_args
+from Utilities.progress import finish_progress, start_progress, update_progress
+from Utilities.stage_cache import certificate_key, file_digest, load_previous_manifest, reuse_file, write_manifest
+from Utilities.utils import certificate_filename, get_single_file, read_wordlist, select_font
+
+# PDF modules, imported at first use by `import_pdf_modules` so that --help and the
+# scripts importing this module start without loading reportlab and PyPDF2
+PdfWriter = PdfReader = HexColor = A4 = landscape = pdfmetrics = canvas = None
+
+# Optional right-to-left shaping modules, imported at first use by `import_bidi_modules`
+arabic_reshaper = get_display = None
+
+
+# Layout profiles of the certificate templates
+# Adjust these parameters as per your requirements
+# "fields" are the texts drawn on the template:
+#   "text": {name}, {event}, {date}, {certificate_id}, {email} or {<spreadsheet column>} are filled in
+#   "position": (x, y) of the anchor in points, "align": "left", "center" or "right" of the anchor
+#   "font": TTF file in the Fonts directory (optional, the selected font by default)
+#   "max_width": widest the text may be in points; longer texts are shrunk, down to "min_font_size"
+# "qr" stamps a verification QR code (bottom-left corner at "position", "size" points wide); remove it to disable
+CERTIFICATE_LAYOUTS = {
+    "membership": {
+        "title": "Membership Certificate",
+        "fields": [
+            {
+                "text": "{name}",
+                "position": (421, 264),
+                "align": "center",
+                "font_size": 31.5,
+                "min_font_size": 18,
+                "max_width": 640,
+                "font_color": "#55D3E2",
+                "char_spacing": 1.5,
+            },
+        ],
+        "qr": {
+            "url": "https://cyberelites.org/verify?id={id}",
+            "position": (752, 20),
+            "size": 70,
+            "color": "#000000",
+            "background": "#ffffff",
+        },
+    },
+    "event": {
+        "title": "Event Certificate",
+        "fields": [
+            {
+                "text": "{name}",
+                "position": (421, 242),
+                "align": "center",
+                "font_size": 34,
+                "min_font_size": 18,
+                "max_width": 640,
+                "font_color": "#ffffff",
+                "char_spacing": 1.15,
+            },
+        ],
+        "qr": {
+            "url": "https://cyberelites.org/verify?id={id}",
+            "position": (752, 20),
+            "size": 70,
+            "color": "#000000",
+            "background": "#ffffff",
+        },
+    },
+}
+
+# Fonts of the Fonts directory tried in order for texts the selected font has no glyphs for
+# (e.g. add "NotoSansDevanagari-Regular.ttf" for Devanagari names); only TTF files can be used
+FONT_FALLBACKS = [
+    "Open Sans Regular.ttf",
+]
+
+FONT_NAME = "CustomFont"
+FIELD_FONT_NAME = "FieldFont"
+FALLBACK_FONT_NAME = "FallbackFont"
+NAME_CASES = {1: "upper", 2: "title"}
+FIELD_ALIGNMENTS = ("left", "center", "right")
+FIELD_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+FIELD_VALUES = ("name", "event", "date", "certificate_id", "email")  # Filled in without a spreadsheet column
+FONT_SIZE_STEP = 0.5    # Shrunk font sizes are rounded down to this step
+DATE_FORMAT = "%d %B %Y"
+LAYOUT_FONTS_DIR_PATH = os.path.join(parent_dir, "Fonts")
+
+# Options of a certificate run and their defaults, see `generate_certificates`
+RUN_OPTIONS = {
+    "event": None,                      # Required, part of every certificate ID
+    "emails": None,                     # Email address of each name
+    "rows": None,                       # Spreadsheet row of each name, for the column fields
+    "categories": None,                 # Category of each name, with "routes"
+    "routes": None,                     # Category -> (template_file_path, layout)
+    "use_cache": True,                  # Reuse unchanged certificates of the previous run
+    "certificate_index_path": DEFAULT_CERTIFICATE_INDEX_PATH,
+    "bundle_options": None,             # {"format", "compression", "volume_size"} of the bundle archive
+    "output_layout": "auto",            # "flat", "sharded", or "auto" to shard large runs
+}
 
+# Advance width of each character at 1 pt, per registered font
+_advance_widths = {}
+# Font file of each registered font name, for its glyph coverage
+_font_files = {}
+# Glyph coverage of the Fonts directory, loaded once per process
+_coverage_index = {}
+
+
+## ===========================================================================
+### Functions
 
 ## --------------------------------------------------------------------------
-# Function to generate the certificates with appropriate names
-def generate_certificates(template_file_path, wordlist_contents):
+# Function to import the PDF modules at first use
+def import_pdf_modules():
+    """
+    Imports reportlab and PyPDF2 into the module the first time they are needed.
+
+    Returns:
+        None
+
+    Exits:
+        Exits the program if the modules are not installed.
     """
-    Generates personalized certificates by combining a template PDF with names from a wordlist.
+
+    global PdfWriter, PdfReader, HexColor, A4, landscape, pdfmetrics, canvas
+
+    if canvas is not None:
+        return
+
+    try:
+        from PyPDF2 import PdfWriter, PdfReader
+        from reportlab.lib.colors import HexColor
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfgen import canvas
+    except ImportError:
+        print("\nThis script requires the \'reportlab\' and \'PyPDF2\' modules.\n\nPlease install them using \'pip install reportlab PyPDF2\' and try again.\n")
+        sys.exit(1)
+
+
+## --------------------------------------------------------------------------
+# Function to register the font used for the names
+def register_font(font_file_path, font_name=FONT_NAME):
+    """
+    Registers a TrueType font with reportlab.
 
     Args:
-        template_file_path (str): Path to the template PDF file.
-        wordlist_contents (list): List of names to be included on the certificates.
+        font_file_path (str): Path to the TTF file.
+        font_name (str, optional): Name to register the font under.
 
     Returns:
-        str: Path to the directory containing the generated certificates.
+        str: The registered font name.
 
-    Raises:
-        KeyboardInterrupt: If the user interrupts the process.
-        Exception: For any error occurring during certificate generation.
+    Exits:
+        Exits the program if the font file is invalid.
     """
 
-    font_file = select_font(FONTS_DIR_PATH)
-    font_file_path = os.path.join(FONTS_DIR_PATH, font_file)
-
     try:
-        # Register the custom font
-        pdfmetrics.registerFont(TTFont('CustomFont', font_file_path))
+        # Registered only once per process, even across several runs
+        font_name = register_pdf_font(font_file_path, font_name)
     except:
         print("\nInvalid Font file!\nPlease ensure that you use a valid TTF file.\n\nExiting...\n")
         sys.exit(1)
 
+    _font_files[font_name] = os.path.abspath(font_file_path)
+    return font_name
+
+
+## --------------------------------------------------------------------------
+# Function to import the right-to-left shaping modules at first use
+def import_bidi_modules():
+    """
+    Imports arabic_reshaper and python-bidi the first time a right-to-left text is drawn.
+
+    Returns:
+        bool: True if the modules are installed.
+    """
+
+    global arabic_reshaper, get_display
+
+    if get_display is None:
+        try:
+            import arabic_reshaper
+            from bidi.algorithm import get_display
+        except ImportError:
+            return False
+
+    return True
+
+
+## --------------------------------------------------------------------------
+# Function to check for right-to-left text
+def is_right_to_left(text):
+    """
+    Returns True if a text contains right-to-left characters (Arabic, Hebrew, ...).
+    """
+
+    return any(unicodedata.bidirectional(char) in ("R", "AL") for char in text)
+
+
+## --------------------------------------------------------------------------
+# Function to put a text in drawing order
+def shape_text(text):
+    """
+    Returns a text the way reportlab should draw it, character by character from left to right.
+
+    The text is NFC normalised, so accents typed as combining marks use the precomposed
+    glyphs most fonts have. Right-to-left texts are joined (Arabic letter forms) and
+    reordered with the optional 'arabic-reshaper' and 'python-bidi' modules; without them
+    they are left as is and reported by `layout_problems`.
+
+    Args:
+        text (str): The text in logical order.
+
+    Returns:
+        str: The text in drawing order.
+    """
+
+    text = unicodedata.normalize("NFC", text)
+    if is_right_to_left(text) and import_bidi_modules():
+        text = get_display(arabic_reshaper.reshape(text))
+
+    return text
+
+
+## --------------------------------------------------------------------------
+# Function to get the glyph coverage of a registered font
+def font_coverage(font_name):
+    """
+    Returns the codepoints covered by a registered font, from the glyph coverage index of the
+    Fonts directory (see `Utilities.glyph_coverage`), read once per process.
+
+    Args:
+        font_name (str): Registered font name.
+
+    Returns:
+        frozenset or None: The covered codepoints, None for a font outside the Fonts directory.
+    """
+
+    font_file_path = _font_files.get(font_name)
+    if font_file_path is None or os.path.dirname(font_file_path) != os.path.abspath(LAYOUT_FONTS_DIR_PATH):
+        return None
+
+    if not _coverage_index:
+        _coverage_index.update(load_coverage_index(LAYOUT_FONTS_DIR_PATH))
+
+    return _coverage_index.get(os.path.basename(font_file_path))
+
+
+## --------------------------------------------------------------------------
+# Function to pick the font a text is drawn with
+def covering_font(text, font_name):
+    """
+    Returns the registered font to draw a text with: `font_name` if it has a glyph for every
+    character, otherwise the first font of FONT_FALLBACKS that has, registered on first use.
+
+    Each check is one pass over the text with set lookups in the glyph coverage index, so
+    no font is opened to find out.
+
+    Args:
+        text (str): The text to draw.
+        font_name (str): Registered font chosen for the text.
+
+    Returns:
+        str or None: The registered font name, or None if no font of the chain covers the text.
+    """
+
+    codepoints = font_coverage(font_name)
+    if codepoints is None or not missing_characters(text, codepoints):
+        return font_name
+
+    font_file = pick_covering_font(text, FONT_FALLBACKS, _coverage_index)
+    if font_file is None:
+        return None
+
+    return register_font(os.path.join(LAYOUT_FONTS_DIR_PATH, font_file), FALLBACK_FONT_NAME)
+
+
+## --------------------------------------------------------------------------
+# Function to read the certificate template once
+def load_template(template_file_path):
+    """
+    Reads the certificate template into memory so it is only read from disk once per process.
+
+    Args:
+        template_file_path (str): Path to the template PDF file.
+
+    Returns:
+        bytes: The contents of the template PDF.
+
+    Exits:
+        Exits the program if the template cannot be read or is not a valid PDF.
+    """
+
+    import_pdf_modules()
     try:
-        name_case = int(input("\nSelect Case for the Names: \n\n  1. UPPERCASE\n  2. Title Case\n\n--> "))
-    except (KeyboardInterrupt, EOFError):
-        print("\n\nKeyboard Interrupt!\n\nExiting...\n")
-        sys.exit(1)
-    except Exception as e:
-        print("\n\nInvalid Input!\nPlease select correct case index.\n\nExiting...\n")
+        template_bytes = bytes(read_asset_bytes(template_file_path))
+        PdfReader(io.BytesIO(template_bytes)).pages[0]
+    except:
+        print("\nError in reading PDF template!\nPlease ensure that the file is in the correct directory and not corrupted.\n\nExiting...\n")
         sys.exit(1)
 
-    if name_case not in [1, 2]:
-        print("\n\nInvalid Input!\nPlease select correct case index.\n\nExiting...\n")
-        sys.exit(1)
+    return template_bytes
+
+
+## --------------------------------------------------------------------------
+# Function to get the text of the verification QR code
+def certificate_qr_payload(cert_id, layout):
+    """
+    Returns the text encoded in the verification QR code, or None if the layout has no QR code.
+
+    Args:
+        cert_id (str): The certificate ID, see `Utilities.certificate_index`.
+        layout (dict): Layout profile of the certificate.
+
+    Returns:
+        str or None: The verification URL with the certificate ID filled in.
+    """
+
+    qr = layout.get("qr")
+    if not qr or not cert_id:
+        return None
+
+    url = qr.get("url", "{id}")
+    return url.replace("{id}", cert_id) if "{id}" in url else url + cert_id
+
+
+## --------------------------------------------------------------------------
+# Function to draw a QR code as vector rectangles
+def draw_qr(new_canvas, payload, qr_layout):
+    """
+    Draws a QR code into a reportlab canvas as one path of merged module runs.
+
+    The modules come from `qr_matrix`/`qr_shapes` of the QR Code Generator. A fixed mask
+    and the smallest fitting version keep the encoding to about a millisecond.
+
+    Args:
+        new_canvas (reportlab.pdfgen.canvas.Canvas): The overlay canvas.
+        payload (str): Text to encode.
+        qr_layout (dict): The "qr" entry of the layout (position, size, color, background).
+
+    Returns:
+        None
+    """
+
+    # The QR Code Generator is only loaded by layouts with a QR code
+    from qrcode_generator import qr_matrix, qr_shapes
+
+    with profile_stage("encode"):
+        matrix = qr_matrix(payload, "standard", "M", version=None, mask_pattern=0)
+    modules = len(matrix)
+    x, y = qr_layout["position"]
+
+    # Drawn in a form XObject, which PyPDF2 copies as is when merging instead of parsing every operator
+    new_canvas.beginForm("VerificationQR")
+    new_canvas.saveState()
+    new_canvas.translate(x, y)
+    new_canvas.scale(qr_layout["size"] / modules, qr_layout["size"] / modules)
+
+    # Light square behind the code, the matrix border is the quiet zone
+    if qr_layout.get("background"):
+        new_canvas.setFillColor(HexColor(qr_layout["background"]))
+        new_canvas.rect(0, 0, modules, modules, stroke=0, fill=1)
+
+    runs, _ = qr_shapes(matrix, "standard")
+    path = new_canvas.beginPath()
+    for row, col, length in runs:
+        path.rect(col, modules - row - 1, length, 1)
+    new_canvas.setFillColor(HexColor(qr_layout.get("color", "#000000")))
+    new_canvas.drawPath(path, stroke=0, fill=1)
+    new_canvas.restoreState()
+    new_canvas.endForm()
+    new_canvas.doForm("VerificationQR")
+
+
+## --------------------------------------------------------------------------
+# Function to get the fields of a layout
+def layout_fields(layout):
+    """
+    Returns the fields drawn by a layout profile. A profile without "fields" draws the name
+    only, from its top-level font_size, font_color, position and char_spacing.
+
+    Args:
+        layout (dict): Layout profile of the certificate.
+
+    Returns:
+        list: The field specs, see CERTIFICATE_LAYOUTS.
+    """
+
+    if "fields" in layout:
+        return layout["fields"]
+
+    field = {key: layout[key] for key in ("font_size", "font_color", "position", "char_spacing", "max_width", "min_font_size") if key in layout}
+    field["text"] = "{name}"
+    return [field]
+
+
+## --------------------------------------------------------------------------
+# Function to get the spreadsheet columns used by layouts
+def layout_columns(layouts):
+    """
+    Returns the spreadsheet columns the fields of the layouts refer to, i.e. their
+    placeholders other than FIELD_VALUES.
+
+    Args:
+        layouts (list): Layout profiles.
+
+    Returns:
+        list: The column names, in order of first use.
+    """
+
+    columns = []
+    for layout in layouts:
+        for field in layout_fields(layout):
+            for column in FIELD_PLACEHOLDER.findall(field["text"]):
+                column = column.strip()
+                if column not in FIELD_VALUES and column not in columns:
+                    columns.append(column)
+
+    return columns
+
+
+## --------------------------------------------------------------------------
+# Function to get the values filled in the fields of a certificate
+def field_values(name, name_case="title", values=None):
+    """
+    Returns the values of the field placeholders: the given values (spreadsheet columns,
+    event, certificate ID, ...), the name in its case, and today's date unless given.
+
+    The name is NFC normalised first, as accents typed as combining marks would otherwise
+    start a new word for `str.title` ("MüLler").
+
+    Args:
+        name (str): Name to print on the certificate.
+        name_case (str, optional): "upper" or "title".
+        values (dict, optional): Other values, e.g. the spreadsheet row.
+
+    Returns:
+        dict: The placeholder values.
+    """
+
+    values = dict(values or {})
+    name = unicodedata.normalize("NFC", name)
+    values["name"] = name.upper() if name_case == "upper" else name.title()
+    values.setdefault("date", date.today().strftime(DATE_FORMAT))
+
+    return values
+
+
+## --------------------------------------------------------------------------
+# Function to get the registered font of a field
+def field_font(field, font_name=FONT_NAME):
+    """
+    Returns the registered font a field is drawn with: its "font" from the Fonts directory,
+    or the selected font.
+
+    Exits:
+        Exits the program if the font file is invalid.
+    """
+
+    if not field.get("font"):
+        return font_name
+
+    return register_font(os.path.join(LAYOUT_FONTS_DIR_PATH, field["font"]), FIELD_FONT_NAME)
+
+
+## --------------------------------------------------------------------------
+# Function to measure a text with the cached advance widths
+def text_advance(text, font_name):
+    """
+    Returns the width of a text at 1 pt, without character spacing.
+
+    The advance width of each character is measured once per font and cached, so fitting a
+    field is a sum of table lookups instead of a trial render at every size.
+
+    Args:
+        text (str): The text.
+        font_name (str): Registered font of the text.
+
+    Returns:
+        float: The width in points of the text at font size 1.
+    """
+
+    import_pdf_modules()
+    widths = _advance_widths.setdefault(font_name, {})
+    advance = 0
+    for char in text:
+        width = widths.get(char)
+        if width is None:
+            width = widths[char] = pdfmetrics.stringWidth(char, font_name, 1000) / 1000
+        advance += width
+
+    return advance
+
+
+## --------------------------------------------------------------------------
+# Function to count the character spacing gaps of a text
+def spacing_gaps(text):
+    """
+    Returns the number of character spacings in a text: one before each character but the
+    first, except combining marks (accents), which stay on their base character.
+    """
+
+    return max(sum(1 for char in text if not unicodedata.combining(char)) - 1, 0)
+
+
+## --------------------------------------------------------------------------
+# Function to fit a text in the width of its field
+def fit_field(field, text, font_name):
+    """
+    Returns the font size a text is drawn at: the field's "font_size", or the largest size
+    (in FONT_SIZE_STEP steps) that fits in its "max_width", but not below "min_font_size".
+
+    The width is linear in the font size (advance * size + spacing), so the fitting size is
+    solved directly from the cached advance instead of being searched for.
+
+    Args:
+        field (dict): The field spec.
+        text (str): The text of the field.
+        font_name (str): Registered font of the field.
+
+    Returns:
+        tuple: (font_size, fits) where `fits` is False if the text overflows even at "min_font_size".
+    """
+
+    font_size = field["font_size"]
+    max_width = field.get("max_width")
+    if not max_width or not text:
+        return font_size, True
+
+    advance = text_advance(text, font_name)
+    spacing = field.get("char_spacing", 0) * spacing_gaps(text)
+    if advance * font_size + spacing <= max_width:
+        return font_size, True
+
+    fitted = math.floor((max_width - spacing) / advance / FONT_SIZE_STEP) * FONT_SIZE_STEP
+    min_font_size = field.get("min_font_size", font_size)
+
+    return max(fitted, min_font_size), fitted >= min_font_size
+
+
+## --------------------------------------------------------------------------
+# Function to lay out the fields of a certificate
+def place_fields(layout, values, font_name=FONT_NAME):
+    """
+    Fills in and fits every field of a layout.
+
+    Each text is put in drawing order (see `shape_text`) and drawn with the field's font, or
+    with the first font of FONT_FALLBACKS that has its glyphs (see `covering_font`). A text
+    no font covers keeps the field's font and is reported by `layout_problems`.
+
+    Args:
+        layout (dict): Layout profile of the certificate.
+        values (dict): The placeholder values, see `field_values`.
+        font_name (str, optional): The selected font, for the fields without their own.
+
+    Returns:
+        list: (field, text, font_name, font_size, fits) of each field.
+
+    Raises:
+        KeyError: If a field refers to a value that is not given.
+    """
+
+    placed = []
+    for field in layout_fields(layout):
+        text = shape_text(FIELD_PLACEHOLDER.sub(lambda match: str(values[match.group(1).strip()]), field["text"]))
+        text_font_name = field_font(field, font_name)
+        text_font_name = covering_font(text, text_font_name) or text_font_name
+        font_size, fits = fit_field(field, text, text_font_name)
+        placed.append((field, text, text_font_name, font_size, fits))
+
+    return placed
+
+
+## --------------------------------------------------------------------------
+# Function to find the fields of a certificate that cannot be drawn
+def layout_problems(layout, values, font_name=FONT_NAME):
+    """
+    Returns why a certificate cannot be laid out: fields referring to missing values, texts
+    with characters no font of the fallback chain has a glyph for (which would be drawn as
+    empty boxes), and texts wider than their "max_width" even at their "min_font_size".
+
+    Args:
+        layout (dict): Layout profile of the certificate.
+        values (dict): The placeholder values, see `field_values`.
+        font_name (str, optional): The selected font.
+
+    Returns:
+        list: A message per problem, empty if every field fits.
+    """
+
+    try:
+        placed = place_fields(layout, values, font_name)
+    except KeyError as e:
+        return [f"no value for the {{{e.args[0]}}} field"]
+
+    problems = []
+    for field, text, text_font_name, font_size, fits in placed:
+        if field.get("align", "center") not in FIELD_ALIGNMENTS:
+            problems.append(f"invalid align '{field['align']}' of the '{field['text']}' field")
+        if is_right_to_left(text) and not import_bidi_modules():
+            problems.append(f"'{text}' is right-to-left, please install the 'arabic-reshaper' and 'python-bidi' modules")
+        codepoints = font_coverage(text_font_name)
+        missing = missing_characters(text, codepoints) if codepoints is not None else []
+        if missing:
+            problems.append(f"no font has glyphs for {describe_characters(missing)}")
+        elif not fits:
+            width = text_advance(text, text_font_name) * font_size + field.get("char_spacing", 0) * spacing_gaps(text)
+            problems.append(f"'{text}' is {width:.0f} pt wide at {font_size} pt, wider than {field['max_width']} pt")
+
+    return problems
+
+
+## --------------------------------------------------------------------------
+# Function to check every certificate of a batch before rendering
+def check_layout_fit(certificates, font_name=FONT_NAME):
+    """
+    Lays out every certificate of a batch without rendering it, so overflowing texts and
+    missing values or glyphs stop the run before the first certificate is written.
 
-    # Define a single temporary file path
-    tmp_file = os.path.join(TEMPORARY_DIR_PATH, "tmp_file.pdf")
-    os.makedirs(TEMPORARY_DIR_PATH, exist_ok=True)
+    Args:
+        certificates (list): (name, layout, values) of each certificate, `values` as
+                             returned by `field_values`.
+        font_name (str, optional): The selected font.
+
+    Returns:
+        None
+
+    Exits:
+        Exits the program if any field cannot be drawn.
+    """
+
+    failed = []
+    for name, layout, values in certificates:
+        problems = layout_problems(layout, values, font_name)
+        if problems:
+            failed.append((name, problems))
+    if not failed:
+        return
+
+    print(f"\nError: The fields of {len(failed)} certificate(s) cannot be laid out:")
+    for name, problems in failed[:10]:
+        print(f"  {name}: {'; '.join(problems)}")
+    if len(failed) > 10:
+        print(f"  ... and {len(failed) - 10} more")
+    print("\nPlease shorten the texts, adjust \"max_width\" and \"min_font_size\" in CERTIFICATE_LAYOUTS,\nor add fonts covering the missing characters to FONT_FALLBACKS.\n\nExiting...\n")
+    sys.exit(1)
+
+
+## --------------------------------------------------------------------------
+# Function to put the overlay of a certificate on its template
+def stamp_template(template_bytes, overlay):
+    """
+    Draws the template page under the overlay page and returns the certificate PDF.
+
+    The template page is embedded as a form XObject which the overlay page draws first, so no
+    content stream is parsed again. `PageObject.merge_page` re-parses both content streams
+    (and then their concatenation) for every certificate, which was most of the merge time.
+
+    Args:
+        template_bytes (bytes): The template PDF, as returned by `load_template`.
+        overlay (io.BytesIO): The overlay PDF drawn by reportlab.
+
+    Returns:
+        bytes: The certificate PDF.
+    """
+
+    from PyPDF2.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
+
+    # A reader per certificate keeps the threads of the service apart, it parses in a fraction of a millisecond
+    template_page = PdfReader(io.BytesIO(template_bytes)).pages[0]
+    output = PdfWriter()
+    page = output.add_page(PdfReader(overlay).pages[0])
+
+    template_contents = template_page.get("/Contents")
+    template_contents = template_contents.get_object() if template_contents is not None else []
+    if not isinstance(template_contents, ArrayObject):
+        template_contents = [template_contents]
+    template_form = DecodedStreamObject()
+    template_form.set_data(b"\n".join(stream.get_object().get_data() for stream in template_contents))
+    template_form.update({
+        NameObject("/Type"): NameObject("/XObject"),
+        NameObject("/Subtype"): NameObject("/Form"),
+        NameObject("/BBox"): ArrayObject(template_page.mediabox),
+        NameObject("/Resources"): template_page.get("/Resources", DictionaryObject()).get_object().clone(output),
+    })
+
+    resources = page["/Resources"].get_object()
+    if "/XObject" not in resources:
+        resources[NameObject("/XObject")] = DictionaryObject()
+    resources["/XObject"].get_object()[NameObject("/CertificateTemplate")] = template_form
+
+    draw_template = DecodedStreamObject()
+    draw_template.set_data(b"q /CertificateTemplate Do Q\n")
+    overlay_contents = page["/Contents"].get_object()
+    page[NameObject("/Contents")] = ArrayObject([draw_template] + (list(overlay_contents) if isinstance(overlay_contents, ArrayObject) else [page["/Contents"]]))
+
+    # The certificate keeps the page boxes, rotation and links of the template
+    page[NameObject("/MediaBox")] = ArrayObject(template_page.mediabox)
+    for key in ("/CropBox", "/Rotate", "/Annots"):
+        if key in template_page:
+            page[NameObject(key)] = template_page[key].clone(output, False, ("/P",))
+        elif key in page:
+            del page[key]
+
+    certificate = io.BytesIO()
+    output.write(certificate)
+
+    return certificate.getvalue()
+
+
+## --------------------------------------------------------------------------
+# Function to render a single certificate
+def render_certificate(name, template_bytes, layout, name_case="title", font_name=FONT_NAME, qr_payload=None, values=None):
+    """
+    Renders one personalized certificate in memory.
+
+    Args:
+        name (str): Name to print on the certificate.
+        template_bytes (bytes): The template PDF, as returned by `load_template`.
+        layout (dict): Layout profile (fields, qr).
+        name_case (str, optional): "upper" or "title".
+        font_name (str, optional): Registered font to draw the fields with.
+        qr_payload (str, optional): Text of the verification QR code, drawn if the layout has a "qr" entry.
+        values (dict, optional): Values of the other field placeholders, see `field_values`.
+
+    Returns:
+        bytes: The generated certificate PDF.
+
+    Raises:
+        KeyError: If a field refers to a value that is not given.
+    """
+
+    import_pdf_modules()
+    placed = place_fields(layout, field_values(name, name_case, values), font_name)
+
+    with profile_stage("render"):
+        # Create a canvas
+        overlay = io.BytesIO()
+        new_canvas = canvas.Canvas(overlay, pagesize=landscape(A4))
+
+        for field, text, text_font_name, font_size, _ in placed:
+            new_canvas.setFont(text_font_name, font_size)
+            new_canvas.setFillColor(HexColor(field.get("font_color", "#000000")))
+
+            # Width of the text with character spacing, from the cached advance widths
+            char_spacing = field.get("char_spacing", 0)
+            total_text_width = text_advance(text, text_font_name) * font_size + char_spacing * spacing_gaps(text)
+            widths = _advance_widths[text_font_name]
+
+            # Draw each character with the specified spacing, aligned on the position
+            x_offset, y = field["position"]
+            align = field.get("align", "center")
+            if align == "center":
+                x_offset -= total_text_width / 2
+            elif align == "right":
+                x_offset -= total_text_width
+            for index, char in enumerate(text):
+                # Combining marks are drawn right after their base character, without spacing
+                if index and not unicodedata.combining(char):
+                    x_offset += char_spacing
+                new_canvas.drawString(x_offset, y, char)
+                x_offset += widths[char] * font_size
+
+        if qr_payload and layout.get("qr"):
+            draw_qr(new_canvas, qr_payload, layout["qr"])
+
+        new_canvas.save()
+        overlay.seek(0)
+
+    with profile_stage("merge"):
+        # Add the "watermark" (the new pdf) on the template page
+        return stamp_template(template_bytes, overlay)
+
+
+## --------------------------------------------------------------------------
+# Function to prepare the certificate cache of a run
+def open_certificate_cache(template_file_path, font_file_path, layout, name_case, output_dir_path):
+    """
+    Hashes the template and font, and loads the manifest of the previous run, so unchanged
+    certificates can be reused instead of rendered again.
+
+    Args:
+        template_file_path (str): Path to the template PDF file.
+        font_file_path (str): Path to the TTF font for the names.
+        layout (dict): Layout profile of the certificate.
+        name_case (str): "upper" or "title".
+        output_dir_path (str): Preferred output directory of the certificates.
+
+    Returns:
+        dict: The cache state, passed to `write_certificate` and `save_certificate_cache`.
+    """
+
+    previous_folder, previous = load_previous_manifest(output_dir_path)
+    return {
+        "inputs": {
+            "template": file_digest(template_file_path),
+            "font": file_digest(font_file_path),
+            "layout": layout,
+            "name_case": name_case,
+        },
+        "previous_folder": previous_folder,
+        "previous": previous,
+        "certificates": {},
+    }
+
+
+## --------------------------------------------------------------------------
+# Function to load every template of a run once
+def open_template_cache(routes, font_file_path, name_case, output_dir_path, use_cache=True):
+    """
+    Loads the template and prepares the certificate cache of each certificate category.
+
+    A template shared by several categories is read, parsed and hashed only once, and every
+    category records into the same manifest, so a batch mixing categories costs no more
+    set-up than a single template.
+
+    Args:
+        routes (dict): Maps each category to its (template_file_path, layout); a single
+                       template is the route of the `None` category.
+        font_file_path (str): Path to the TTF font for the names.
+        name_case (str): "upper" or "title".
+        output_dir_path (str): Preferred output directory of the certificates.
+        use_cache (bool, optional): Reuse unchanged certificates of the previous run.
+
+    Returns:
+        dict: Maps each category to {"template_file_path", "template_bytes", "template_hash", "layout", "cache"},
+              where "cache" is passed to `write_certificate` like the one of `open_certificate_cache`.
+    """
+
+    previous_folder, previous = load_previous_manifest(output_dir_path) if use_cache else (None, {})
+    font_digest = file_digest(font_file_path)
+    certificates = {}  # Shared by every category, written as one manifest
+    loaded = {}
+
+    templates = {}
+    for category, (template_file_path, layout) in routes.items():
+        if template_file_path not in templates:
+            templates[template_file_path] = (load_template(template_file_path), file_digest(template_file_path))
+        template_bytes, template_digest = templates[template_file_path]
+
+        loaded[category] = {
+            "template_file_path": template_file_path,
+            "template_bytes": template_bytes,
+            "template_hash": template_digest,
+            "layout": layout,
+            "cache": {
+                "inputs": {"template": template_digest, "font": font_digest, "layout": layout, "name_case": name_case},
+                "previous_folder": previous_folder,
+                "previous": previous,
+                "certificates": certificates,
+            },
+        }
+
+    return loaded
+
+
+## --------------------------------------------------------------------------
+# Function to write a single certificate, reusing the previous run's copy if unchanged
+def write_certificate(name, output_folder_path, template_bytes, layout, name_case="title", font_name=FONT_NAME, cache=None, cert_id=None, values=None, bundle=None):
+    """
+    Writes the certificate of a name into the output folder, and streams it into the bundle
+    archive if there is one.
+
+    The file is written under a temporary name and renamed into place, at the path claimed
+    for it in the (flat or sharded) output folder, see `Utilities.output_layout`.
+
+    Args:
+        name (str): Name to print on the certificate.
+        output_folder_path (str): Folder to write the certificate to.
+        template_bytes (bytes): The template PDF, as returned by `load_template`.
+        layout (dict): Layout profile of the certificate.
+        name_case (str, optional): "upper" or "title".
+        font_name (str, optional): Registered font to draw the name with.
+        cache (dict, optional): Cache state from `open_certificate_cache`.
+        cert_id (str, optional): Certificate ID, added to the filename and the verification QR code.
+        values (dict, optional): Values of the other field placeholders, see `field_values`.
+        bundle (dict, optional): Bundle state from `Utilities.bundle.open_bundle`.
+
+    Returns:
+        tuple: (certificate_path, reused) where `reused` is True if nothing was rendered.
+    """
+
+    relative_path = claim_certificate_path(output_folder_path, certificate_filename(name, cert_id), cert_id)
+    certificate_path = os.path.join(output_folder_path, relative_path)
+    archive_path = f"{os.path.basename(output_folder_path)}/{relative_path}"
+    qr_payload = certificate_qr_payload(cert_id, layout)
+
+    if cache is not None:
+        inputs = cache["inputs"]
+        texts = [text for _, text, _, _, _ in place_fields(layout, field_values(name, name_case, values), font_name)]
+        key = certificate_key(name, layout, name_case, inputs["template"], inputs["font"], qr_payload, texts)
+        cache["certificates"][relative_path] = key
+        previous_path = cache["previous"].get(key)
+        if previous_path and reuse_file(os.path.join(cache["previous_folder"], previous_path), certificate_path):
+            if bundle is not None:
+                with profile_stage("write"), open(certificate_path, "rb") as certificate_file:
+                    add_to_bundle(bundle, archive_path, certificate_file.read())
+            return certificate_path, True
+
+    certificate = render_certificate(name, template_bytes, layout, name_case, font_name, qr_payload, values)
+    with profile_stage("write"):
+        atomic_write(certificate_path, certificate)
+        if bundle is not None:
+            add_to_bundle(bundle, archive_path, certificate)
+
+    return certificate_path, False
+
+
+## --------------------------------------------------------------------------
+# Function to get the placeholder values known for a certificate
+def certificate_values(event, email=None, cert_id=None, values=None):
+    """
+    Returns the given values (e.g. the spreadsheet row) with the event, email and certificate ID added.
+
+    Args:
+        event (str): The event the certificate belongs to.
+        email (str, optional): The recipient's email address.
+        cert_id (str, optional): The certificate ID.
+        values (dict, optional): Other values of the certificate.
+
+    Returns:
+        dict: The placeholder values, completed by `field_values` with the name and date.
+    """
+
+    values = dict(values or {})
+    values.update({"event": event or "", "email": (email or "").strip(), "certificate_id": cert_id or ""})
+
+    return values
+
+
+## --------------------------------------------------------------------------
+# Function to issue a certificate: assign its ID, write it and record it in the certificate index
+def issue_certificate(certificate_index, event, name, row_key, email, output_folder_path, template_bytes, layout, name_case="title", font_name=FONT_NAME, cache=None, lock=None, values=None, bundle=None, template_hash=None):
+    """
+    Writes the certificate of a row under its certificate ID and records it for verification.
+
+    Args:
+        certificate_index (sqlite3.Connection): An open certificate index.
+        event (str): The event the certificate belongs to.
+        name (str): Name to print on the certificate.
+        row_key (str): Key of the row, see `Utilities.certificate_index.certificate_row_key`.
+        email (str or None): The recipient's email address.
+        output_folder_path (str): Folder to write the certificate to.
+        template_bytes (bytes): The template PDF, as returned by `load_template`.
+        layout (dict): Layout profile of the certificate.
+        name_case (str, optional): "upper" or "title".
+        font_name (str, optional): Registered font to draw the name with.
+        cache (dict, optional): Cache state from `open_certificate_cache`.
+        lock (threading.Lock, optional): Held around the index updates when rendering in threads.
+        values (dict, optional): Values of the other field placeholders (e.g. the spreadsheet
+                                 row); the event, email and certificate ID are added.
+        bundle (dict, optional): Bundle state from `Utilities.bundle.open_bundle`.
+        template_hash (str, optional): Digest of the template PDF, recorded in the index; see
+                                       the "template_hash" of `open_template_cache`.
+
+    Returns:
+        tuple: (certificate_path, reused, certificate_id), the first two as returned by `write_certificate`.
+    """
+
+    with lock or nullcontext():
+        cert_id = assign_certificate_id(certificate_index, event, row_key)
+
+    values = certificate_values(event, email, cert_id, values)
+    certificate_path, reused = write_certificate(name, output_folder_path, template_bytes, layout, name_case, font_name, cache, cert_id, values, bundle)
+
+    with lock or nullcontext():
+        record_certificate(certificate_index, cert_id, name, email, template_hash, certificate_path)
+
+    return certificate_path, reused, cert_id
+
+
+## --------------------------------------------------------------------------
+# Function to record the certificates of a run
+def save_certificate_cache(output_folder_path, cache):
+    """
+    Writes the manifest of the generated certificates, with the path of each, into the output folder.
+
+    Args:
+        output_folder_path (str): The output folder of the run.
+        cache (dict): Cache state from `open_certificate_cache`.
+
+    Returns:
+        None
+    """
+
+    with profile_stage("write"):
+        write_manifest(output_folder_path, cache["inputs"], cache["certificates"], certificate_paths(output_folder_path))
+
+
+## --------------------------------------------------------------------------
+# Function to record the certificates of a run with several templates
+def save_template_cache(output_folder_path, templates):
+    """
+    Writes the manifest of the certificates of every category into the output folder.
+
+    Args:
+        output_folder_path (str): The output folder of the run.
+        templates (dict): The loaded categories, see `open_template_cache`.
+
+    Returns:
+        None
+    """
+
+    caches = {category: template["cache"] for category, template in templates.items()}
+    if len(caches) == 1:
+        save_certificate_cache(output_folder_path, next(iter(caches.values())))
+        return
+
+    inputs = {category: cache["inputs"] for category, cache in caches.items()}
+    with profile_stage("write"):
+        write_manifest(output_folder_path, inputs, next(iter(caches.values()))["certificates"], certificate_paths(output_folder_path))
+
+
+## --------------------------------------------------------------------------
+# Function to get a new output directory path
+def get_output_folder_path(output_dir_path):
+    """
+    Returns `output_dir_path`, or `output_dir_path(n)` with the first free counter if it exists.
+
+    Args:
+        output_dir_path (str): The preferred output directory path.
+
+    Returns:
+        str: A directory path that does not exist yet.
+    """
 
     counter = 0
-    output_folder_path = OUTPUT_DIR_PATH
+    output_folder_path = output_dir_path
     while os.path.exists(output_folder_path):
         counter += 1
-        output_folder_path = f"{OUTPUT_DIR_PATH}({counter})"
+        output_folder_path = f"{output_dir_path}({counter})"
 
-    os.makedirs(output_folder_path, exist_ok=True)
+    return output_folder_path
 
-    print("\n\nGenerating the certificates......\n")
-    try:
-        for name in wordlist_contents:
 
-            filename = "_".join(name.split())
-            print(f"{filename}_certificate.pdf")
+## --------------------------------------------------------------------------
+# Function to open the bundle archive of an output folder
+def open_output_bundle(output_folder_path, bundle_options):
+    """
+    Opens the archive the certificates of a run are streamed into, next to its output folder
+    (e.g. `Generated_Certificates(2).zip`).
 
-            # Create a canvas and set the custom font, size, and color
-            new_canvas = canvas.Canvas(tmp_file, pagesize=landscape(A4))
-            new_canvas.setFont('CustomFont', FONT_SIZE)
-            new_canvas.setFillColor(HexColor(FONT_COLOR))
+    Args:
+        output_folder_path (str): The output folder of the run.
+        bundle_options (dict or None): {"format", "compression", "volume_size"}, see
+                                       `Utilities.bundle.bundle_options_from_args`.
 
-            # Calculate the width of the name text with character spacing
-            total_text_width = sum(pdfmetrics.stringWidth(char, 'CustomFont', FONT_SIZE) + CHAR_SPACING for char in name) - CHAR_SPACING
+    Returns:
+        dict or None: The bundle state, None without bundle options.
+    """
 
-            # Calculate the x position to center the text with character spacing
-            centered_x = POSITION[0] - (total_text_width / 2)
+    if not bundle_options:
+        return None
 
-            # Draw each character with the specified spacing
-            x_offset = centered_x
-            name = name.upper() if name_case == 1 else name.title()
+    return open_bundle(output_folder_path, bundle_options["format"], bundle_options["compression"], bundle_options.get("volume_size"))
 
-            for char in name:
-                new_canvas.drawString(x_offset, POSITION[1], char)
-                x_offset += pdfmetrics.stringWidth(char, 'CustomFont', FONT_SIZE) + CHAR_SPACING
 
-            new_canvas.save()
+## --------------------------------------------------------------------------
+# Function to finish the bundle archive of a run
+def finish_output_bundle(bundle, keep=True):
+    """
+    Finishes the bundle archive of a run and prints its volumes, or deletes the unfinished
+    volume when `keep` is False.
+    """
 
-            # Merge the canvas with the template
-            packet = open(tmp_file, "rb")
-            new_pdf = PdfReader(packet)
-            try:
-                existing_pdf = PdfReader(open(template_file_path, "rb"))
-            except:
-                print("\nError in reading PDF template!\nPlease ensure that the file is in the correct directory and not corrupted.\n\nExiting...\n")
-                sys.exit(1)
+    if bundle is None:
+        return
 
-            output = PdfWriter()
+    volume_paths = close_bundle(bundle, keep)
+    if keep:
+        print(f"\nBundled {bundle['members']} certificate(s) into {describe_bundle(volume_paths)}.")
 
-            # Add the "watermark" (the new pdf) on the existing page
-            page = existing_pdf.pages[0]
-            page.merge_page(new_pdf.pages[0])
-            output.add_page(page)
 
-            with open(f"{output_folder_path}/{filename}_certificate.pdf", "wb") as outputStream:
-                output.write(outputStream)
+## --------------------------------------------------------------------------
+# Function to generate the certificates with appropriate names
+def generate_certificates(template_file_path, names, font_file_path, layout, name_case, output_dir_path, options):
+    """
+    Generates personalized certificates by combining a template PDF with a list of names.
+
+    Each run writes a manifest of content hashes (name, layout, case, template and font) into
+    its output folder. With the "use_cache" option, certificates whose hash matches the
+    previous run are linked from there instead of being rendered again, so only changed or
+    new names cost time.
+
+    Every certificate gets an ID derived from the event and its row (the email, or the name
+    and its occurrence without emails), used in its filename and verification QR code and
+    recorded in the certificate index with the template and output hashes.
+
+    With "routes", each name is printed on the template and layout of its category instead.
+    Every template is loaded once (see `open_template_cache`) and the names are rendered
+    grouped by template, so a mixed batch runs like a single-template one.
+
+    Every field of every certificate is laid out before the first one is rendered, so a text
+    too wide for its field (see `check_layout_fit`) stops the run up front.
+
+    With "bundle_options", every certificate is also streamed into a ZIP or tar archive next
+    to the output folder as it is written, so the run ends with upload-ready volumes.
 
-            # Clear the canvas for the next iteration (Certificate)
-            new_canvas = None
+    Large runs are written into shard subfolders (see `Utilities.output_layout`), and the
+    manifest records the path of every certificate ID, so the email sender finds each
+    certificate without listing the folder.
+
+    Args:
+        template_file_path (str): Path to the template PDF file; unused with "routes".
+        names (list): List of names to be included on the certificates.
+        font_file_path (str): Path to the TTF font for the names.
+        layout (dict): Layout profile, one of CERTIFICATE_LAYOUTS; unused with "routes".
+        name_case (str): "upper" or "title".
+        output_dir_path (str): Preferred output directory; a counter is appended if it exists.
+        options (dict): Options of the run, see RUN_OPTIONS; the missing ones take their default.
+                        "event" is required. "emails", "rows" and "categories" are lists in
+                        the order of `names`; "routes" maps each category to its
+                        (template_file_path, layout), see
+                        `Utilities.certificate_categories.get_certificate_routes`.
+
+    Returns:
+        str: Path to the directory containing the generated certificates.
+
+    Raises:
+        ValueError: If an option is unknown.
+        KeyboardInterrupt: If the user interrupts the process.
+        Exception: For any error occurring during certificate generation.
+    """
+
+    unknown_options = set(options) - set(RUN_OPTIONS)
+    if unknown_options:
+        raise ValueError(f"Unknown run option(s) {', '.join(sorted(unknown_options))}, expected some of {', '.join(RUN_OPTIONS)}")
+    options = dict(RUN_OPTIONS, **options)
+    event, emails, rows = options["event"], options["emails"], options["rows"]
+    categories, routes = options["categories"], options["routes"]
+
+    # The ID only depends on the event and the row, so "John Smith" of two events would share it without one
+    if not (event or "").strip():
+        print("\nError: An event name is required for the certificate IDs.\nPlease give the event of the certificates, e.g. --event \"Hackathon 2025\".\n\nExiting...\n")
+        sys.exit(1)
+
+    if not routes:
+        routes = {None: (template_file_path, layout)}
+        categories = None
+    categories = categories or [None] * len(names)
+
+    with profile_stage("load"):
+        font_name = register_font(font_file_path)
+        templates = open_template_cache(routes, font_file_path, name_case, output_dir_path, options["use_cache"])
+
+    # Row keys follow the original order, so the certificate IDs do not depend on the grouping
+    row_keys = []
+    occurrences = {}
+    for position, name in enumerate(names):
+        email = emails[position] if emails else None
+        normalized_name = " ".join(name.split()).lower()
+        occurrences[normalized_name] = occurrences.get(normalized_name, 0) + 1
+        row_keys.append(certificate_row_key(name, email, occurrences[normalized_name]))
+
+    # The IDs are assigned up front, so the fields are laid out with the (possibly lengthened) IDs they print
+    certificate_index = open_certificate_index(options["certificate_index_path"])
+    cert_ids = [assign_certificate_id(certificate_index, event, row_key, commit=False) for row_key in row_keys]
+    certificate_index.commit()
+
+    with profile_stage("validate"):
+        check_layout_fit([
+            (name, templates[categories[position]]["layout"], field_values(name, name_case, certificate_values(
+                event, emails[position] if emails else None, cert_ids[position], rows[position] if rows else None,
+            )))
+            for position, name in enumerate(names)
+        ], font_name)
+
+    output_folder_path = open_output_folder(get_output_folder_path(output_dir_path), is_sharded(options["output_layout"], len(names)))
+
+    print("\n\nGenerating the certificates......\n")
+    progress = start_progress("Generating certificates", len(names))
+    bundle = None
+    try:
+        bundle = open_output_bundle(output_folder_path, options["bundle_options"])
+        reused = 0
+        order = sorted(range(len(names)), key=lambda position: templates[categories[position]]["template_file_path"])
+        for position in order:
+            name = names[position]
+            email = emails[position] if emails else None
+            template = templates[categories[position]]
+
+            values = rows[position] if rows else None
+
+            certificate_path, is_reused, _ = issue_certificate(certificate_index, event, name, row_keys[position], email, output_folder_path, template["template_bytes"], template["layout"], name_case, font_name, template["cache"], values=values, bundle=bundle, template_hash=template["template_hash"])
+            reused += is_reused
+            update_progress(progress, size=0 if is_reused else os.path.getsize(certificate_path))
+
+        finish_progress(progress)
+        save_template_cache(output_folder_path, templates)
+        if reused:
+            previous_folder = next(iter(templates.values()))["cache"]["previous_folder"]
+            print(f"\nReused {reused} unchanged certificate(s) from \"{os.path.basename(previous_folder)}\".")
+        finish_output_bundle(bundle)
 
         return output_folder_path
 
     except (KeyboardInterrupt, EOFError):
+        finish_output_bundle(bundle, keep=False)
         print("\n\nKeyboard Interrupt!\nAll certificates aren't generated!\n\nExiting...\n")
         sys.exit(1)
     except Exception as e:
+        finish_output_bundle(bundle, keep=False)
         print(f"\nAn error occured in certificate generation!\n{e}\n\nExiting....\n")
         sys.exit(1)
+    finally:
+        certificate_index.close()
+
+
+## --------------------------------------------------------------------------
+# Function to prompt for the certificate type
+def prompt_certificate_layout():
+    """
+    Prompts the user to select the type of certificate.
+
+    Returns:
+        dict: The selected layout profile from CERTIFICATE_LAYOUTS.
+
+    Exits:
+        Exits the program on invalid input or a keyboard interrupt.
+    """
+
+    layouts = list(CERTIFICATE_LAYOUTS.values())
+    options = "\n".join(f"  {index}. {layout['title']}" for index, layout in enumerate(layouts, start=1))
+    try:
+        certificate_type = int(input(f"\nSelect the type of certificate:\n{options}\n\n--> "))
+    except (KeyboardInterrupt, EOFError):
+        print("\n\nKeyboard Interrupt!\n\nExiting...\n")
+        sys.exit(1)
+    except Exception as e:
+        print("\n\nInvalid Input!\nPlease select correct certificate type.\n\nExiting...\n")
+        sys.exit(1)
+
+    if certificate_type not in range(1, len(layouts) + 1):
+        print("\n\nInvalid Input!\nPlease select correct certificate type.\n\nExiting...\n")
+        sys.exit(1)
+
+    return layouts[certificate_type - 1]
+
+
+## --------------------------------------------------------------------------
+# Function to prompt for the case of the names
+def prompt_name_case():
+    """
+    Prompts the user to select the case of the names.
+
+    Returns:
+        str: "upper" or "title".
+
+    Exits:
+        Exits the program on invalid input or a keyboard interrupt.
+    """
+
+    try:
+        name_case = int(input("\nSelect Case for the Names: \n\n  1. UPPERCASE\n  2. Title Case\n\n--> "))
+    except (KeyboardInterrupt, EOFError):
+        print("\n\nKeyboard Interrupt!\n\nExiting...\n")
+        sys.exit(1)
+    except Exception as e:
+        print("\n\nInvalid Input!\nPlease select correct case index.\n\nExiting...\n")
+        sys.exit(1)
+
+    if name_case not in NAME_CASES:
+        print("\n\nInvalid Input!\nPlease select correct case index.\n\nExiting...\n")
+        sys.exit(1)
+
+    return NAME_CASES[name_case]
 
 
 ### ===========================================================================
@@ -144,74 +1297,56 @@ if __name__ == "__main__":
         1. Sets up directory paths for templates, wordlists, and fonts.
         2. Reads user inputs to select certificate type and customize parameters.
         3. Calls `generate_certificates` function to create personalized certificates.
-        4. Handles automation script integration if specified in the command-line arguments.
+
+    The certificate automation script imports `generate_certificates` and calls it in-process.
+    Run with `--profile` to write the stage timings and memory peaks to a JSON report, and
+    with `--bundle zip|tar` to also stream the certificates into an archive.
     """
 
+    parser = argparse.ArgumentParser(description="Generate certificates from the template and the wordlist.")
+    add_profile_arguments(parser)
+    add_bundle_arguments(parser)
+    add_output_layout_argument(parser)
+    parser.add_argument("--event", help="name of the event the certificates are issued for, part of every certificate ID (required)")
+    args = parser.parse_args()
+    bundle_options = bundle_options_from_args(args)
+    start_profiling_from_args(args, "certificate_generator")
+
     print("\n" + " Certificate Generator ".center(35, "-"))
     CERTIFICATE_GENERATOR_DIR_PATH = os.path.abspath(os.path.dirname(__file__))
     ROOT_REPO_PATH = os.path.abspath(os.path.dirname(CERTIFICATE_GENERATOR_DIR_PATH))
     FONTS_DIR_PATH = os.path.join(ROOT_REPO_PATH, 'Fonts')
-    CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH = os.path.join(ROOT_REPO_PATH, "Certificate_Email_Automation")
-
-    automation_script = len(sys.argv) > 1 and sys.argv[1] == "extract_certify_and_email_script"
-
-    if automation_script:
-        DIR_PATH = CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH
-    else:
-        DIR_PATH = CERTIFICATE_GENERATOR_DIR_PATH
 
+    DIR_PATH = CERTIFICATE_GENERATOR_DIR_PATH
     CERTIFICATE_TEMPLATE_DIR_PATH = os.path.join(DIR_PATH, "Certificate_Template")
     WORDLIST_DIR_PATH = os.path.join(DIR_PATH, "Wordlist")
-    TEMPORARY_DIR_PATH = os.path.join(DIR_PATH, "tmp")
     OUTPUT_DIR_PATH = os.path.join(DIR_PATH, "Generated_Certificates")
 
     os.makedirs(CERTIFICATE_TEMPLATE_DIR_PATH, exist_ok=True)
     os.makedirs(WORDLIST_DIR_PATH, exist_ok=True)
     os.makedirs(FONTS_DIR_PATH, exist_ok=True)
 
-    pdf_files = get_files(CERTIFICATE_TEMPLATE_DIR_PATH, 'PDF')
     template_file = get_single_file('Certificate_Template', CERTIFICATE_TEMPLATE_DIR_PATH, 'PDF')
     template_file_path = os.path.join(CERTIFICATE_TEMPLATE_DIR_PATH, template_file)
 
-    text_files = get_files(WORDLIST_DIR_PATH, 'TXT')
     wordlist_file = get_single_file('Wordlist', WORDLIST_DIR_PATH, 'TXT')
     wordlist_file_path = os.path.join(WORDLIST_DIR_PATH, wordlist_file)
 
     # Read and print the contents of the file
-    wordlist_contents = read_wordlist(wordlist_file_path)
-
-    try:
-        certificate_type = int(input(f"\nSelect the type of certificate:\n  1. Membership Certificate\n  2. Event Certificate\n\n--> "))
-    except (KeyboardInterrupt, EOFError):
-        print("\n\nKeyboard Interrupt!\n\nExiting...\n")
-        sys.exit(1)
-    except Exception as e:
-        print("\n\nInvalid Input!\nPlease select correct certificate type.\n\nExiting...\n")
-        sys.exit(1)
+    with profile_stage("validate"):
+        wordlist_contents = read_wordlist(wordlist_file_path)
 
-    if certificate_type == 1:    # Membership_Certificate
-        # Adjust these parameters as per your requirements
-        FONT_SIZE = 31.5
-        FONT_COLOR = "#55D3E2"
-        POSITION = (421, 264)
-        CHAR_SPACING = 1.5
-
-    elif certificate_type == 2:    # Event_Certificate
-        # Adjust these parameters as per your requirements
-        FONT_SIZE = 34
-        FONT_COLOR = "#ffffff"
-        POSITION = (421, 242)
-        CHAR_SPACING = 1.15
-    else:
-        print("\n\nInvalid Input!\nPlease select correct certificate type.\n\nExiting...\n")
+    event = (args.event or "").strip()
+    if not event:
+        print("\nError: Please give the event of the certificates with --event, e.g. python certificate_generator.py --event \"Hackathon 2025\".\nIt is part of every certificate ID, so the certificates of two events never share an ID.\n\nExiting...\n")
         sys.exit(1)
 
-    certificates_dir = generate_certificates(template_file_path, wordlist_contents)
+    layout = prompt_certificate_layout()
+    font_file_path = os.path.join(FONTS_DIR_PATH, select_font(FONTS_DIR_PATH))
+    name_case = prompt_name_case()
 
-    # Check command-line arguments
-    if automation_script:
-        gen_certs_dir_path = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "gen_certs_dir_path.txt")
-        with open(gen_certs_dir_path, "w") as file:
-            file.write(certificates_dir)
+    certificates_dir = generate_certificates(template_file_path, wordlist_contents, font_file_path, layout, name_case, OUTPUT_DIR_PATH, {
+        "event": event, "bundle_options": bundle_options, "output_layout": args.output_layout,
+    })
 
     print("\n\nCertificates generation successfull!\n\nSaved all certificates to \"" + os.path.basename(certificates_dir) + "\" directory.\n")
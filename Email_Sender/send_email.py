@@ -1,109 +1,227 @@
 import os
 import sys
 import csv
+import time
 import logging
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from socket import error, gaierror
+import argparse
 
 # Get the parent directory, add it to python path and import the modules
 parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(parent_dir)
 
-from Utilities.utils import add_attachment, check_attachments, check_body_template, check_csv, check_gmail_app_password, clean_csv_fieldnames, get_files, get_single_file, initialize_necessary_files, load_config, read_email_body_template, sort_csv
+from Utilities.profiling import add_profile_arguments, profile_stage, start_profiling_from_args
+from Utilities.progress import finish_progress, progress_print, start_progress, update_progress
+from Utilities.structured_log import log_fields, start_structured_logging
+from Utilities.recipient_index import DEFAULT_INDEX_PATH, filter_recipients, open_recipient_index, record_send, report_skipped_recipients
+from Utilities.output_layout import find_certificate, load_certificate_paths
+from Utilities.utils import add_attachment, certificate_filename, check_attachments, check_body_template, check_csv, check_gmail_app_password, clean_csv_fieldnames, get_spreadsheet_file, initialize_necessary_files, load_config, read_email_body_template, sort_csv
+
+
+SMTP_SERVER = "smtp.gmail.com"
+SMTP_PORT = 587
+
+
+## ===========================================================================
+### Classes
+
+# === CLASS: SMTP SESSION ERROR ===
+class SMTPSessionError(Exception):
+    """
+    Raised when the mail server cannot be reached or refuses the login. Every later email
+    would fail the same way, so the callers stop (the scripts exit) instead of going on.
+    """
 
 
 ## ===========================================================================
 ### Functions
 
+# === FUNCTION: OPEN SMTP SESSION ===
+def open_smtp_session(sender_email, sender_password, smtp_server=SMTP_SERVER, smtp_port=SMTP_PORT):
+    """
+    Connects and logs in to the SMTP server, so that one session can be reused for many emails.
+
+    Args:
+        sender_email (str): The sender's email address.
+        sender_password (str): The sender's Gmail App Password.
+        smtp_server (str, optional): The SMTP server host.
+        smtp_port (int, optional): The SMTP server port.
+
+    Returns:
+        smtplib.SMTP: The logged in SMTP session.
+
+    Raises:
+        SMTPSessionError: If authentication fails or the server cannot be reached.
+    """
+
+    # smtplib (with ssl and socket) is only imported once a session is opened, which keeps `--help` fast
+    import smtplib
+    from socket import error, gaierror
+
+    try:
+        server = smtplib.SMTP(smtp_server, smtp_port)
+        server.starttls()
+        server.login(sender_email, sender_password)
+    except smtplib.SMTPAuthenticationError as e:
+        logging.error(f"Authentication failed for {sender_email} with provided password", extra=log_fields("connect", "error", error=e))
+        raise SMTPSessionError(f"Incorrect Gmail App Password!\nAuthentication Failed for \'{sender_email}\' with provided password.") from e
+    except (gaierror, error, smtplib.SMTPException) as e:
+        logging.error(f"Network error occurred while connecting to {smtp_server}: {e}", extra=log_fields("connect", "error", error=e))
+        raise SMTPSessionError("Failed to connect to the mail server....\nCheck your Internet connection") from e
+
+    return server
+
+
+## --------------------------------------------------------------------------
+# === FUNCTION: CLOSE SMTP SESSION ===
+def close_smtp_session(server):
+    """
+    Closes an SMTP session, ignoring errors from an already dropped connection.
+
+    Args:
+        server (smtplib.SMTP): The SMTP session.
+
+    Returns:
+        None
+    """
+
+    import smtplib
+
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
+
+
+## --------------------------------------------------------------------------
 # === FUNCTION: SEND EMAIL ===
-def send_email(recipient_email, name, subject, body, attachments):
+def send_email(server, sender_email, recipient_email, name, subject, body, attachment_paths, row_index=None):
     """
-    Sends an email to a single recipient with optional attachments.
+    Sends an email to a single recipient with optional attachments over an open SMTP session.
 
     Args:
+        server (smtplib.SMTP): A logged in SMTP session, see `open_smtp_session`.
+        sender_email (str): The sender's email address.
         recipient_email (str): The recipient's email address.
         name (str): The recipient's name for personalization.
         subject (str): The subject of the email.
         body (str): The HTML content of the email body.
-        attachments (list or str): List of attachment file names/paths, or a single file name/path depending on attachment mode.
+        attachment_paths (list): Full paths of the files to attach.
+        row_index (int, optional): Row index of the recipient in the spreadsheet, for the log.
+
+    Returns:
+        int: Size of the sent message in bytes, 0 if it was not sent.
 
     Raises:
-        smtplib.SMTPAuthenticationError: If authentication with the SMTP server fails.
-        socket.gaierror: If there is a network connection issue.
-        Exception: For other unforeseen errors during the email sending process.
+        smtplib.SMTPServerDisconnected: If the session dropped, so the caller can reconnect.
+        SMTPSessionError: If there is a network connection issue, so the caller can stop.
+        KeyboardInterrupt: If the user interrupts the sending.
+
+    Other errors are logged and the email counts as not sent.
 
     Logs:
-        - Successful email delivery with recipient's email.
-        - Errors encountered while sending the email.
+        - Successful email delivery with recipient's email, row index and latency.
+        - Errors encountered while sending the email, with their class.
     """
 
-    try:
-        # Set up the email
-        msg = MIMEMultipart()
-        msg["From"] = SENDER_EMAIL
-        msg["To"] = recipient_email
-        msg["Subject"] = subject
-
-        # Add the HTML body
-        msg.attach(MIMEText(body, "html"))
-
-        # Check command-line arguments
-        if len(sys.argv) > 1 and sys.argv[1].strip() == "extract_certify_and_email_script":
-            gen_certs_dir_path = os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "gen_certs_dir_path.txt")
+    import smtplib
+    from socket import error, gaierror
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
 
-            with open(gen_certs_dir_path, "r") as file:
-                gen_certs_dir_path = file.read()
+    start_time = time.perf_counter()
+    try:
+        with profile_stage("encode"):
+            # Set up the email
+            msg = MIMEMultipart()
+            msg["From"] = sender_email
+            msg["To"] = recipient_email
+            msg["Subject"] = subject
 
-            attachment_path = os.path.join(gen_certs_dir_path, attachments)
-            add_attachment(msg, attachment_path)
+            # Add the HTML body
+            msg.attach(MIMEText(body, "html"))
 
-        else:
-            for attachment_path in attachments:
-                if attachment_path.strip():  # Ensure path is not empty
-                    attachment_path = os.path.join(ATTACHMENTS_DIRECTORY_PATH, attachment_path)
+            for attachment_path in attachment_paths:
+                add_attachment(msg, attachment_path)
 
-                    add_attachment(msg, attachment_path)
+            message = msg.as_string()
 
-        # Connect to Gmail's SMTP server and send the email
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
+        with profile_stage("send"):
             server.sendmail(
-                SENDER_EMAIL,
+                sender_email,
                 [recipient_email],
-                msg.as_string(),
+                message,
             )
 
         # Log success
-        logging.info(f"Email sent to {recipient_email}")
-        print(f"Email sent to {recipient_email}")
+        logging.info(f"Email sent to {recipient_email}", extra=log_fields("send", "sent", row_index, recipient_email, time.perf_counter() - start_time))
+        return len(message)
 
-    except smtplib.SMTPAuthenticationError as e:
-        logging.error(f"Authentication failed for {SENDER_EMAIL} with provided password")
-        print(f"Incorrect Gmail App Password!\nAuthentication Failed for \'{SENDER_EMAIL}\' with provided password.\n")
-        sys.exit(1)
+    except smtplib.SMTPServerDisconnected:
+        raise
     except (gaierror, error) as e:
-        logging.error(f"Network error occurred while sending email to {recipient_email}")
-        print(f"Failed to send Emails....\nCheck your Internet connection\nEmails not sent form recipient name: \'{name}\'\n\nExiting...\n")
-        sys.exit(1)
-    except (KeyboardInterrupt, EOFError):
-        logging.error(f"Email sending interrupted for recipient name: {name}")
-        print(f"\nKeyboard Interrupt!\n\nEmails not sent form recipient name: \'{name}\'\n\nExiting...\n")
-        sys.exit(1)
+        logging.error(f"Network error occurred while sending email to {recipient_email}", extra=log_fields("send", "error", row_index, recipient_email, time.perf_counter() - start_time, e))
+        raise SMTPSessionError(f"Failed to send Emails....\nCheck your Internet connection\nEmails not sent form recipient name: \'{name}\'") from e
+    except (KeyboardInterrupt, EOFError) as e:
+        logging.error(f"Email sending interrupted for recipient name: {name}", extra=log_fields("send", "interrupted", row_index, recipient_email, error=e))
+        raise
     except Exception as e:
         # Log failure
-        logging.error(f"Failed to send email to {recipient_email}: {e}")
-        print(f"Failed to send email to {recipient_email}: {e}")
+        logging.error(f"Failed to send email to {recipient_email}: {e}", extra=log_fields("send", "failed", row_index, recipient_email, time.perf_counter() - start_time, e))
+        progress_print(f"Failed to send email to {recipient_email}: {e}")
+        return 0
+
+
+## --------------------------------------------------------------------------
+# === FUNCTION: GET ATTACHMENT PATHS ===
+def get_attachment_paths(row, attachment_mode, attachments_dir_path, common_attachments=None, certificate_paths=None):
+    """
+    Resolves the attachment file paths of a recipient row for the given attachment mode.
+
+    Args:
+        row (dict): The recipient row.
+        attachment_mode (str): "None", "Common", "Respective" or "Other".
+        attachments_dir_path (str): Directory holding the attachments (generated certificates in "Other" mode).
+        common_attachments (list, optional): Attachment names of the first row, for "Common" mode.
+        certificate_paths (dict, optional): Certificate paths recorded in the manifest of the
+                                            certificates directory, for "Other" mode.
+
+    Returns:
+        list: Full paths of the files to attach.
+
+    Raises:
+        ValueError: If the attachment mode is invalid.
+    """
+
+    if attachment_mode == "Respective":
+        attachments = row.get("Attachments", "").split(";") if row.get("Attachments", "").strip() else []
+
+    elif attachment_mode == "Common":
+        attachments = common_attachments or []
+
+    elif attachment_mode == "Other":
+        # The certificates directory may be sharded, see `Utilities.output_layout`
+        filename = certificate_filename(row.get("Full Name", ""), row.get("Certificate ID"))
+        return [find_certificate(attachments_dir_path, filename, row.get("Certificate ID"), certificate_paths)]
+
+    elif attachment_mode == "None":
+        attachments = []
+
+    else:
+        raise ValueError("Invalid Attachment Mode specified! Please select among 'Respective', 'Common' or 'None'.")
+
+    return [os.path.join(attachments_dir_path, attachment.strip()) for attachment in attachments if attachment.strip()]
 
 
 ## --------------------------------------------------------------------------
 # === FUNCTION: SEND BULK EMAILS ===
-def send_bulk_emails(csv_file_path, body_template_file):
+def send_bulk_emails(csv_file_path, body_template_file, sender_email, sender_password, email_subject, attachment_mode, attachments_dir_path=None, event_name=None, recipient_index_path=DEFAULT_INDEX_PATH, confirm=True, smtp_server=SMTP_SERVER, smtp_port=SMTP_PORT):
     """
     Sends bulk emails to recipients by reading their details from a CSV file.
 
+    A single SMTP session is reused for the whole batch (and reopened if the server drops it).
+    Recipients on the suppression list of the recipient index, or already sent a message for
+    `event_name`, are skipped; successful sends are recorded in the index.
+
     Args:
         csv_file_path (str): Path to the CSV file containing recipient details.
                              The file should include columns for "Email" and "Full Name".
@@ -111,50 +229,76 @@ def send_bulk_emails(csv_file_path, body_template_file):
         body_template_file (str): Path to the HTML file used as the email body template.
                                   The template should include placeholders for customization
                                   (e.g., "{{name}}").
+        sender_email (str): The sender's email address.
+        sender_password (str): The sender's Gmail App Password.
+        email_subject (str): The subject of the emails.
+        attachment_mode (str): "None", "Common", "Respective" or "Other".
+        attachments_dir_path (str, optional): Directory holding the attachments (generated certificates in "Other" mode).
+        event_name (str, optional): Event name used for re-send protection, defaults to the subject.
+        recipient_index_path (str, optional): Path to the recipient index database.
+        confirm (bool, optional): Whether to ask the user for confirmation before sending.
+        smtp_server (str, optional): The SMTP server host.
+        smtp_port (int, optional): The SMTP server port.
+
+    Returns:
+        tuple: (sent, failed) counts of emails.
 
     Raises:
-        FileNotFoundError: If the specified CSV file does not exist.
-        ValueError: If the CSV file format is invalid or lacks required fields.
-        Exception: For other unforeseen errors during the email sending process.
+        SMTPSessionError: If the mail server cannot be reached or refuses the login.
+
+    Errors reading the CSV file and errors of individual rows are logged and counted as failed.
 
     Logs:
         - Successful email delivery for each recipient.
         - Errors encountered while processing individual rows of the CSV file.
     """
 
-    global ATTACHMENT_MODE
+    import smtplib
 
-    try:
-        # Read the email body template
-        body_template = read_email_body_template(body_template_file)
-
-        # Open the CSV file
-        with open(csv_file_path, "r", encoding="utf-8") as csv_file:
-            csv_file.seek(0)  # Reset file pointer
-            reader = csv.DictReader(csv_file)
-
-            # Read the common attachments if needed
-            if ATTACHMENT_MODE == "Common":
-                first_row = next(reader, None)
-                if first_row:
-                    common_attachments = (
-                        first_row["Attachments"].split(";")
-                        if first_row.get("Attachments")
-                        else []
-                    )
-
-            csv_file.seek(0)  # Reset file pointer
-            reader = csv.DictReader(csv_file)  # Reinitialize reader
+    event_name = event_name or email_subject
+    sent, failed = 0, 0
 
+    try:
+        with profile_stage("load"):
+            # Read the email body template
+            body_template = read_email_body_template(body_template_file)
+
+            # Open the CSV file
+            with open(csv_file_path, "r", encoding="utf-8") as csv_file:
+                reader = csv.DictReader(csv_file)
+
+                # Keep the row indices of the spreadsheet for error messages
+                rows = []
+                for row_index, row in enumerate(reader, start=2):
+                    row["_row_index"] = row_index
+                    rows.append(row)
+
+        # Read the common attachments if needed
+        common_attachments = []
+        if attachment_mode == "Common" and rows and rows[0].get("Attachments"):
+            common_attachments = rows[0]["Attachments"].split(";")
+        certificate_paths = load_certificate_paths(attachments_dir_path) if attachment_mode == "Other" else None
+
+        rows, skipped = filter_recipients(rows, recipient_index_path, event_name)
+        report_skipped_recipients(skipped)
+        if not rows:
+            print("\nNo recipients left to send emails to.\n")
+            return sent, failed
+
+        if confirm:
             confirm_send = input(f"\n\nYou are about to send emails to the recipients listed in the CSV file: \'{os.path.basename(csv_file_path)}\'\n\nType \'yes\' to confirm and proceed: ").strip().lower()
             if confirm_send not in ["yes", "y"]:
                 print("\nEmail sending operation cancelled by the user.\n\nExiting...\n")
                 sys.exit(0)
 
-            print("\n\nSending emails to recipients.....\n\nPlease wait...\nIt might take about 10-15 seconds per email depending on your internet speed.\n")
+        print("\n\nSending emails to recipients.....\n\nPlease wait...\nIt might take a few seconds per email depending on your internet speed.\n")
 
-            row_index = 2
-            for row in reader:
+        server = open_smtp_session(sender_email, sender_password, smtp_server, smtp_port)
+        recipient_index = open_recipient_index(recipient_index_path)
+        try:
+            progress = start_progress("Sending emails", len(rows), "sent")
+            for row in rows:
+                row_index = row["_row_index"]
                 try:
                     if not row.get("Email", "") or not row.get("Full Name", ""):
                         raise ValueError("Missing recipient email or name in a row.")
@@ -163,48 +307,57 @@ def send_bulk_emails(csv_file_path, body_template_file):
                         recipient_email = row.get("Email", "").lower().strip()
                         name = row.get("Full Name", "").title().strip()
 
-                    # Determine attachments
-                    if ATTACHMENT_MODE == "Respective":
-                        if row.get("Attachments", ""):
-                            attachments = (row.get("Attachments", "").split(";") if row.get("Attachments", "").strip() else [])
-                        else:
-                            attachments = []
-
-                    elif ATTACHMENT_MODE == "Common":
-                        attachments = common_attachments
-
-                    elif ATTACHMENT_MODE == "Other":
-                        attachments = f"{name.title().strip().replace(' ', '_')}_certificate.pdf"
-
-                    elif ATTACHMENT_MODE == "None":
-                        attachments = []
-
-                    else:
-                        print("\nInvalid Attachment Mode specified!\nPlease select among \'Respective\',\'Common\' or \'None\'.")
-                        sys.exit(1)
+                    attachment_paths = get_attachment_paths(row, attachment_mode, attachments_dir_path, common_attachments, certificate_paths)
 
                     # Customize the email body
                     personalized_body = body_template.replace("{{name}}", name)
                     # personalized_body = body_template.replace("{{phone}}", phone)
 
-                    # Send the email
-                    send_email(recipient_email, name, EMAIL_SUBJECT, personalized_body, attachments)
-
-                    row_index += 1
+                    # Send the email, reconnecting once if the server dropped the session
+                    try:
+                        sent_size = send_email(server, sender_email, recipient_email, name, email_subject, personalized_body, attachment_paths, row_index)
+                    except smtplib.SMTPServerDisconnected:
+                        close_smtp_session(server)
+                        server = open_smtp_session(sender_email, sender_password, smtp_server, smtp_port)
+                        sent_size = send_email(server, sender_email, recipient_email, name, email_subject, personalized_body, attachment_paths, row_index)
+
+                    if sent_size:
+                        record_send(recipient_index, recipient_email, name, event_name)
+                        sent += 1
+                    else:
+                        failed += 1
+                    update_progress(progress, failed=not sent_size, size=sent_size)
 
+                except SMTPSessionError:
+                    raise
                 except Exception as row_error:
-                    logging.error(f"Error processing recipient row\n  Row Index- \'{row_index}\' : {row_error}")
-                    print(f"\nError processing recipient row\n  Row Index- \'{row_index}\' : {row_error}\n")
+                    failed += 1
+                    update_progress(progress, failed=True)
+                    logging.error(f"Error processing recipient row: {row_error}", extra=log_fields("validate", "failed", row_index, row.get("Email", "").strip() or None, error=row_error))
+                    progress_print(f"\nError processing recipient row\n  Row Index- \'{row_index}\' : {row_error}\n")
+
+            finish_progress(progress)
+        finally:
+            # Also closed when a network error or an interrupt ends the batch early
+            recipient_index.close()
+            close_smtp_session(server)
 
     except FileNotFoundError as fnf_error:
-        logging.error(f"CSV file not found: {csv_file_path} - {fnf_error}")
+        logging.error(f"CSV file not found: {csv_file_path} - {fnf_error}", extra=log_fields("load", "error", error=fnf_error))
         print(f"CSV file not found: {csv_file_path} - {fnf_error}")
+        failed += 1
     except ValueError as value_error:
-        logging.error(f"Invalid CSV file format: {value_error}")
+        logging.error(f"Invalid CSV file format: {value_error}", extra=log_fields("load", "error", error=value_error))
         print(f"Invalid CSV file format: {value_error}")
+        failed += 1
+    except SMTPSessionError:
+        raise
     except Exception as e:
-        logging.error(f"Unexpected error: {e}")
+        logging.error(f"Unexpected error: {e}", extra=log_fields("send", "error", error=e))
         print(f"Unexpected error: {e}")
+        failed += 1
+
+    return sent, failed
 
 
 ## ===========================================================================
@@ -224,8 +377,8 @@ if __name__ == "__main__":
             - 'Other': Used by the automation script for certificate distribution.
 
     Automation Mode:
-        - Integrates with a certificate generation module for automated certificate emailing.
-        - Reads configuration and certificate paths from specific directories.
+        - The certificate automation script imports `send_bulk_emails` and calls it in-process
+          with the generated certificates directory.
 
     Environment:
         - Sets up directories for logs, attachments, and templates.
@@ -236,86 +389,81 @@ if __name__ == "__main__":
         - Prepare CSV files, attachments, and email body templates before running.
 
     Logging:
-        - Logs all email operations and errors to a log file with recipient details.
+        - Logs all email operations and errors as JSON lines (timestamp, row index, email, stage,
+          latency, outcome, error class) to a size-rotated log file, from a background thread.
+
+    Profiling:
+        - Run with `--profile` to write the stage timings and memory peaks to a JSON report.
 
     Raises:
         - FileNotFoundError: If required files (CSV, HTML, or attachments) are missing.
         - ValueError: If invalid data is found in the CSV file.
-        - smtplib.SMTPAuthenticationError: If Gmail App Password is incorrect.
-        - socket.gaierror: For network connectivity issues.
+        - SMTPSessionError: If Gmail App Password is incorrect or for network connectivity issues.
         - Exception: For other unforeseen issues during email operations.
     """
 
+    parser = argparse.ArgumentParser(description="Send bulk emails to the recipients of the spreadsheet.")
+    add_profile_arguments(parser)
+    start_profiling_from_args(parser.parse_args(), "send_email")
+
     print("\n" + " Email Sender ".center(24, "-"))
     EMAIL_SENDER_DIRECTORY_PATH = os.path.abspath(os.path.dirname(__file__))
-    ROOT_REPO_PATH = os.path.abspath(os.path.dirname(EMAIL_SENDER_DIRECTORY_PATH))
-    CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH = os.path.join(ROOT_REPO_PATH, "Certificate_Email_Automation")
 
-    automation_script = len(sys.argv) > 1 and sys.argv[1] == "extract_certify_and_email_script"
-
-    SMTP_SERVER = "smtp.gmail.com"
-    SMTP_PORT = 587
-
-    if automation_script:
-        config = load_config(os.path.join(CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH, "cert-email_config.json"))
-    else:
+    with profile_stage("load"):
         config = load_config(os.path.join(EMAIL_SENDER_DIRECTORY_PATH, "email_config.json"))
 
     # === CONFIGURATION ===
     SENDER_EMAIL = config.get("sender_email", "").strip()
     EMAIL_SUBJECT = config.get("email_subject", "").strip()
     SENDER_PASSWORD = config.get("gmail_app_password")
+    EVENT_NAME = config.get("event_name", "").strip() or EMAIL_SUBJECT
+    ATTACHMENT_MODE = config.get("attachment_mode")
 
-    if automation_script:
-        DIR_PATH = CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH
-        CSV_FILE_PATH = os.path.join(DIR_PATH, "tosend.csv")
-        BODY_TEMPLATE_FILE_PATH = os.path.join(DIR_PATH, "cert-email_html_body_template.html")
-        LOG_FILE_PATH = os.path.join(DIR_PATH, "cert-email_log.txt")
-        ATTACHMENT_MODE = "Other"
-    else:
-        DIR_PATH = EMAIL_SENDER_DIRECTORY_PATH
-        ATTACHMENTS_DIRECTORY_PATH = os.path.join(DIR_PATH, "Attachments")
-        SPREADSHEET_DIRECTORY_PATH = os.path.join(DIR_PATH, "Spreadsheet")
-        BODY_TEMPLATE_FILE_PATH = os.path.join(DIR_PATH, "email_html_body_template.html")
-        LOG_FILE_PATH = os.path.join(DIR_PATH, "email_log.txt")
-        ATTACHMENT_MODE = config.get("attachment_mode")
+    DIR_PATH = EMAIL_SENDER_DIRECTORY_PATH
+    ATTACHMENTS_DIRECTORY_PATH = os.path.join(DIR_PATH, "Attachments")
+    SPREADSHEET_DIRECTORY_PATH = os.path.join(DIR_PATH, "Spreadsheet")
+    BODY_TEMPLATE_FILE_PATH = os.path.join(DIR_PATH, "email_html_body_template.html")
+    LOG_FILE_PATH = os.path.join(DIR_PATH, "email_log.jsonl")
 
-        os.makedirs(ATTACHMENTS_DIRECTORY_PATH, exist_ok=True)
-        os.makedirs(SPREADSHEET_DIRECTORY_PATH, exist_ok=True)
+    os.makedirs(ATTACHMENTS_DIRECTORY_PATH, exist_ok=True)
+    os.makedirs(SPREADSHEET_DIRECTORY_PATH, exist_ok=True)
 
-        if SENDER_EMAIL == "" or EMAIL_SUBJECT in ["", "Subject"]:
-            print("\nError: Please configure all fields in the config file before running the script.\n\nExiting...\n")
-            sys.exit(1)
+    if SENDER_EMAIL == "" or EMAIL_SUBJECT in ["", "Subject"]:
+        print("\nError: Please configure all fields in the config file before running the script.\n\nExiting...\n")
+        sys.exit(1)
 
-    initialize_necessary_files(BODY_TEMPLATE_FILE_PATH) if not automation_script else initialize_necessary_files(log_file=LOG_FILE_PATH)
+    initialize_necessary_files(BODY_TEMPLATE_FILE_PATH)
 
-    if not automation_script:
-        check_gmail_app_password(SENDER_PASSWORD)
-        csv_files = get_files(SPREADSHEET_DIRECTORY_PATH, 'CSV')
-        spreadsheet_file = get_single_file('Spreadsheet', SPREADSHEET_DIRECTORY_PATH, 'CSV')
-        CSV_FILE_PATH = os.path.join(SPREADSHEET_DIRECTORY_PATH, spreadsheet_file)
+    check_gmail_app_password(SENDER_PASSWORD)
+    # Workbooks are converted with only the columns the sender reads
+    CSV_FILE_PATH = get_spreadsheet_file('Spreadsheet', SPREADSHEET_DIRECTORY_PATH, os.path.join(DIR_PATH, "tmp"), ["Full Name", "Email", "Attachments", "Certificate ID"])
 
     check_body_template(BODY_TEMPLATE_FILE_PATH)
 
-    if ATTACHMENT_MODE not in ["None", "Common", "Respective", "Other"]:
+    if ATTACHMENT_MODE not in ["None", "Common", "Respective"]:
         print("\nInvalid Attachment Mode specified in the config file!\nPlease select among \'Respective\',\'Common\' or \'None\'.\n\nExiting...\n")
         sys.exit(1)
 
-    # Check command-line arguments
-    if automation_script:
-        check_attachments(CSV_FILE_PATH, attachment_mode=ATTACHMENT_MODE, automation_dir_path=CERTIFICATE_EMAIL_AUTOMATION_DIR_PATH)
-    else:
+    with profile_stage("validate"):
         clean_csv_fieldnames(CSV_FILE_PATH)
         check_csv(CSV_FILE_PATH, ATTACHMENT_MODE)
+    with profile_stage("sort"):
         sort_csv(CSV_FILE_PATH)
+    with profile_stage("validate"):
         check_attachments(CSV_FILE_PATH, ATTACHMENTS_DIRECTORY_PATH, ATTACHMENT_MODE)
-        initialize_necessary_files(log_file=LOG_FILE_PATH)
+    initialize_necessary_files(log_file=LOG_FILE_PATH)
 
     # === SET UP LOGGING ===
-    logging.basicConfig(
-        filename=LOG_FILE_PATH,
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-    )
+    start_structured_logging(LOG_FILE_PATH)
+
+    try:
+        sent, failed = send_bulk_emails(CSV_FILE_PATH, BODY_TEMPLATE_FILE_PATH, SENDER_EMAIL, SENDER_PASSWORD, EMAIL_SUBJECT, ATTACHMENT_MODE, ATTACHMENTS_DIRECTORY_PATH, EVENT_NAME)
+    except SMTPSessionError as e:
+        print(f"\n{e}\n\nExiting...\n")
+        sys.exit(1)
+    except (KeyboardInterrupt, EOFError):
+        print("\n\nKeyboard Interrupt!\n\nExiting...\n")
+        sys.exit(1)
 
-    send_bulk_emails(CSV_FILE_PATH, BODY_TEMPLATE_FILE_PATH)
+    print(f"\n{sent} email(s) sent, {failed} failed.\n")
+    sys.exit(1 if failed else 0)
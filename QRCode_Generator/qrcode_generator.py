@@ -1,27 +1,92 @@
 import os
 import re
+import csv
 import sys
+import base64
+import time
+import argparse
+from functools import lru_cache
 
 # Get the parent directory, add it to python path and import the modules
 parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(parent_dir)
 
+from Utilities.asset_cache import load_font, load_logo, read_asset_bytes, register_pdf_font
+from Utilities.imposition import draw_crop_marks, fit_rect, get_sheet_size, parse_grid, sheet_cells
+from Utilities.profiling import add_profile_arguments, profile_stage, start_profiling_from_args
+from Utilities.progress import finish_progress, start_progress, update_progress
 from Utilities.utils import select_font
 
-try:
-    import qrcode
-    from PIL import Image, ImageDraw, ImageFont, ImageOps
-    from qrcode.image.styledpil import StyledPilImage
-    from qrcode.image.styles.colormasks import SolidFillColorMask
-    from qrcode.image.styles.moduledrawers import CircleModuleDrawer
-except ImportError:
-    print("This script requires the 'qrcode' and 'pillow' modules.\nPlease install them using 'pip install qrcode pillow' and try again.")
-    sys.exit(1)
+# QR and image modules, imported at first use by `import_qr_modules` so that --help and
+# the scripts importing this module start without loading qrcode, Pillow and NumPy
+qrcode = Image = ImageDraw = ImageFont = ImageOps = None
+StyledPilImage = SolidFillColorMask = CircleModuleDrawer = None
+np = None
+_qr_modules_imported = False
+
+
+FORBIDDEN_CHARS = r'[\/:*?"<>|]'
+# Placeholders of the batch templates: "{{" and "}}" escape a brace, "{Column}" is filled, a stray brace is an error
+TEMPLATE_PLACEHOLDER = re.compile(r"\{\{|\}\}|\{([^{}]*)\}|[{}]")
+
+QRCODES_GENERATOR_DIR_PATH = os.path.abspath(os.path.dirname(__file__))
+FONTS_DIR_PATH = os.path.join(os.path.dirname(QRCODES_GENERATOR_DIR_PATH), 'Fonts')
+
+LOGOS_DIR_PATH = os.path.join(QRCODES_GENERATOR_DIR_PATH, 'Logos')
+OUTPUT_DIR_PATH = os.path.join(QRCODES_GENERATOR_DIR_PATH, 'QRCodes')
+
+QR_SIZE = 800
+QR_BORDER = 2
+FINDER_SIZE = 7
+
+IMAGE_FORMATS = {"jpeg": "JPEG", "jpg": "JPEG", "png": "PNG", "gif": "GIF", "tiff": "TIFF", "bmp": "BMP", "svg": "SVG", "pdf": "PDF"}
+VECTOR_FORMATS = ("SVG", "PDF")
+
+TITLE_BAND = 0.1            # Height of the title band, as a fraction of the QR size
+PDF_POINTS_PER_PIXEL = 72 / 300  # The 800px QR printed at 300 DPI
+PDF_TITLE_FONT_NAME = "QRTitleFont"
 
 
 ## ===========================================================================
 ### Functions
 
+## --------------------------------------------------------------------------
+# Function to import the QR and image modules at first use
+def import_qr_modules():
+    """
+    Imports qrcode, Pillow and (if installed) NumPy into the module the first time they are needed.
+
+    Returns:
+        None
+
+    Exits:
+        Exits the program if qrcode or Pillow is not installed.
+    """
+
+    global qrcode, Image, ImageDraw, ImageFont, ImageOps, StyledPilImage, SolidFillColorMask, CircleModuleDrawer, np, _qr_modules_imported
+
+    if _qr_modules_imported:
+        return
+
+    try:
+        import qrcode
+        from PIL import Image, ImageDraw, ImageFont, ImageOps
+        from qrcode.image.styledpil import StyledPilImage
+        from qrcode.image.styles.colormasks import SolidFillColorMask
+        from qrcode.image.styles.moduledrawers import CircleModuleDrawer
+    except ImportError:
+        print("This script requires the 'qrcode' and 'pillow' modules.\nPlease install them using 'pip install qrcode pillow' and try again.")
+        sys.exit(1)
+
+    # NumPy is optional, it only makes the rendering faster
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    _qr_modules_imported = True
+
+
 # Function to input QR text
 def get_text():
     """
@@ -68,41 +133,117 @@ def get_text():
     return input_text
 
 
+## --------------------------------------------------------------------------
+# Function to map output pixels to QR modules
+@lru_cache(maxsize=8)
+def pixel_grid(modules, size):
+    """
+    Maps each output pixel row/column to the module it falls in, and precomputes the dot stamp.
+
+    Cached per (modules, size), so a batch of same-version QR codes computes it once.
+
+    Args:
+        modules (int): Number of modules per side, border included.
+        size (int): Output image size in pixels.
+
+    Returns:
+        tuple: (module_index, dot_stamp) where `module_index` gives the module of every pixel
+               row/column and `dot_stamp` marks the pixels inside the circle of their module.
+    """
+
+    centers = (np.arange(size) + 0.5) * modules / size
+    module_index = centers.astype(np.intp)
+    offset = centers - module_index - 0.5
+    dot_stamp = (offset[:, None] ** 2 + offset[None, :] ** 2) <= 0.25
+
+    return module_index, dot_stamp
+
+
+## --------------------------------------------------------------------------
+# Function to rasterise the QR module matrix with NumPy
+def rasterize_qr(matrix, style, bg_color, size=QR_SIZE, border=QR_BORDER):
+    """
+    Builds the QR image directly at the output size from the module matrix.
+
+    Every output pixel samples the module under its center, so no intermediate image is
+    drawn and resized. In the dots style the three finder patterns stay square, like the
+    qrcode styled image does, and the other modules are masked with the dot stamp.
+
+    Args:
+        matrix (list): The module matrix from `qr.get_matrix()`, border included.
+        style (str): "standard" or "dots".
+        bg_color (str): Background color of the QR code ('white' or 'black').
+        size (int, optional): Output image size in pixels.
+        border (int, optional): Border width of the matrix in modules.
+
+    Returns:
+        PIL.Image.Image: The QR code image.
+    """
+
+    import_qr_modules()
+    with profile_stage("render"):
+        modules = np.asarray(matrix, dtype=bool)
+        module_index, dot_stamp = pixel_grid(len(modules), size)
+        # Block upscaling: gather the rows, then the columns (two cheap 1-D gathers)
+        dark = modules[module_index][:, module_index]
+
+        if style == "dots":
+            finders = np.zeros(modules.shape, dtype=bool)
+            far = len(modules) - border - FINDER_SIZE
+            for row, col in ((border, border), (border, far), (far, border)):
+                finders[row:row + FINDER_SIZE, col:col + FINDER_SIZE] = True
+            dark &= dot_stamp | finders[module_index][:, module_index]
+
+        # Colours applied directly: the foreground pixels are 255 on black and 0 on white
+        lit = dark if bg_color == "black" else ~dark
+        pixels = lit.view(np.uint8) * np.uint8(255)
+
+        return Image.fromarray(pixels, "L").convert("RGB")
+
+
 ## --------------------------------------------------------------------------
 # Function to generate QR
-def standard_qr_gen(input_text, error_correction, bg_color):
+def standard_qr_gen(input_text, error_correction, bg_color, mask_pattern=None):
     """
     Generate a standard QR code image.
 
     This function creates a QR code with customizable error correction levels and background colors.
-    The generated QR code is resized for consistency.
+    When NumPy is installed the module matrix is rasterised by `rasterize_qr` straight at
+    QR_SIZE; otherwise the qrcode image is drawn and resized to QR_SIZE.
 
     Args:
         input_text (str): Text to encode in the QR code.
         error_correction (str): Error correction level ('L', 'M', 'Q', 'H').
         bg_color (str): Background color of the QR code ('white' or 'black').
+        mask_pattern (int, optional): Fixed mask (0-7), see `qr_matrix`.
 
     Returns:
         PIL.Image.Image: The generated QR code image.
 
     Raises:
-        SystemExit: If an invalid error correction level is provided.
+        AttributeError: If an invalid error correction level is provided.
     """
 
+    import_qr_modules()
     qr = qrcode.QRCode(
         version=6,
         error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{error_correction}"),
         box_size=10,
-        border=2,
+        border=QR_BORDER,
+        mask_pattern=mask_pattern,
     )
 
-    qr.add_data(input_text)
-    qr.make(fit=True)
+    with profile_stage("encode"):
+        qr.add_data(input_text)
+        qr.make(fit=True)
+
+    if np is not None:
+        return rasterize_qr(qr.get_matrix(), "standard", bg_color)
 
     fg_color = "white" if bg_color == "black" else "black"
 
     qr_img = qr.make_image(fill_color=fg_color, back_color=bg_color)
-    qr_img = qr_img.resize((800, 800), Image.Resampling.LANCZOS)
+    qr_img = qr_img.resize((QR_SIZE, QR_SIZE), Image.Resampling.LANCZOS)
 
     qr_image = qr_img.convert('RGB')
 
@@ -111,32 +252,42 @@ def standard_qr_gen(input_text, error_correction, bg_color):
 
 ## --------------------------------------------------------------------------
 # Function to generate dotted QR
-def dots_qr_gen(input_text, error_correction, bg_color):
+def dots_qr_gen(input_text, error_correction, bg_color, mask_pattern=None):
     """
     Generate a QR code with a dotted module style.
 
     This function creates a visually styled QR code with circular dots for modules
-    and customizable background colors.
+    and customizable background colors. When NumPy is installed the module matrix is
+    rasterised by `rasterize_qr` straight at QR_SIZE, keeping the finder patterns square;
+    otherwise the styled qrcode image is drawn and resized to QR_SIZE.
 
     Args:
         input_text (str): Text to encode in the QR code.
         error_correction (str): Error correction level ('L', 'M', 'Q', 'H').
         bg_color (str): Background color of the QR code ('white' or 'black').
+        mask_pattern (int, optional): Fixed mask (0-7), see `qr_matrix`.
 
     Returns:
         PIL.Image.Image: The styled QR code image.
     """
 
+    import_qr_modules()
+
     # Create a QR Code instance
     qr = qrcode.QRCode(
         version=6,              # Version controls size of QR
         error_correction=qrcode.constants.ERROR_CORRECT_H,
         box_size=10,
-        border=2,
+        border=QR_BORDER,
+        mask_pattern=mask_pattern,
     )
 
-    qr.add_data(input_text)
-    qr.make(fit=True)
+    with profile_stage("encode"):
+        qr.add_data(input_text)
+        qr.make(fit=True)
+
+    if np is not None:
+        return rasterize_qr(qr.get_matrix(), "dots", bg_color)
 
     # Create the QR code with dot modules
     qr_img = qr.make_image(
@@ -145,7 +296,7 @@ def dots_qr_gen(input_text, error_correction, bg_color):
         color_mask=SolidFillColorMask(front_color=(0,0,0), back_color=(255,255,255)),
     )
 
-    qr_img = qr_img.resize((800, 800), Image.Resampling.LANCZOS)
+    qr_img = qr_img.resize((QR_SIZE, QR_SIZE), Image.Resampling.LANCZOS)
 
     # Convert QR code to an editable PIL image
     qr_image = qr_img.convert("RGB")
@@ -155,6 +306,281 @@ def dots_qr_gen(input_text, error_correction, bg_color):
     return qr_image
 
 
+## --------------------------------------------------------------------------
+# Function to get the module matrix of a QR code
+def qr_matrix(input_text, qr_style, error_correction, version=6, mask_pattern=None):
+    """
+    Encodes the text with the same settings as `standard_qr_gen`/`dots_qr_gen` and returns the modules.
+
+    Args:
+        input_text (str): Text to encode in the QR code.
+        qr_style (str): "standard" or "dots" (the dotted style always uses level H).
+        error_correction (str): Error correction level ('L', 'M', 'Q', 'H').
+        version (int, optional): Minimum QR version, None for the smallest that fits.
+        mask_pattern (int, optional): Fixed mask (0-7). Skips the search for the best mask,
+                                      which is most of the encoding time; any mask scans.
+
+    Returns:
+        list: Rows of booleans, True for dark modules, border included.
+    """
+
+    import_qr_modules()
+    qr = qrcode.QRCode(
+        version=version,
+        error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{'H' if qr_style == 'dots' else error_correction}"),
+        box_size=10,
+        border=QR_BORDER,
+        mask_pattern=mask_pattern,
+    )
+    with profile_stage("encode"):
+        qr.add_data(input_text)
+        qr.make(fit=True)
+
+    return qr.get_matrix()
+
+
+## --------------------------------------------------------------------------
+# Function to split the module matrix into drawing primitives
+def qr_shapes(matrix, qr_style, border=QR_BORDER):
+    """
+    Turns the module matrix into horizontal runs of square modules and single dots.
+
+    Adjacent dark modules of a row are merged into one run, so a QR code needs a few hundred
+    rectangles instead of thousands of squares. In the dotted style only the three finder
+    patterns are drawn as runs, every other dark module is a dot.
+
+    Args:
+        matrix (list): The module matrix, border included.
+        qr_style (str): "standard" or "dots".
+        border (int, optional): Border width of the matrix in modules.
+
+    Returns:
+        tuple: (runs, dots) where `runs` are (row, col, length) and `dots` are (row, col).
+    """
+
+    modules = len(matrix)
+    far = modules - border - FINDER_SIZE
+
+    def is_finder(row, col):
+        return any(top <= row < top + FINDER_SIZE and left <= col < left + FINDER_SIZE for top, left in ((border, border), (border, far), (far, border)))
+
+    runs = []
+    dots = []
+    for row, line in enumerate(matrix):
+        col = 0
+        while col < modules:
+            if not line[col]:
+                col += 1
+                continue
+            if qr_style == "dots" and not is_finder(row, col):
+                dots.append((row, col))
+                col += 1
+                continue
+            start = col
+            while col < modules and line[col] and (qr_style != "dots" or is_finder(row, col)):
+                col += 1
+            runs.append((row, start, col - start))
+
+    return runs, dots
+
+
+## --------------------------------------------------------------------------
+# Function to get the center logo file of a background color
+def center_image_path_for(bg_color):
+    """
+    Returns the path of the center logo used on a background color.
+
+    Args:
+        bg_color (str): Background color of the QR code ('white' or 'black').
+
+    Returns:
+        str: Path of the logo file.
+    """
+
+    center_image = "White_border_circle.png" if bg_color == "white" else "White_bg_circle.png"
+    return os.path.join(LOGOS_DIR_PATH, center_image)
+
+
+## --------------------------------------------------------------------------
+# Function to build an SVG QR code
+def qr_svg(matrix, qr_style, bg_color, title="", center_image=True, size=QR_SIZE):
+    """
+    Builds an SVG QR code from the module matrix, one user unit per module.
+
+    All modules are drawn as a single path, so the file stays small and renders sharply at
+    any size. The center logo is embedded as a PNG and the title as SVG text.
+
+    Args:
+        matrix (list): The module matrix, border included.
+        qr_style (str): "standard" or "dots".
+        bg_color (str): Background color of the QR code ('white' or 'black').
+        title (str, optional): Title above the QR code.
+        center_image (bool, optional): Whether to place the logo at the center.
+        size (int, optional): Displayed width in pixels.
+
+    Returns:
+        str: The SVG document.
+    """
+
+    from xml.sax.saxutils import escape
+
+    modules = len(matrix)
+    fg_color = "white" if bg_color == "black" else "black"
+    band = modules * TITLE_BAND if title else 0
+    height = modules + band
+
+    runs, dots = qr_shapes(matrix, qr_style)
+    path = "".join(f"M{col} {row + band:g}h{length}v1h-{length}z" for row, col, length in runs)
+    path += "".join(f"M{col} {row + band + 0.5:g}a.5 .5 0 1 0 1 0a.5 .5 0 1 0 -1 0z" for row, col in dots)
+
+    rendering = ' shape-rendering="crispEdges"' if qr_style == "standard" else ""
+
+    svg = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{round(size * height / modules)}" viewBox="0 0 {modules} {height:g}">',
+        f'<rect width="{modules}" height="{height:g}" fill="{bg_color}"/>',
+        f'<path fill="{fg_color}" d="{path}"{rendering}/>',
+    ]
+    if title:
+        svg.append(f'<text x="{modules / 2:g}" y="{band * 0.8:g}" font-size="{band * 0.75:g}" font-family="sans-serif" text-anchor="middle" fill="{fg_color}">{escape(title)}</text>')
+    if center_image:
+        logo_size = modules / 4
+        logo = base64.b64encode(read_asset_bytes(center_image_path_for(bg_color))).decode("ascii")
+        svg.append(f'<image x="{(modules - logo_size) / 2:g}" y="{band + (modules - logo_size) / 2:g}" width="{logo_size:g}" height="{logo_size:g}" href="data:image/png;base64,{logo}"/>')
+    svg.append("</svg>\n")
+
+    return "\n".join(svg)
+
+
+## --------------------------------------------------------------------------
+# Function to draw a QR code onto a PDF canvas
+def draw_pdf_qr(pdf, matrix, qr_style, bg_color, x, y, width, title="", font_name="Helvetica", center_image=True):
+    """
+    Draws a QR code (and its title band) with vector operations onto a reportlab canvas.
+
+    The drawing is (modules + title band) / modules times as tall as it is wide. The logo
+    is drawn by file, so reportlab embeds it once however many QR codes use it.
+
+    Args:
+        pdf (reportlab.pdfgen.canvas.Canvas): The canvas to draw on.
+        matrix (list): The module matrix, border included.
+        qr_style (str): "standard" or "dots".
+        bg_color (str): Background color of the QR code ('white' or 'black').
+        x (float): Left edge in points.
+        y (float): Bottom edge in points.
+        width (float): Width in points.
+        title (str, optional): Title above the QR code.
+        font_name (str, optional): Registered reportlab font of the title.
+        center_image (bool, optional): Whether to place the logo at the center.
+
+    Returns:
+        None
+    """
+
+    from reportlab.lib.colors import black, white
+
+    modules = len(matrix)
+    unit = width / modules
+    band = modules * TITLE_BAND if title else 0
+    fg_color, bg_fill = (white, black) if bg_color == "black" else (black, white)
+
+    pdf.saveState()
+    pdf.translate(x, y)
+    pdf.setFillColor(bg_fill)
+    pdf.rect(0, 0, modules * unit, (modules + band) * unit, stroke=0, fill=1)
+
+    if title:
+        pdf.setFillColor(fg_color)
+        pdf.setFont(font_name, band * 0.75 * unit)
+        pdf.drawCentredString(modules * unit / 2, (modules + band * 0.2) * unit, title)
+
+    # Work in module units with rows counted from the top
+    pdf.scale(unit, unit)
+    runs, dots = qr_shapes(matrix, qr_style)
+    pdf.setFillColor(fg_color)
+    if runs:
+        # Whole-module rectangles are written as integer operators directly, formatting
+        # each coordinate through the path object is most of the drawing time
+        pdf.addLiteral(" ".join(f"{col} {modules - row - 1} {length} 1 re" for row, col, length in runs) + " f")
+    if dots:
+        path = pdf.beginPath()
+        for row, col in dots:
+            path.circle(col + 0.5, modules - row - 0.5, 0.5)
+        pdf.drawPath(path, stroke=0, fill=1)
+
+    if center_image:
+        logo_size = modules / 4
+        pdf.drawImage(center_image_path_for(bg_color), (modules - logo_size) / 2, (modules - logo_size) / 2, logo_size, logo_size, mask="auto")
+    pdf.restoreState()
+
+
+## --------------------------------------------------------------------------
+# Function to draw a PDF QR code
+def qr_pdf(matrix, qr_style, bg_color, output_path, title="", font_file_path=None, center_image=True, size=QR_SIZE):
+    """
+    Writes a one page PDF QR code drawn with vector operations from the module matrix.
+
+    Args:
+        matrix (list): The module matrix, border included.
+        qr_style (str): "standard" or "dots".
+        bg_color (str): Background color of the QR code ('white' or 'black').
+        output_path (str): Path of the PDF file to write.
+        title (str, optional): Title above the QR code.
+        font_file_path (str, optional): TTF font of the title; Helvetica if not given.
+        center_image (bool, optional): Whether to place the logo at the center.
+        size (int, optional): Width of the QR in pixels at 300 DPI.
+
+    Returns:
+        None
+
+    Raises:
+        ImportError: If reportlab is not installed.
+    """
+
+    from reportlab.pdfgen import canvas
+
+    width = size * PDF_POINTS_PER_PIXEL
+    height = width * (1 + TITLE_BAND) if title else width
+    font_name = register_pdf_font(font_file_path, PDF_TITLE_FONT_NAME) if title and font_file_path else "Helvetica"
+
+    pdf = canvas.Canvas(output_path, pagesize=(width, height))
+    with profile_stage("render"):
+        draw_pdf_qr(pdf, matrix, qr_style, bg_color, 0, 0, width, title, font_name, center_image)
+        pdf.showPage()
+    with profile_stage("write"):
+        pdf.save()
+
+
+## --------------------------------------------------------------------------
+# Function to save a QR code in a vector format
+def save_vector_qr(input_text, qr_style, error_correction, bg_color, output_path, image_format, title="", font_file_path=None, center_image=True):
+    """
+    Encodes the text and saves it as an SVG or PDF file, without drawing any raster image.
+
+    Args:
+        input_text (str): Text to encode in the QR code.
+        qr_style (str): "standard" or "dots".
+        error_correction (str): Error correction level ('L', 'M', 'Q', 'H').
+        bg_color (str): Background color of the QR code ('white' or 'black').
+        output_path (str): Path of the file to write.
+        image_format (str): "SVG" or "PDF".
+        title (str, optional): Title above the QR code.
+        font_file_path (str, optional): TTF font of the title (PDF only; SVG uses a generic font).
+        center_image (bool, optional): Whether to place the logo at the center.
+
+    Returns:
+        None
+    """
+
+    matrix = qr_matrix(input_text, qr_style, error_correction)
+    if image_format == "SVG":
+        with profile_stage("render"):
+            svg = qr_svg(matrix, qr_style, bg_color, title, center_image)
+        with profile_stage("write"), open(output_path, "w", encoding="utf-8") as svg_file:
+            svg_file.write(svg)
+    else:
+        qr_pdf(matrix, qr_style, bg_color, output_path, title, font_file_path, center_image)
+
+
 ## --------------------------------------------------------------------------
 # Function to get QR Image extension type
 def extension_menu():
@@ -173,20 +599,20 @@ def extension_menu():
     """
 
     try:
-        extension_type = input("\nEnter the image file extension for your QRCode\n  1. JPEG    2. JPG    3. PNG\n  4. GIF     5. TIFF   6. BMP\n  7. Exit without generating QR\n\n --> ").lower().strip()
+        extension_type = input("\nEnter the image file extension for your QRCode\n  1. JPEG    2. JPG    3. PNG (default)\n  4. GIF     5. TIFF   6. BMP\n  7. SVG     8. PDF    (vector, for print)\n  9. Exit without generating QR\n\n --> ").lower().strip()
     except (KeyboardInterrupt, EOFError):
         print("\n\nKeyboard Interrupt!\n\nExiting....\n")
         sys.exit(1)
 
     image_format = "JPEG"
 
-    if extension_type in ['1','jpeg','']:
+    if extension_type in ['1','jpeg']:
         extension = 'jpeg'
 
     elif extension_type in ['2','jpg']:
         extension = 'jpg'
 
-    elif extension_type in ['3','png']:
+    elif extension_type in ['3','png','']:
         extension = 'png'
         image_format = "PNG"
 
@@ -202,7 +628,15 @@ def extension_menu():
         extension = 'bmp'
         image_format = "BMP"
 
-    elif extension_type in ['7']:
+    elif extension_type in ['7','svg']:
+        extension = 'svg'
+        image_format = "SVG"
+
+    elif extension_type in ['8','pdf']:
+        extension = 'pdf'
+        image_format = "PDF"
+
+    elif extension_type in ['9']:
         print("\n\nExiting...\n")
         sys.exit(0)
 
@@ -233,27 +667,28 @@ def add_center_image(qr_image, bg_color):
         Exception: If there is an error in adding the center image.
     """
 
+    import_qr_modules()
+
     # try:
         # center_image_path = input("\nEnter the Full path of the image to place at the center of the QR code (or press Enter to skip): ").strip()
     # except (KeyboardInterrupt, EOFError):
         # print("\n\nKeyboard Interrupt!\n\nExiting....\n")
         # sys.exit(1)
 
-    center_image = "White_border_circle.png" if bg_color == "white" else "White_bg_circle.png"
-    center_image_path = os.path.join(LOGOS_DIR_PATH, center_image)
+    center_image_path = center_image_path_for(bg_color)
 
     if not center_image_path or center_image_path.strip() == "":
         return qr_image
 
     try:
-        center_image = Image.open(center_image_path)
         qr_width, qr_height = qr_image.size
 
         # Dynamically scale center image
         scale_factor = 4 #min(4, qr_width // 75)
         center_img_width = qr_width // scale_factor
         center_img_height = qr_height // scale_factor
-        center_image = center_image.resize((center_img_width, center_img_height), Image.Resampling.LANCZOS)
+        # Resized once per size and kept in the asset cache
+        center_image = load_logo(center_image_path, (center_img_width, center_img_height))
 
         # Place the center image
         pos = ((qr_width - center_img_width) // 2, (qr_height - center_img_height) // 2)
@@ -267,7 +702,7 @@ def add_center_image(qr_image, bg_color):
 
 ## --------------------------------------------------------------------------
 # Function to add a title to the QR Code
-def add_title(qr_image, title, bg_color):
+def add_title(qr_image, title, bg_color, font_file_path=None):
     """
     Add a title above the QR code.
 
@@ -278,17 +713,19 @@ def add_title(qr_image, title, bg_color):
         qr_image (PIL.Image.Image): The QR code image.
         title (str): The text to display as the title.
         bg_color (str): Background color of the QR code ('white' or 'black').
+        font_file_path (str, optional): Path to the title font. The user is asked to select one if not given.
 
     Returns:
         PIL.Image.Image: The QR code image with the title added.
     """
 
-    font_file = select_font(FONTS_DIR_PATH)
+    import_qr_modules()
     FONT_SIZE = 60
-    font_file_path = os.path.join(FONTS_DIR_PATH, font_file)
+    if font_file_path is None:
+        font_file_path = os.path.join(FONTS_DIR_PATH, select_font(FONTS_DIR_PATH))
 
     try:
-        font = ImageFont.truetype(font_file_path, FONT_SIZE)
+        font = load_font(font_file_path, FONT_SIZE)
     except IOError:
         font = ImageFont.load_default()
 
@@ -365,16 +802,7 @@ def generate_qrcode():
         print("\nInvalid Input!!!\nEnter the number corresponding to the style\n\nExiting....\n")
         sys.exit(1)
 
-    try:
-        qr_func = standard_qr_gen if qr_style == 1 else dots_qr_gen
-        bg_color = "black" if background_color == 2 else "white"
-        qr_image = qr_func(input_text, error_correction, bg_color)
-    except Exception as e:
-        print(f"\nOops! There was an error in creating QR.\n{e}\n")
-        sys.exit(1)
-
-    # Add center image to the QR code
-    qr_image = add_center_image(qr_image, bg_color)
+    bg_color = "black" if background_color == 2 else "white"
 
     try:
         title = input("\nEnter the title to add at the top of the QR code (or press Enter to skip): ").strip()
@@ -382,8 +810,8 @@ def generate_qrcode():
         print("\n\nKeyboard Interrupt!\n\nExiting....\n")
         sys.exit(1)
 
-    if title:
-        qr_image = add_title(qr_image, title, bg_color)
+    font_file_path = os.path.join(FONTS_DIR_PATH, select_font(FONTS_DIR_PATH)) if title else None
+
     try:
         filename = input("\nEnter the filename for the QR code image: ").strip()
     except (KeyboardInterrupt, EOFError):
@@ -412,15 +840,350 @@ def generate_qrcode():
         qr_image_path = os.path.join(OUTPUT_DIR_PATH, f"{filename}({counter}).{extension}")
         counter += 1
 
+    # Vector formats are drawn straight from the module matrix
+    if image_format in VECTOR_FORMATS:
+        try:
+            save_vector_qr(input_text, "standard" if qr_style == 1 else "dots", error_correction, bg_color, qr_image_path, image_format, title, font_file_path)
+        except Exception as e:
+            print(f"\nOops! There was an error in creating QR.\n{e}\n")
+            sys.exit(1)
+        return qr_image_path
+
+    try:
+        qr_func = standard_qr_gen if qr_style == 1 else dots_qr_gen
+        qr_image = qr_func(input_text, error_correction, bg_color)
+    except Exception as e:
+        print(f"\nOops! There was an error in creating QR.\n{e}\n")
+        sys.exit(1)
+
+    with profile_stage("render"):
+        # Add center image to the QR code
+        qr_image = add_center_image(qr_image, bg_color)
+
+        if title:
+            qr_image = add_title(qr_image, title, bg_color, font_file_path)
+
     try:
         # Save the QR Code
-        qr_image.save(qr_image_path, format=image_format)
+        with profile_stage("write"):
+            qr_image.save(qr_image_path, format=image_format)
     except Exception as e:
         print(f"\nAn Error occured while saving the QRCode file.\n{e}\n\nExiting....\n")
 
     return qr_image_path
 
 
+## --------------------------------------------------------------------------
+# Function to fill a column template with the values of a row
+def fill_template(template, row):
+    """
+    Fills a template such as "https://example.com/checkin?t={Ticket ID}" with the columns of a row.
+
+    Each placeholder is looked up as a whole column name, so "{Name.__class__}" or "{Name[0]}"
+    name a missing column instead of reaching into the values like `str.format` would.
+
+    Args:
+        template (str): Template with "{Column Name}" placeholders; "{{" and "}}" for braces.
+        row (dict): The CSV row.
+
+    Returns:
+        str: The filled template.
+
+    Raises:
+        KeyError: If the template names a column the row does not have.
+        ValueError: If the template has a stray "{" or "}".
+    """
+
+    def fill_placeholder(match):
+        if match.group(0) in ("{{", "}}"):
+            return match.group(0)[0]
+        if match.group(1) is None:
+            raise ValueError(f"Single \'{match.group(0)}\' in the template \'{template}\', use \'{match.group(0) * 2}\' for a brace")
+        return str(row[match.group(1)])
+
+    return TEMPLATE_PLACEHOLDER.sub(fill_placeholder, template).strip()
+
+
+## --------------------------------------------------------------------------
+# Function to build the batch jobs from a CSV file
+def read_batch_jobs(csv_file_path, payload_template, title_template, filename_template, extension):
+    """
+    Reads the CSV file and builds one QR job per row, with a deterministic output filename.
+
+    Besides the CSV columns, templates can use "{row}", the 1-based row number.
+
+    Args:
+        csv_file_path (str): Path to the CSV file.
+        payload_template (str): Template of the text to encode.
+        title_template (str): Template of the title, or "" for no title.
+        filename_template (str): Template of the output filename (without extension).
+        extension (str): Image file extension.
+
+    Returns:
+        list: (payload, title, filename) tuples, one per row.
+
+    Exits:
+        Exits the program if the CSV cannot be read, a template names an unknown column or has
+        a stray brace, or two rows map to the same filename.
+    """
+
+    jobs = []
+    filenames = {}
+    try:
+        with open(csv_file_path, "r", encoding="utf-8-sig", newline="") as csv_file:
+            reader = csv.DictReader(csv_file)
+            reader.fieldnames = [field.strip() for field in reader.fieldnames or []]
+            for row_number, row in enumerate(reader, start=1):
+                row = {key: (value or "").strip() for key, value in row.items() if key}
+                row["row"] = row_number
+                payload = fill_template(payload_template, row)
+                title = fill_template(title_template, row) if title_template else ""
+                filename = re.sub(FORBIDDEN_CHARS, "_", fill_template(filename_template, row)) + f".{extension}"
+
+                if not payload:
+                    print(f"Skipping row {row_number}: empty QR text.")
+                    continue
+                if filename in filenames:
+                    print(f"\nRows {filenames[filename]} and {row_number} both produce \'{filename}\'.\nUse a filename template with a unique column.\n\nExiting....\n")
+                    sys.exit(1)
+
+                filenames[filename] = row_number
+                jobs.append((payload, title, filename))
+    except KeyError as e:
+        print(f"\nColumn {e} not found in \'{os.path.basename(csv_file_path)}\'.\n\nExiting....\n")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"\nInvalid template!\n{e}\n\nExiting....\n")
+        sys.exit(1)
+    except (OSError, UnicodeError, csv.Error) as e:
+        print(f"\nError in reading \'{os.path.basename(csv_file_path)}\'.\n{e}\n\nExiting....\n")
+        sys.exit(1)
+
+    return jobs
+
+
+## --------------------------------------------------------------------------
+# Function to load the batch assets when a worker process starts
+def warm_batch_assets(bg_color, center_image, font_file_path):
+    """
+    Loads the center logo and title font into the worker's asset cache before the first job.
+
+    Args:
+        bg_color (str): Background color of the QR code ('white' or 'black').
+        center_image (bool): Whether the center logo is used.
+        font_file_path (str): Path to the title font, or None without titles.
+
+    Returns:
+        None
+    """
+
+    try:
+        if center_image:
+            center_image_name = "White_border_circle.png" if bg_color == "white" else "White_bg_circle.png"
+            load_logo(os.path.join(LOGOS_DIR_PATH, center_image_name), (QR_SIZE // 4, QR_SIZE // 4))
+        if font_file_path:
+            load_font(font_file_path, 60, use_mmap=True)
+    except OSError:
+        pass  # The jobs report missing assets themselves
+
+
+## --------------------------------------------------------------------------
+# Function to render and save a single QR of a batch
+def render_batch_qr(job, qr_style, bg_color, image_format, output_dir_path, font_file_path, center_image):
+    """
+    Renders one QR code of a batch and saves it. Runs in a worker process.
+
+    Args:
+        job (tuple): (payload, title, filename) as built by `read_batch_jobs`.
+        qr_style (str): "standard" or "dots".
+        bg_color (str): Background color of the QR code ('white' or 'black').
+        image_format (str): PIL image format to save in, or "SVG"/"PDF" for vector output.
+        output_dir_path (str): Directory to save the QR code to.
+        font_file_path (str): Path to the title font.
+        center_image (bool): Whether to overlay the center logo.
+
+    Returns:
+        str: Path of the saved QR code image.
+    """
+
+    payload, title, filename = job
+    qr_image_path = os.path.join(output_dir_path, filename)
+    if image_format in VECTOR_FORMATS:
+        save_vector_qr(payload, qr_style, "H", bg_color, qr_image_path, image_format, title, font_file_path, center_image)
+        return qr_image_path
+
+    qr_func = standard_qr_gen if qr_style == "standard" else dots_qr_gen
+    qr_image = qr_func(payload, "H", bg_color)
+    if center_image:
+        qr_image = add_center_image(qr_image, bg_color)
+    if title:
+        qr_image = add_title(qr_image, title, bg_color, font_file_path)
+
+    qr_image.save(qr_image_path, format=image_format)
+
+    return qr_image_path
+
+
+## --------------------------------------------------------------------------
+# Function to generate the QR codes of every row of a CSV file
+def generate_batch_qrcodes(csv_file_path, payload_template, title_template="", filename_template="qrcode_{row}", qr_style="standard", bg_color="white", extension="png", center_image=True, font_file_path=None, output_dir_path=None, workers=None):
+    """
+    Generates one QR code per CSV row in parallel across processes.
+
+    Output files are named from `filename_template`, so a re-run overwrites the same files
+    instead of creating numbered copies.
+
+    Args:
+        csv_file_path (str): Path to the CSV file.
+        payload_template (str): Template of the text to encode, e.g. "{Ticket ID}".
+        title_template (str, optional): Template of the title above the QR code.
+        filename_template (str, optional): Template of the filename, without extension.
+        qr_style (str, optional): "standard" or "dots".
+        bg_color (str, optional): "white" or "black".
+        extension (str, optional): One of IMAGE_FORMATS.
+        center_image (bool, optional): Whether to overlay the center logo.
+        font_file_path (str, optional): Path to the title font, needed if titles are used.
+        output_dir_path (str, optional): Output directory; `QRCodes/<csv name>` by default.
+        workers (int, optional): Number of worker processes; all cores by default.
+
+    Returns:
+        tuple: (output_dir_path, count, elapsed_seconds)
+
+    Exits:
+        Exits the program if the CSV is invalid or a QR code cannot be generated.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    if output_dir_path is None:
+        output_dir_path = os.path.join(OUTPUT_DIR_PATH, os.path.splitext(os.path.basename(csv_file_path))[0])
+    os.makedirs(output_dir_path, exist_ok=True)
+
+    with profile_stage("load"):
+        jobs = read_batch_jobs(csv_file_path, payload_template, title_template, filename_template, extension)
+    if not jobs:
+        print("\nNo rows to generate QR codes for.\n\nExiting....\n")
+        sys.exit(1)
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+
+    print(f"\nGenerating {len(jobs)} QR codes with {workers} worker(s)......\n")
+    start_time = time.perf_counter()
+    try:
+        # Pre-scale the logo on disk once, so every worker starts with a hot cache
+        warm_batch_assets(bg_color, center_image, None)
+        # The workers are not profiled, the stage is the parent's wait for them
+        with profile_stage("render"), ProcessPoolExecutor(max_workers=workers, initializer=warm_batch_assets, initargs=(bg_color, center_image, font_file_path)) as executor:
+            results = executor.map(
+                render_batch_qr, jobs,
+                *[[value] * len(jobs) for value in (qr_style, bg_color, IMAGE_FORMATS[extension], output_dir_path, font_file_path, center_image)],
+                chunksize=chunksize,
+            )
+            progress = start_progress("Generating QR codes", len(jobs))
+            for qr_image_path in results:
+                update_progress(progress, size=os.path.getsize(qr_image_path))
+            finish_progress(progress)
+    except (KeyboardInterrupt, EOFError):
+        print("\n\nKeyboard Interrupt!\n\nExiting....\n")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nOops! There was an error in creating QR.\n{e}\n\nExiting....\n")
+        sys.exit(1)
+
+    return output_dir_path, len(jobs), time.perf_counter() - start_time
+
+
+## --------------------------------------------------------------------------
+# Function to impose the QR codes of every row of a CSV file onto print sheets
+def impose_batch_qrcodes(csv_file_path, payload_template, title_template="", qr_style="standard", bg_color="white", center_image=True, font_file_path=None, sheet="A4", columns=3, rows=4, output_path=None, workers=None):
+    """
+    Packs one QR badge per CSV row N-up onto A4/Letter sheets with crop marks, as a single PDF.
+
+    The module matrices are encoded in parallel across processes with a fixed mask, like the
+    certificate verification codes; the badges are then drawn as vectors onto one canvas,
+    one sheet at a time. The title font and the logo are embedded
+    once and shared by every badge, so thousands of badges stay a compact file.
+
+    Args:
+        csv_file_path (str): Path to the CSV file.
+        payload_template (str): Template of the text to encode, e.g. "{Ticket ID}".
+        title_template (str, optional): Template of the label above each QR code.
+        qr_style (str, optional): "standard" or "dots".
+        bg_color (str, optional): "white" or "black".
+        center_image (bool, optional): Whether to place the logo at the center.
+        font_file_path (str, optional): Path to the label font; Helvetica if not given.
+        sheet (str, optional): "A4" or "Letter".
+        columns (int, optional): Number of badges across a sheet.
+        rows (int, optional): Number of badges down a sheet.
+        output_path (str, optional): PDF to write; `QRCodes/<csv name>_<sheet>.pdf` by default.
+        workers (int, optional): Number of worker processes; all cores by default.
+
+    Returns:
+        tuple: (output_path, count, sheets, elapsed_seconds)
+
+    Exits:
+        Exits the program if the CSV is invalid or the sheets cannot be generated.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    if output_path is None:
+        os.makedirs(OUTPUT_DIR_PATH, exist_ok=True)
+        output_path = os.path.join(OUTPUT_DIR_PATH, f"{os.path.splitext(os.path.basename(csv_file_path))[0]}_{sheet.lower()}.pdf")
+
+    with profile_stage("load"):
+        jobs = read_batch_jobs(csv_file_path, payload_template, title_template, "qrcode_{row}", "pdf")
+    if not jobs:
+        print("\nNo rows to generate QR codes for.\n\nExiting....\n")
+        sys.exit(1)
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+    cells = sheet_cells(get_sheet_size(sheet), columns, rows)
+    sheets = -(-len(jobs) // len(cells))
+
+    print(f"\nImposing {len(jobs)} QR codes onto {sheets} {sheet} sheet(s) with {workers} worker(s)......\n")
+    start_time = time.perf_counter()
+    try:
+        from reportlab.pdfgen import canvas
+
+        font_name = register_pdf_font(font_file_path, PDF_TITLE_FONT_NAME) if title_template and font_file_path else "Helvetica"
+        pdf = canvas.Canvas(output_path, pagesize=get_sheet_size(sheet), pageCompression=1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            payloads = [payload for payload, _, _ in jobs]
+            matrices = executor.map(
+                qr_matrix, payloads,
+                *[[value] * len(jobs) for value in (qr_style, "H", 6, 0)],
+                chunksize=chunksize,
+            )
+            progress = start_progress("Imposing QR codes", len(jobs))
+            for count, ((_, title, _), matrix) in enumerate(zip(jobs, matrices), start=1):
+                slot = (count - 1) % len(cells)
+                badge = fit_rect(cells[slot], 1, 1 + TITLE_BAND if title else 1)
+                with profile_stage("render"):
+                    draw_pdf_qr(pdf, matrix, qr_style, bg_color, badge[0], badge[1], badge[2], title, font_name, center_image)
+                    draw_crop_marks(pdf, badge)
+
+                if slot == len(cells) - 1 or count == len(jobs):
+                    pdf.showPage()
+                update_progress(progress)
+            finish_progress(progress)
+        with profile_stage("write"):
+            pdf.save()
+    except (KeyboardInterrupt, EOFError):
+        print("\n\nKeyboard Interrupt!\n\nExiting....\n")
+        sys.exit(1)
+    except ImportError:
+        print("\nImposing QR codes requires the 'reportlab' module.\nPlease install it using 'pip install reportlab' and try again.\n\nExiting....\n")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nOops! There was an error in imposing the QR codes.\n{e}\n\nExiting....\n")
+        sys.exit(1)
+
+    return output_path, len(jobs), sheets, time.perf_counter() - start_time
+
+
 ### ===========================================================================
 ## Main
 #
@@ -429,7 +1192,9 @@ if __name__ == "__main__":
     """
     Main entry point for the QR Code Generator script.
 
-    This script generates a QR code based on user input and offers various customization options:
+    This script generates a QR code based on user input and offers various customization options
+    (or, with --batch, one QR code per row of a CSV file, see `generate_batch_qrcodes`, or
+    packed onto print sheets with --impose, see `impose_batch_qrcodes`):
     - Supports standard and dotted QR code styles.
     - Allows customization of error correction levels, background colors, and file formats.
     - Optionally overlays a center image and/or a title on the QR code.
@@ -439,20 +1204,60 @@ if __name__ == "__main__":
     (Resources or QRCode_Generator). Paths are adjusted dynamically to locate resources like
     fonts, logos, and output directories.
 
+    With --profile, the stage timings and memory peaks are written to a JSON report. Batch
+    worker processes are not profiled, only the parent process.
+
     Raises:
         SystemExit: If an error occurs during the QR code generation process or if
                     invalid input is provided.
     """
 
-    FORBIDDEN_CHARS = r'[\/:*?"<>|]'
+    parser = argparse.ArgumentParser(description="Generate QR codes, interactively or one per CSV row.")
+    parser.add_argument("--batch", metavar="CSV", help="generate one QR code per row of this CSV file")
+    parser.add_argument("--payload", default="{Payload}", help="template of the QR text, e.g. \"https://example.com/checkin?t={Ticket ID}\" (default: {Payload})")
+    parser.add_argument("--title", default="", help="template of the title above each QR code (default: no title)")
+    parser.add_argument("--filename", default="qrcode_{row}", help="template of the output filename without extension (default: qrcode_{row})")
+    parser.add_argument("--style", choices=["standard", "dots"], default="standard", help="QR style (default: standard)")
+    parser.add_argument("--background", choices=["white", "black"], default="white", help="QR background color (default: white)")
+    parser.add_argument("--format", choices=list(IMAGE_FORMATS), default="png", help="image file extension (default: png)")
+    parser.add_argument("--no-logo", action="store_true", help="do not place the logo at the center")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--impose", metavar="SHEET", choices=["A4", "Letter"], help="with --batch, pack the QR codes onto A4 or Letter sheets in one PDF")
+    parser.add_argument("--grid", default="3x4", help="COLUMNSxROWS of QR codes per sheet with --impose (default: 3x4)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling_from_args(args, "qrcode_generator")
 
-    QRCODES_GENERATOR_DIR_PATH = os.path.abspath(os.path.dirname(__file__))
-    FONTS_DIR_PATH = os.path.join(os.path.dirname(QRCODES_GENERATOR_DIR_PATH), 'Fonts')
+    print("\n" + " QR Code Generator ".center(29, "-"))
 
-    LOGOS_DIR_PATH = os.path.join(QRCODES_GENERATOR_DIR_PATH, 'Logos')
-    OUTPUT_DIR_PATH = os.path.join(QRCODES_GENERATOR_DIR_PATH, 'QRCodes')
+    if args.batch:
+        if args.workers is not None and args.workers < 1:
+            print("\n--workers must be at least 1.\n\nExiting....\n")
+            sys.exit(1)
 
-    print("\n" + " QR Code Generator ".center(29, "-"))
+        # Ask for the title font once, before the workers start
+        font_file_path = os.path.join(FONTS_DIR_PATH, select_font(FONTS_DIR_PATH)) if args.title else None
+
+        if args.impose:
+            try:
+                columns, rows = parse_grid(args.grid)
+            except ValueError as e:
+                print(f"\n{e}\n\nExiting....\n")
+                sys.exit(1)
+
+            output_path, count, sheets, elapsed = impose_batch_qrcodes(
+                args.batch, args.payload, args.title, args.style, args.background,
+                not args.no_logo, font_file_path, args.impose, columns, rows, workers=args.workers,
+            )
+            print(f"\n{count} QR codes imposed onto {sheets} sheet(s) in \"{output_path[len(QRCODES_GENERATOR_DIR_PATH) + 1:] or output_path}\" in {elapsed:.1f}s.\n")
+            sys.exit(0)
+
+        output_dir_path, count, elapsed = generate_batch_qrcodes(
+            args.batch, args.payload, args.title, args.filename, args.style, args.background,
+            args.format, not args.no_logo, font_file_path, workers=args.workers,
+        )
+        print(f"\n{count} QR codes saved to \"{output_dir_path[len(QRCODES_GENERATOR_DIR_PATH) + 1:] or output_dir_path}\" in {elapsed:.1f}s ({count / elapsed:.1f} QR/s).\n")
+        sys.exit(0)
 
     qr_image_path = generate_qrcode()
 
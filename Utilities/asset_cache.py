@@ -0,0 +1,190 @@
+import os
+import io
+import mmap
+import hashlib
+
+
+ROOT_REPO_PATH = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DEFAULT_CACHE_DIR_PATH = os.path.join(ROOT_REPO_PATH, ".asset_cache")
+
+# Per-process caches, keyed by the file identity so edited assets are reloaded
+_file_bytes = {}
+_fonts = {}
+_logos = {}
+_pdf_fonts = {}
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to identify a version of a file
+def file_identity(file_path):
+    """
+    Returns (absolute path, modification time, size) of a file, which changes whenever it is edited.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        tuple: The identity of the file.
+
+    Raises:
+        OSError: If the file does not exist.
+    """
+
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+
+
+## --------------------------------------------------------------------------
+# Function to read a file once per process
+def read_asset_bytes(file_path, use_mmap=False):
+    """
+    Returns the contents of an asset file, reading it from disk only once per process.
+
+    With `use_mmap` the file is memory-mapped instead of read, so worker processes share
+    the pages of the operating system's file cache instead of each holding a copy.
+
+    Args:
+        file_path (str): Path to the asset.
+        use_mmap (bool, optional): Memory-map the file instead of reading it.
+
+    Returns:
+        bytes or mmap.mmap: The contents of the file.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+
+    identity = file_identity(file_path)
+    if identity not in _file_bytes:
+        with open(file_path, "rb") as asset_file:
+            if use_mmap and identity[2] > 0:
+                _file_bytes[identity] = mmap.mmap(asset_file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                _file_bytes[identity] = asset_file.read()
+
+    return _file_bytes[identity]
+
+
+## --------------------------------------------------------------------------
+# Function to load a Pillow font once per size
+def load_font(font_file_path, size, use_mmap=False):
+    """
+    Returns a Pillow TrueType font, loading each (font, size) pair once per process.
+
+    Args:
+        font_file_path (str): Path to the TTF/OTF file.
+        size (int): Font size in pixels.
+        use_mmap (bool, optional): Memory-map the font file, see `read_asset_bytes`.
+
+    Returns:
+        PIL.ImageFont.FreeTypeFont: The loaded font.
+
+    Raises:
+        OSError: If the font cannot be read or is not a valid font file.
+    """
+
+    from PIL import ImageFont
+
+    key = (file_identity(font_file_path), size)
+    if key not in _fonts:
+        font_bytes = read_asset_bytes(font_file_path, use_mmap)
+        _fonts[key] = ImageFont.truetype(io.BytesIO(font_bytes), size)
+
+    return _fonts[key]
+
+
+## --------------------------------------------------------------------------
+# Function to load a resized logo, from memory, from disk or by resizing it
+def load_logo(logo_file_path, size, cache_dir_path=DEFAULT_CACHE_DIR_PATH):
+    """
+    Returns a logo resized to `size`, resizing each (logo, size) pair only once.
+
+    Resized variants are kept in memory and also saved as PNG files in `cache_dir_path`,
+    so later runs and new worker processes load the pre-scaled logo instead of resizing
+    the original again.
+
+    Args:
+        logo_file_path (str): Path to the original logo.
+        size (tuple): (width, height) in pixels.
+        cache_dir_path (str, optional): Directory of the pre-scaled variants, or None to
+                                        keep them in memory only.
+
+    Returns:
+        PIL.Image.Image: The resized logo. Callers must not modify it in place.
+
+    Raises:
+        OSError: If the logo cannot be read.
+    """
+
+    from PIL import Image
+
+    identity = file_identity(logo_file_path)
+    key = (identity, tuple(size))
+    if key in _logos:
+        return _logos[key]
+
+    variant_path = None
+    if cache_dir_path:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:12]
+        stem = os.path.splitext(os.path.basename(logo_file_path))[0]
+        variant_path = os.path.join(cache_dir_path, f"{stem}_{size[0]}x{size[1]}_{digest}.png")
+
+    logo = None
+    if variant_path and os.path.isfile(variant_path):
+        try:
+            with Image.open(variant_path) as variant:
+                logo = variant.copy()
+        except OSError:
+            logo = None
+
+    if logo is None:
+        with Image.open(logo_file_path) as original:
+            logo = original.resize(tuple(size), Image.Resampling.LANCZOS)
+        if variant_path:
+            try:
+                os.makedirs(cache_dir_path, exist_ok=True)
+                temp_path = f"{variant_path}.{os.getpid()}.tmp"
+                logo.save(temp_path, format="PNG")
+                os.replace(temp_path, variant_path)
+            except OSError:
+                pass  # The disk cache is only an optimisation
+
+    _logos[key] = logo
+    return logo
+
+
+## --------------------------------------------------------------------------
+# Function to register a font with reportlab once per process
+def register_pdf_font(font_file_path, font_name):
+    """
+    Registers a TrueType font with reportlab, skipping fonts already registered from the same file.
+
+    reportlab keeps the first font registered under a name, so when another file is
+    registered under a name already in use it gets a numbered name ("CustomFont2", ...).
+    Always draw with the returned name.
+
+    Args:
+        font_file_path (str): Path to the TTF file.
+        font_name (str): Preferred name to register the font under.
+
+    Returns:
+        str: The name the font is registered under.
+
+    Raises:
+        Exception: Whatever reportlab raises for an invalid font file.
+    """
+
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    key = (font_name, file_identity(font_file_path))
+    if key not in _pdf_fonts:
+        used = sum(1 for name, _ in _pdf_fonts if name == font_name)
+        registered_name = f"{font_name}{used + 1}" if used else font_name
+        pdfmetrics.registerFont(TTFont(registered_name, io.BytesIO(read_asset_bytes(font_file_path))))
+        _pdf_fonts[key] = registered_name
+
+    return _pdf_fonts[key]
@@ -0,0 +1,133 @@
+import os
+import csv
+from collections import defaultdict
+
+from Utilities.dedupe import normalize_email
+
+
+# Join keys: (registration column, check-in column, key normalisation)
+JOIN_KEYS = {
+    "email": ("Email", "Email", normalize_email),
+    "ticket": ("Ticket ID", "Ticket ID", lambda value: (value or "").strip().upper()),
+}
+
+DEFAULT_ATTENDANCE_RULES = {
+    "join_key": "email",
+    "min_sessions": 1,
+}
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to read the attendance rules from the config
+def get_attendance_rules(config):
+    """
+    Reads the attendance rules from the config, falling back to the defaults.
+
+    Config keys:
+        attendance_join_key (str): "email" or "ticket".
+        attendance_min_sessions (int): Minimum number of distinct sessions attended.
+
+    Args:
+        config (dict): The loaded config file.
+
+    Returns:
+        dict: The attendance rules.
+
+    Exits:
+        Exits the program if the rules are invalid.
+    """
+
+    rules = dict(DEFAULT_ATTENDANCE_RULES)
+    rules["join_key"] = (config.get("attendance_join_key") or rules["join_key"]).strip().lower()
+    rules["min_sessions"] = config.get("attendance_min_sessions", rules["min_sessions"])
+
+    if rules["join_key"] not in JOIN_KEYS:
+        print(f"\nInvalid 'attendance_join_key' in the config file!\nPlease select among {', '.join(repr(key) for key in JOIN_KEYS)}.\n\nExiting...\n")
+        exit(1)
+    # true and false are ints in Python, so they are rejected explicitly
+    if isinstance(rules["min_sessions"], bool) or not isinstance(rules["min_sessions"], int) or rules["min_sessions"] < 1:
+        print("\nInvalid 'attendance_min_sessions' in the config file!\nPlease provide a positive whole number.\n\nExiting...\n")
+        exit(1)
+
+    return rules
+
+
+## --------------------------------------------------------------------------
+# Function to build the check-in hash table
+def load_checkins(checkin_file_paths, join_key):
+    """
+    Builds a hash table of the sessions each attendee checked in to.
+
+    Each check-in log is read row by row. A "Session" column, if present, names the session
+    of each scan; otherwise every log file counts as one session. Repeated scans of the same
+    badge in one session are counted once.
+
+    Args:
+        checkin_file_paths (list): Paths to the check-in CSV logs.
+        join_key (str): One of the JOIN_KEYS.
+
+    Returns:
+        dict: Maps each normalised key to the set of sessions it checked in to.
+
+    Exits:
+        Exits the program if a log is unreadable or lacks the join column.
+    """
+
+    _, checkin_column, normalize = JOIN_KEYS[join_key]
+    sessions = defaultdict(set)
+
+    for checkin_file_path in checkin_file_paths:
+        log_name = os.path.basename(checkin_file_path)
+        try:
+            with open(checkin_file_path, "r", encoding="utf-8-sig", newline="") as checkin_file:
+                reader = csv.DictReader(checkin_file)
+                reader.fieldnames = [field.strip().rstrip(":").strip() for field in reader.fieldnames or []]
+                if checkin_column not in reader.fieldnames:
+                    print(f"\nError: Check-in log '{log_name}' has no '{checkin_column}' column.\n\nExiting...\n")
+                    exit(1)
+
+                has_session = "Session" in reader.fieldnames
+                for row in reader:
+                    key = normalize(row.get(checkin_column))
+                    if key:
+                        session = (row.get("Session") or "").strip() if has_session else log_name
+                        sessions[key].add(session or log_name)
+        except UnicodeError:
+            print(f"\nError in reading check-in log '{log_name}'!\nThe file has some invalid characters or is not UTF-8 encoded.\n\nExiting...\n")
+            exit(1)
+        except OSError as e:
+            print(f"\nError in reading check-in log '{log_name}'!\n{e}\n\nExiting...\n")
+            exit(1)
+
+    return sessions
+
+
+## --------------------------------------------------------------------------
+# Function to stream the registrations that satisfy the attendance rules
+def iter_attended_rows(registration_rows, checkin_sessions, rules):
+    """
+    Probes the check-in hash table with each registration row and yields the attendees.
+
+    Registrations are streamed, so only the (smaller) check-in side is held in memory.
+
+    Args:
+        registration_rows (iterable): Rows (dicts) of the registration sheet.
+        checkin_sessions (dict): Hash table as returned by `load_checkins`.
+        rules (dict): Attendance rules as returned by `get_attendance_rules`.
+
+    Yields:
+        dict: Each registration row attended for at least `min_sessions` sessions,
+              with the count added under "Sessions Attended".
+    """
+
+    registration_column, _, normalize = JOIN_KEYS[rules["join_key"]]
+    min_sessions = rules["min_sessions"]
+
+    for row in registration_rows:
+        attended = len(checkin_sessions.get(normalize(row.get(registration_column)), ()))
+        if attended >= min_sessions:
+            row["Sessions Attended"] = attended
+            yield row
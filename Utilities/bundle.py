@@ -0,0 +1,390 @@
+import os
+import sys
+import time
+import argparse
+import threading
+
+# Get the parent directory, add it to python path and import the modules
+parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(parent_dir)
+
+
+BUNDLE_FORMATS = ("zip", "tar")
+BUNDLE_COMPRESSIONS = ("stored", "deflate")
+
+# Multipliers of the --volume-size suffixes
+SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+# Upper bounds of the archive overhead, used to keep each volume under its size
+ZIP_ENTRY_OVERHEAD = 30 + 24 + 46 + 28     # Local header, data descriptor, central entry, ZIP64 extra
+ZIP_END_OVERHEAD = 22 + 56 + 20            # End of central directory, ZIP64 end record and locator
+TAR_BLOCK_SIZE = 512
+TAR_RECORD_SIZE = 20 * TAR_BLOCK_SIZE      # A tar file is padded to whole records
+TAR_PAX_OVERHEAD = 3 * TAR_BLOCK_SIZE      # Extended header of a long or non-ASCII name
+
+
+## ===========================================================================
+### Classes
+
+## --------------------------------------------------------------------------
+# Class of a write-only file that cannot seek
+class SequentialWriter:
+    """
+    Wraps a file so the archive modules see a stream: zipfile then writes a data descriptor
+    after each member instead of seeking back to patch its header, so every volume is
+    written front to back in a single pass.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.position = 0
+
+    def write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        self.file.flush()
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to parse a size such as "500M"
+def parse_size(size):
+    """
+    Parses a size in bytes, with an optional K, M or G suffix (powers of 1024).
+
+    Args:
+        size (str): The size, e.g. "2G", "500M" or "1048576".
+
+    Returns:
+        int: The size in bytes.
+
+    Raises:
+        ValueError: If the size is malformed or not positive.
+    """
+
+    text = size.strip().upper().rstrip("B")
+    unit = text[-1:] if text[-1:] in SIZE_UNITS else ""
+    try:
+        value = float(text[:len(text) - len(unit)])
+    except ValueError:
+        raise ValueError(f"Invalid size '{size}', expected a number of bytes such as 500M or 2G")
+    if value <= 0:
+        raise ValueError(f"Invalid size '{size}', it must be greater than 0")
+
+    return int(value * SIZE_UNITS[unit])
+
+
+## --------------------------------------------------------------------------
+# Function to add the bundle options to a parser
+def add_bundle_arguments(parser):
+    """
+    Adds the --bundle, --compression and --volume-size options to an argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The script's parser.
+
+    Returns:
+        None
+    """
+
+    parser.add_argument("--bundle", choices=BUNDLE_FORMATS, help="also stream the certificates into a ZIP or tar archive next to the output folder")
+    parser.add_argument("--compression", choices=BUNDLE_COMPRESSIONS, default="stored", help="with --bundle, store the files as they are or deflate them (default: stored)")
+    parser.add_argument("--volume-size", metavar="SIZE", help="with --bundle, split the archive into volumes of at most SIZE, e.g. 500M or 2G")
+
+
+## --------------------------------------------------------------------------
+# Function to read the bundle options from the parsed arguments
+def bundle_options_from_args(args):
+    """
+    Returns the bundle options given on the command line, see `add_bundle_arguments`.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments.
+
+    Returns:
+        dict or None: {"format", "compression", "volume_size"}, or None without --bundle.
+
+    Exits:
+        Exits the program if the volume size is invalid.
+    """
+
+    if not args.bundle:
+        return None
+
+    try:
+        volume_size = parse_size(args.volume_size) if args.volume_size else None
+    except ValueError as e:
+        print(f"\nError: {e}\n\nExiting...\n")
+        sys.exit(1)
+
+    return {"format": args.bundle, "compression": args.compression, "volume_size": volume_size}
+
+
+## --------------------------------------------------------------------------
+# Function to get the path of a volume
+def volume_path(base_path, bundle_format, compression, number=None):
+    """
+    Returns the path of an archive: `<base>.zip`, `<base>.tar` or `<base>.tar.gz`, with
+    `.partNNN` before the extension when the bundle is split into volumes.
+    """
+
+    extension = ".zip" if bundle_format == "zip" else (".tar.gz" if compression == "deflate" else ".tar")
+    return f"{base_path}.part{number:03d}{extension}" if number else f"{base_path}{extension}"
+
+
+## --------------------------------------------------------------------------
+# Function to estimate the bytes a member adds to an archive
+def member_size(bundle, arcname, size):
+    """
+    Returns an upper bound of the bytes a member of `size` bytes adds to a volume, including
+    its headers and its share of the end of the archive.
+    """
+
+    name_length = len(arcname.encode("utf-8"))
+    if bundle["format"] == "zip":
+        # Deflate can grow incompressible data by a few bytes per 16 KB block
+        data_size = size + size // 1000 + 64 if bundle["compression"] == "deflate" else size
+        return ZIP_ENTRY_OVERHEAD + 2 * name_length + data_size
+
+    header_size = TAR_BLOCK_SIZE
+    if name_length > 100 or name_length != len(arcname):  # Long or non-ASCII name
+        header_size += TAR_PAX_OVERHEAD + -(-name_length // TAR_BLOCK_SIZE) * TAR_BLOCK_SIZE
+    return header_size + -(-size // TAR_BLOCK_SIZE) * TAR_BLOCK_SIZE
+
+
+## --------------------------------------------------------------------------
+# Function to start a new volume
+def open_volume(bundle):
+    """
+    Closes the current volume, if any, and opens the next one for writing.
+    """
+
+    import tarfile
+    import zipfile
+
+    close_volume(bundle)
+
+    number = len(bundle["volume_paths"]) + 1 if bundle["volume_size"] else None
+    path = volume_path(bundle["base_path"], bundle["format"], bundle["compression"], number)
+    partial_path = f"{path}.partial"
+
+    file = open(partial_path, "wb")
+    writer = SequentialWriter(file)
+    if bundle["format"] == "zip":
+        compression = zipfile.ZIP_DEFLATED if bundle["compression"] == "deflate" else zipfile.ZIP_STORED
+        archive = zipfile.ZipFile(writer, "w", compression, allowZip64=True)
+    else:
+        archive = tarfile.open(fileobj=writer, mode="w|gz" if bundle["compression"] == "deflate" else "w|", format=tarfile.PAX_FORMAT)
+
+    bundle["volume"] = {"path": path, "partial_path": partial_path, "file": file, "writer": writer, "archive": archive, "size": 0, "members": 0}
+    bundle["volume_paths"].append(path)
+
+
+## --------------------------------------------------------------------------
+# Function to finish the current volume
+def close_volume(bundle, keep=True):
+    """
+    Writes the end of the current volume (central directory or tar end blocks) and moves
+    it into place, or deletes it when `keep` is False.
+    """
+
+    volume = bundle.get("volume")
+    if volume is None:
+        return
+    bundle["volume"] = None
+
+    try:
+        volume["archive"].close()
+    finally:
+        volume["file"].close()
+
+    if keep:
+        os.replace(volume["partial_path"], volume["path"])
+    else:
+        os.remove(volume["partial_path"])
+        bundle["volume_paths"].remove(volume["path"])
+
+
+## --------------------------------------------------------------------------
+# Function to open a bundle
+def open_bundle(base_path, bundle_format="zip", compression="stored", volume_size=None):
+    """
+    Opens an archive the files of a run are streamed into as they are produced.
+
+    Every member is written straight from memory, there are no temporary files, and each
+    volume is written sequentially as `<volume>.partial` and renamed once complete. ZIP
+    archives switch to ZIP64 records on their own past 65535 members or 4 GB.
+
+    With `volume_size`, the bundle is split into volumes of at most that many bytes. Each
+    volume is a complete archive of whole files, so it can be uploaded and extracted on its
+    own; a file larger than the volume size gets a volume of its own.
+
+    Args:
+        base_path (str): Path of the archive without extension, e.g. the output folder path.
+        bundle_format (str, optional): "zip" or "tar".
+        compression (str, optional): "stored", or "deflate" (gzip for tar).
+        volume_size (int, optional): Maximum size of a volume in bytes, None for one archive.
+
+    Returns:
+        dict: The bundle state, for `add_to_bundle` and `close_bundle`.
+
+    Raises:
+        ValueError: If the format or compression is unknown.
+    """
+
+    if bundle_format not in BUNDLE_FORMATS:
+        raise ValueError(f"Unknown bundle format '{bundle_format}', expected one of {', '.join(BUNDLE_FORMATS)}")
+    if compression not in BUNDLE_COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}', expected one of {', '.join(BUNDLE_COMPRESSIONS)}")
+
+    bundle = {
+        "base_path": base_path,
+        "format": bundle_format,
+        "compression": compression,
+        "volume_size": volume_size,
+        "end_size": ZIP_END_OVERHEAD if bundle_format == "zip" else TAR_RECORD_SIZE,
+        "volume": None,
+        "volume_paths": [],
+        "members": 0,
+        "lock": threading.Lock(),
+    }
+    open_volume(bundle)
+
+    return bundle
+
+
+## --------------------------------------------------------------------------
+# Function to add a file to a bundle
+def add_to_bundle(bundle, arcname, data):
+    """
+    Appends a file to the bundle, starting a new volume first if it would not fit in the
+    current one. Safe to call from several threads.
+
+    Args:
+        bundle (dict): The bundle state, see `open_bundle`.
+        arcname (str): Path of the file inside the archive.
+        data (bytes): Contents of the file.
+
+    Returns:
+        None
+    """
+
+    import io
+    import tarfile
+    import zipfile
+
+    with bundle["lock"]:
+        volume = bundle["volume"]
+        size = member_size(bundle, arcname, len(data))
+        if bundle["volume_size"] and volume["members"] and volume["size"] + size + bundle["end_size"] > bundle["volume_size"]:
+            open_volume(bundle)
+            volume = bundle["volume"]
+
+        if bundle["format"] == "zip":
+            member = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+            member.compress_type = volume["archive"].compression
+            member.external_attr = 0o644 << 16
+            volume["archive"].writestr(member, data)
+        else:
+            member = tarfile.TarInfo(arcname)
+            member.size = len(data)
+            member.mtime = int(time.time())
+            member.mode = 0o644
+            volume["archive"].addfile(member, io.BytesIO(data))
+
+        volume["size"] += size
+        volume["members"] += 1
+        bundle["members"] += 1
+
+
+## --------------------------------------------------------------------------
+# Function to finish a bundle
+def close_bundle(bundle, keep=True):
+    """
+    Finishes the last volume of a bundle.
+
+    Args:
+        bundle (dict): The bundle state, see `open_bundle`.
+        keep (bool, optional): False to delete the unfinished volume, e.g. after an interrupt.
+
+    Returns:
+        list: Paths of the finished volumes.
+    """
+
+    with bundle["lock"]:
+        close_volume(bundle, keep)
+
+    return list(bundle["volume_paths"])
+
+
+## --------------------------------------------------------------------------
+# Function to describe the volumes of a bundle
+def describe_bundle(volume_paths):
+    """
+    Returns the volumes of a bundle and their sizes for the summary of a run, e.g.
+    '"Generated_Certificates.zip" (12.3 MB)'.
+    """
+
+    described = []
+    for path in volume_paths:
+        size = os.path.getsize(path)
+        described.append(f"\"{os.path.basename(path)}\" ({size / (1 << 20):.1f} MB)" if size >= 1 << 20 else f"\"{os.path.basename(path)}\" ({size / 1024:.0f} KB)")
+
+    return ", ".join(described)
+
+
+### ===========================================================================
+## Main
+#
+
+if __name__ == "__main__":
+    """
+    Bundles the files of an existing folder (e.g. a Generated_Certificates folder) into ZIP
+    or tar volumes.
+
+    Usage:
+        python bundle.py <folder> [--format zip|tar] [--compression stored|deflate] [--volume-size SIZE] [-o BASE_PATH]
+    """
+
+    parser = argparse.ArgumentParser(description="Bundle the files of a folder into ZIP or tar volumes.")
+    parser.add_argument("folder", help="folder to bundle, e.g. a Generated_Certificates folder")
+    parser.add_argument("--format", choices=BUNDLE_FORMATS, default="zip", help="archive format (default: zip)")
+    parser.add_argument("--compression", choices=BUNDLE_COMPRESSIONS, default="stored", help="store the files as they are or deflate them (default: stored)")
+    parser.add_argument("--volume-size", metavar="SIZE", help="split into volumes of at most SIZE, e.g. 500M or 2G")
+    parser.add_argument("-o", "--output", metavar="BASE_PATH", help="archive path without extension (default: the folder path)")
+    args = parser.parse_args()
+
+    folder_path = os.path.abspath(args.folder)
+    if not os.path.isdir(folder_path):
+        print(f"\nFolder '{args.folder}' not found.\n\nExiting...\n")
+        sys.exit(1)
+
+    try:
+        volume_size = parse_size(args.volume_size) if args.volume_size else None
+    except ValueError as e:
+        print(f"\nError: {e}\n\nExiting...\n")
+        sys.exit(1)
+
+    bundle = open_bundle(args.output or folder_path, args.format, args.compression, volume_size)
+    try:
+        for dir_path, dir_names, file_names in os.walk(folder_path):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                file_path = os.path.join(dir_path, file_name)
+                with open(file_path, "rb") as file:
+                    add_to_bundle(bundle, os.path.relpath(file_path, os.path.dirname(folder_path)).replace(os.sep, "/"), file.read())
+    except (KeyboardInterrupt, OSError) as e:
+        close_bundle(bundle, keep=False)
+        print(f"\n\nBundling interrupted: {e or 'Keyboard Interrupt!'}\n\nExiting...\n")
+        sys.exit(1)
+
+    volume_paths = close_bundle(bundle)
+    print(f"\n{bundle['members']} file(s) bundled into {describe_bundle(volume_paths)}\n")
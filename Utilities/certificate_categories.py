@@ -0,0 +1,118 @@
+import os
+import csv
+
+
+# Spreadsheet column naming the certificate category of each row
+CATEGORY_COLUMN = "Category"
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to normalise a category name
+def normalize_category(category):
+    """
+    Returns the lookup key of a category: lowercase with single spaces, so "Speaker ",
+    "speaker" and "SPEAKER" route to the same template.
+
+    Args:
+        category (str or None): The category as written in the spreadsheet or config.
+
+    Returns:
+        str: The normalised category, empty if there is none.
+    """
+
+    return " ".join((category or "").split()).lower()
+
+
+## --------------------------------------------------------------------------
+# Function to read the certificate categories from the config
+def get_certificate_routes(config, template_dir_path, layouts):
+    """
+    Reads the template and layout profile of each certificate category from the config.
+
+    Config keys:
+        certificate_categories (dict): Maps each category to {"template": <PDF file in
+                                       template_dir_path>, "layout": <key of `layouts`>}.
+                                       Empty or missing for a single template.
+
+    Args:
+        config (dict): The loaded config file.
+        template_dir_path (str): Directory holding the certificate templates.
+        layouts (dict): The layout profiles, see `certificate_generator.CERTIFICATE_LAYOUTS`.
+
+    Returns:
+        dict: Maps each normalised category to (template_file_path, layout); empty if no
+              categories are configured.
+
+    Exits:
+        Exits the program if a category, template or layout is invalid.
+    """
+
+    categories = config.get("certificate_categories") or {}
+    if not isinstance(categories, dict):
+        print("\nInvalid 'certificate_categories' in the config file!\nPlease map each category to its \"template\" and \"layout\".\n\nExiting...\n")
+        exit(1)
+
+    routes = {}
+    for category, route in categories.items():
+        key = normalize_category(category)
+        if not key or key in routes or not isinstance(route, dict):
+            print(f"\nInvalid certificate category '{category}' in the config file!\nPlease give each category a unique name, a \"template\" and a \"layout\".\n\nExiting...\n")
+            exit(1)
+
+        template_file = (route.get("template") or "").strip()
+        template_file_path = os.path.join(template_dir_path, template_file)
+        if not template_file.lower().endswith(".pdf") or not os.path.isfile(template_file_path):
+            print(f"\nTemplate '{template_file}' of the '{category}' certificates not found!\nPlease place it in the \"{os.path.basename(template_dir_path)}\" directory.\n\nExiting...\n")
+            exit(1)
+
+        layout_name = (route.get("layout") or "").strip().lower()
+        if layout_name not in layouts:
+            print(f"\nInvalid layout '{route.get('layout')}' of the '{category}' certificates!\nPlease select among {', '.join(repr(layout) for layout in layouts)}.\n\nExiting...\n")
+            exit(1)
+
+        routes[key] = (template_file_path, layouts[layout_name])
+
+    return routes
+
+
+## --------------------------------------------------------------------------
+# Function to check the categories of a spreadsheet
+def check_categories(csv_file_path, routes):
+    """
+    Checks that the spreadsheet has a 'Category' column and that every category in it is
+    configured, so a typo stops the run before any certificate is rendered.
+
+    Rows without a category are left for `extract_spreadsheet`, which only requires one
+    from the attendees.
+
+    Args:
+        csv_file_path (str): Path to the CSV file.
+        routes (dict): The configured categories, see `get_certificate_routes`.
+
+    Returns:
+        None
+
+    Exits:
+        Exits the program if the column is missing or a category is not configured.
+    """
+
+    unknown = {}
+    with open(csv_file_path, "r", encoding="utf-8") as csv_file:
+        reader = csv.DictReader(csv_file)
+        if CATEGORY_COLUMN not in (reader.fieldnames or []):
+            print(f"\nError: The '{CATEGORY_COLUMN}' column is required to select the certificate template of each row.\n\nExiting...\n")
+            exit(1)
+        for row_index, row in enumerate(reader, start=2):
+            category = normalize_category(row[CATEGORY_COLUMN])
+            if category and category not in routes:
+                unknown.setdefault(row[CATEGORY_COLUMN].strip(), []).append(row_index)
+
+    if unknown:
+        print("\nError: Categories not configured in 'certificate_categories':")
+        for category, row_indices in unknown.items():
+            print(f"  '{category}' (row {', '.join(str(index) for index in row_indices[:5])}{', ...' if len(row_indices) > 5 else ''})")
+        print(f"\nConfigured categories: {', '.join(repr(category) for category in routes)}\n\nExiting...\n")
+        exit(1)
@@ -0,0 +1,300 @@
+import os
+import sys
+import base64
+import sqlite3
+import hashlib
+
+# Get the parent directory, add it to python path and import the modules
+parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(parent_dir)
+
+from Utilities.dedupe import normalize_email
+from Utilities.recipient_index import utc_timestamp
+from Utilities.stage_cache import file_digest
+
+
+ROOT_REPO_PATH = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DEFAULT_CERTIFICATE_INDEX_PATH = os.path.join(ROOT_REPO_PATH, "certificate_index.db")
+
+CERTIFICATE_ID_LENGTH = 10  # Base32 characters, 50 bits
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS certificates (
+    cert_id       TEXT PRIMARY KEY,
+    event         TEXT NOT NULL,
+    row_key       TEXT NOT NULL,
+    name          TEXT,
+    email         TEXT,
+    template_hash TEXT,
+    output_hash   TEXT,
+    filename      TEXT,
+    issued_at     TEXT NOT NULL,
+    UNIQUE (event, row_key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS certificate_files (
+    cert_id       TEXT NOT NULL,
+    output_hash   TEXT NOT NULL,
+    template_hash TEXT,
+    filename      TEXT,
+    issued_at     TEXT NOT NULL,
+    PRIMARY KEY (cert_id, output_hash)
+) WITHOUT ROWID;
+"""
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to open (and create if needed) the certificate index
+def open_certificate_index(db_path=DEFAULT_CERTIFICATE_INDEX_PATH):
+    """
+    Opens the local SQLite certificate index, creating the database and its table if needed.
+
+    Args:
+        db_path (str, optional): Path to the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: An open connection to the index.
+
+    Exits:
+        Exits the program if the database cannot be opened.
+    """
+
+    try:
+        connection = sqlite3.connect(db_path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+    except sqlite3.Error as e:
+        print(f"\nError opening the certificate index '{os.path.basename(db_path)}'\n{e}\n\nExiting...\n")
+        exit(1)
+
+    return connection
+
+
+## --------------------------------------------------------------------------
+# Function to get the key identifying a recipient row within an event
+def certificate_row_key(name, email=None, occurrence=1):
+    """
+    Returns the key of a row: its normalised email, or its name and how many times that
+    name occurred so far when there is no email (e.g. a wordlist).
+
+    Args:
+        name (str): The recipient's name.
+        email (str, optional): The recipient's email address.
+        occurrence (int, optional): 1 for the first row with this name, 2 for the second, ...
+
+    Returns:
+        str: The row key.
+    """
+
+    email_key = normalize_email(email)
+    if email_key:
+        return f"email:{email_key}"
+
+    return f"name:{' '.join(name.split()).lower()}#{occurrence}"
+
+
+## --------------------------------------------------------------------------
+# Function to derive a certificate ID
+def make_certificate_id(event, row_key, length=CERTIFICATE_ID_LENGTH):
+    """
+    Derives a compact, URL-safe certificate ID from the event and the row key.
+
+    Args:
+        event (str): The event the certificate belongs to.
+        row_key (str): The row key, see `certificate_row_key`.
+        length (int, optional): Number of base32 characters.
+
+    Returns:
+        str: The certificate ID (A-Z and 2-7).
+    """
+
+    digest = hashlib.sha256(f"{event}\0{row_key}".encode("utf-8")).digest()
+    return base64.b32encode(digest).decode("ascii")[:length]
+
+
+## --------------------------------------------------------------------------
+# Function to get (or reserve) the certificate ID of a row
+def assign_certificate_id(connection, event, row_key, commit=True):
+    """
+    Returns the certificate ID of a row, reserving a new one in the index the first time.
+
+    The same event and row always get the same ID. If the derived ID is already taken by
+    another row, it is lengthened one character at a time until it is unique.
+
+    Args:
+        connection (sqlite3.Connection): An open certificate index.
+        event (str): The event the certificate belongs to.
+        row_key (str): The row key, see `certificate_row_key`.
+        commit (bool, optional): Whether to commit immediately.
+
+    Returns:
+        str: The certificate ID.
+    """
+
+    existing = connection.execute("SELECT cert_id FROM certificates WHERE event = ? AND row_key = ?", (event, row_key)).fetchone()
+    if existing:
+        return existing[0]
+
+    length = CERTIFICATE_ID_LENGTH
+    while True:
+        cert_id = make_certificate_id(event, row_key, length)
+        inserted = connection.execute(
+            "INSERT OR IGNORE INTO certificates (cert_id, event, row_key, issued_at) VALUES (?, ?, ?, ?)",
+            (cert_id, event, row_key, utc_timestamp()),
+        ).rowcount
+        if inserted:
+            break
+        length += 1
+
+    if commit:
+        connection.commit()
+
+    return cert_id
+
+
+## --------------------------------------------------------------------------
+# Function to record the generated certificate of an ID
+def record_certificate(connection, cert_id, name, email, template_hash, output_path, commit=True):
+    """
+    Stores the details of a generated certificate, so it can be verified later.
+
+    The certificate record keeps the details of the first file issued under the ID and is
+    never overwritten. Every file issued under the ID, including re-runs that render it
+    again, is added to its history, so each of them still verifies.
+
+    Args:
+        connection (sqlite3.Connection): An open certificate index.
+        cert_id (str): The certificate ID, from `assign_certificate_id`.
+        name (str): Name printed on the certificate.
+        email (str or None): The recipient's email address.
+        template_hash (str): Digest of the template PDF.
+        output_path (str): Path of the generated certificate.
+        commit (bool, optional): Whether to commit immediately.
+
+    Returns:
+        None
+    """
+
+    output_hash = file_digest(output_path)
+    filename = os.path.basename(output_path)
+    timestamp = utc_timestamp()
+    connection.execute(
+        """UPDATE certificates SET name = ?, email = ?, template_hash = ?, output_hash = ?, filename = ?, issued_at = ?
+           WHERE cert_id = ? AND output_hash IS NULL""",
+        (" ".join(name.split()), (email or "").strip() or None, template_hash, output_hash, filename, timestamp, cert_id),
+    )
+    connection.execute(
+        "INSERT OR IGNORE INTO certificate_files (cert_id, output_hash, template_hash, filename, issued_at) VALUES (?, ?, ?, ?, ?)",
+        (cert_id, output_hash, template_hash, filename, timestamp),
+    )
+    if commit:
+        connection.commit()
+
+
+## --------------------------------------------------------------------------
+# Function to look up a certificate by its ID
+def lookup_certificate(connection, cert_id):
+    """
+    Returns the record of a certificate ID, with a single primary key lookup.
+
+    Args:
+        connection (sqlite3.Connection): An open certificate index.
+        cert_id (str): The certificate ID (case and surrounding spaces are ignored).
+
+    Returns:
+        dict or None: The certificate record, or None if the ID is unknown.
+    """
+
+    cursor = connection.execute("SELECT * FROM certificates WHERE cert_id = ?", (cert_id.strip().upper(),))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+
+    return dict(zip((column[0] for column in cursor.description), row))
+
+
+## --------------------------------------------------------------------------
+# Function to look up a file issued under a certificate ID
+def lookup_certificate_file(connection, cert_id, output_hash):
+    """
+    Returns the issue of a certificate file, to check that a file is one issued under an ID.
+
+    Args:
+        connection (sqlite3.Connection): An open certificate index.
+        cert_id (str): The certificate ID (case and surrounding spaces are ignored).
+        output_hash (str): Digest of the file, see `Utilities.stage_cache.file_digest`.
+
+    Returns:
+        dict or None: {"output_hash", "template_hash", "filename", "issued_at"}, or None if no
+                      such file was issued under the ID.
+    """
+
+    cert_id = cert_id.strip().upper()
+    row = connection.execute(
+        "SELECT output_hash, template_hash, filename, issued_at FROM certificate_files WHERE cert_id = ? AND output_hash = ?",
+        (cert_id, output_hash),
+    ).fetchone()
+    if row is None:
+        # Indexes written before the file history only hold the certificate record
+        row = connection.execute(
+            "SELECT output_hash, template_hash, filename, issued_at FROM certificates WHERE cert_id = ? AND output_hash = ?",
+            (cert_id, output_hash),
+        ).fetchone()
+    if row is None:
+        return None
+
+    return dict(zip(("output_hash", "template_hash", "filename", "issued_at"), row))
+
+
+### ===========================================================================
+## Main
+#
+
+if __name__ == "__main__":
+    """
+    Verifies certificates against the certificate index.
+
+    Usage:
+        python certificate_index.py verify <certificate id> [certificate.pdf]
+    """
+
+    usage = "\nUsage:\n  python certificate_index.py verify <certificate id> [certificate.pdf]\n"
+    if len(sys.argv) < 3 or sys.argv[1] != "verify":
+        print(usage)
+        sys.exit(1)
+
+    connection = open_certificate_index()
+    certificate = lookup_certificate(connection, sys.argv[2])
+
+    if certificate is None or not certificate["output_hash"]:
+        connection.close()
+        print(f"\nCertificate '{sys.argv[2]}' was not issued.\n")
+        sys.exit(1)
+
+    print(f"\nCertificate '{certificate['cert_id']}':")
+    print(f"  Name: {certificate['name']}")
+    print(f"  Email: {certificate['email'] or '-'}")
+    print(f"  Event: {certificate['event']}")
+    print(f"  Issued: {certificate['issued_at']}")
+    print(f"  File: {certificate['filename']}")
+
+    if len(sys.argv) > 3:
+        try:
+            issued_file = lookup_certificate_file(connection, certificate["cert_id"], file_digest(sys.argv[3]))
+        except OSError as e:
+            connection.close()
+            print(f"\nError reading '{sys.argv[3]}': {e}\n")
+            sys.exit(1)
+        connection.close()
+        if issued_file:
+            print(f"  File check: matches the certificate issued on {issued_file['issued_at']}")
+        else:
+            print("  File check: DOES NOT match the issued certificate")
+        print()
+        sys.exit(0 if issued_file else 1)
+    connection.close()
+    print()
@@ -0,0 +1,246 @@
+import os
+import sys
+
+
+# Get the parent directory, add it to python path so `python Utilities/cli.py` works as well
+parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+
+ROOT_REPO_PATH = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+
+# Subcommands running a tool script, which parses the rest of the arguments itself
+TOOL_SCRIPTS = {
+    "certs": os.path.join(ROOT_REPO_PATH, "Certificate_Generator", "certificate_generator.py"),
+    "email": os.path.join(ROOT_REPO_PATH, "Email_Sender", "send_email.py"),
+    "qr": os.path.join(ROOT_REPO_PATH, "QRCode_Generator", "qrcode_generator.py"),
+    "pipeline": os.path.join(ROOT_REPO_PATH, "Certificate_Email_Automation", "extract_certify_and_email.py"),
+    "serve": os.path.join(ROOT_REPO_PATH, "Certificate_Email_Automation", "registration_service.py"),
+}
+
+TOOL_DESCRIPTIONS = {
+    "certs": "generate certificates from the template and the wordlist",
+    "email": "send bulk emails to the recipients of the spreadsheet",
+    "qr": "generate QR codes, interactively or one per CSV row",
+    "pipeline": "extract attendees, generate their certificates and email them",
+    "serve": "serve certificates, QR codes and emails on demand over local HTTP",
+}
+
+ATTACHMENT_MODES = ("Common", "Respective", "Other")
+
+STARTUP_BUDGET_MS = 100     # Start-up time `importtime` checks every benchmarked command against
+IMPORTTIME_TOP_MODULES = 8  # Slowest imports listed per command
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to run a tool script in this process
+def run_tool(command, arguments):
+    """
+    Runs the script of a subcommand as if it was started directly, with `arguments` as its
+    command line. The script's own imports (ReportLab, PyPDF2, Pillow, qrcode, smtplib)
+    are only loaded here, once the subcommand is known.
+
+    Args:
+        command (str): One of TOOL_SCRIPTS.
+        arguments (list): Command line arguments for the script.
+
+    Returns:
+        None
+    """
+
+    import runpy
+
+    script_path = TOOL_SCRIPTS[command]
+    sys.argv = [script_path] + list(arguments)
+    sys.path.insert(0, os.path.dirname(script_path))
+    runpy.run_path(script_path, run_name="__main__")
+
+
+## --------------------------------------------------------------------------
+# Function to validate a spreadsheet without running a tool
+def validate_spreadsheet(spreadsheet_path, attachment_mode="Other", attachments_dir_path=None, attendance=False, body_template_path=None):
+    """
+    Runs the checks of the tools on a spreadsheet, without sending or generating anything.
+
+    The spreadsheet is never modified: it is copied (or a XLSX/ODS workbook converted) to a
+    temporary CSV file, whose header is cleaned and checked like the tools do.
+
+    Args:
+        spreadsheet_path (str): Path to the CSV, XLSX or ODS spreadsheet.
+        attachment_mode (str, optional): "Common", "Respective" or "Other" (certificates).
+        attachments_dir_path (str, optional): Directory of the attachments to check for.
+        attendance (bool, optional): Also require a TRUE/FALSE 'Attendance' column with at
+                                     least one attendee, as the automation script does.
+        body_template_path (str, optional): HTML email body template to check.
+
+    Returns:
+        None
+
+    Exits:
+        Exits the program on the first failed check, like the tools.
+    """
+
+    import shutil
+    import tempfile
+    from Utilities.spreadsheet_readers import export_to_csv
+    from Utilities.utils import check_attachments, check_attendance, check_body_template, check_csv, clean_csv_fieldnames
+
+    if not os.path.isfile(spreadsheet_path):
+        print(f"\nSpreadsheet '{spreadsheet_path}' not found.\n\nExiting...\n")
+        exit(1)
+
+    if body_template_path:
+        check_body_template(body_template_path)
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        csv_file_path = os.path.join(temp_dir_path, "spreadsheet.csv")
+        if spreadsheet_path.lower().endswith(".csv"):
+            shutil.copyfile(spreadsheet_path, csv_file_path)
+        else:
+            try:
+                export_to_csv(spreadsheet_path, csv_file_path)
+            except Exception as e:
+                print(f"\nError in reading spreadsheet '{os.path.basename(spreadsheet_path)}'!\nPlease ensure that the file is not corrupted.\n{e}\n\nExiting...\n")
+                exit(1)
+
+        clean_csv_fieldnames(csv_file_path)
+        check_csv(csv_file_path, attachment_mode, "Attendance" if attendance else None)
+        if attendance:
+            check_attendance(csv_file_path)
+        if attachments_dir_path:
+            check_attachments(csv_file_path, attachments_dir_path, attachment_mode)
+
+    print(f"\n'{os.path.basename(spreadsheet_path)}' is valid.\n")
+
+
+## --------------------------------------------------------------------------
+# Function to parse the output of `python -X importtime`
+def parse_importtime(stderr):
+    """
+    Reads the per-module import times printed by `python -X importtime`.
+
+    Args:
+        stderr (str): Standard error of the run.
+
+    Returns:
+        tuple: (total_us, modules) where total_us is the import time of the top-level imports
+               in microseconds, and modules lists (cumulative_us, module) of those imports.
+    """
+
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # The header line
+        name = fields[2].rstrip()
+        # Nested imports are indented under their parent, which already counts them
+        if name.startswith("  "):
+            continue
+        modules.append((int(fields[1]), name.strip()))
+
+    return sum(cumulative for cumulative, _ in modules), modules
+
+
+## --------------------------------------------------------------------------
+# Function to measure the start-up time of the subcommands
+def benchmark_startup(budget_ms=STARTUP_BUDGET_MS, top=IMPORTTIME_TOP_MODULES):
+    """
+    Starts every subcommand with `--help`, and `validate` on a small spreadsheet, in a fresh
+    interpreter; reports the wall time, the import time and the slowest top-level imports
+    (from `-X importtime`) of each, against the start-up budget.
+
+    Args:
+        budget_ms (float, optional): Start-up budget in milliseconds.
+        top (int, optional): Number of slowest imports listed per command.
+
+    Returns:
+        bool: True if every command started within the budget.
+    """
+
+    import time
+    import tempfile
+    import subprocess
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        spreadsheet_path = os.path.join(temp_dir_path, "recipients.csv")
+        with open(spreadsheet_path, "w", encoding="utf-8") as spreadsheet_file:
+            spreadsheet_file.write("Full Name,Email,Attendance\nJane Doe,jane@example.com,TRUE\n")
+
+        # (label, arguments) of each benchmarked command
+        commands = [("--help", ["--help"])]
+        commands += [(f"{command} --help", [command, "--help"]) for command in TOOL_SCRIPTS]
+        commands.append(("validate <spreadsheet> --attendance", ["validate", spreadsheet_path, "--attendance"]))
+
+        within_budget = True
+        print(f"\nStart-up time of each command (budget {budget_ms:.0f} ms):")
+        for label, arguments in commands:
+            command_line = [sys.executable, "-m", "Utilities.cli", *arguments]
+            # Wall time without -X importtime, which slows the imports down
+            start_time = time.perf_counter()
+            subprocess.run(command_line, cwd=ROOT_REPO_PATH, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            wall_ms = (time.perf_counter() - start_time) * 1000
+
+            result = subprocess.run([sys.executable, "-X", "importtime", *command_line[1:]], cwd=ROOT_REPO_PATH,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            total_us, modules = parse_importtime(result.stderr)
+
+            status = "ok" if wall_ms <= budget_ms else "OVER BUDGET"
+            within_budget = within_budget and wall_ms <= budget_ms
+            print(f"\n  {label}: {wall_ms:.0f} ms wall, {total_us / 1000:.0f} ms importing - {status}")
+            for cumulative, module in sorted(modules, reverse=True)[:top]:
+                print(f"    {cumulative / 1000:7.1f} ms  {module}")
+
+    print()
+    return within_budget
+
+
+### ===========================================================================
+## Main
+#
+
+if __name__ == "__main__":
+    """
+    Single entry point for the tools, which only imports what the chosen subcommand needs.
+
+    Usage (from the repository root):
+        python -m Utilities.cli certs|email|qr|pipeline|serve [tool arguments]
+        python -m Utilities.cli validate <spreadsheet> [--mode MODE] [--attachments DIR] [--attendance] [--body TEMPLATE]
+        python -m Utilities.cli importtime [--budget MS]
+    """
+
+    # Tool subcommands are dispatched before argparse, so `--help` reaches the tool's parser
+    if len(sys.argv) > 1 and sys.argv[1] in TOOL_SCRIPTS:
+        run_tool(sys.argv[1], sys.argv[2:])
+        sys.exit(0)
+
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m Utilities.cli", description="Certificate, email and QR code tools.")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    for command, description in TOOL_DESCRIPTIONS.items():
+        subparsers.add_parser(command, help=f"{description} (see `{command} --help`)")
+
+    validate_parser = subparsers.add_parser("validate", help="check a spreadsheet (and attachments, body template) without sending anything")
+    validate_parser.add_argument("spreadsheet", help="CSV, XLSX or ODS spreadsheet")
+    validate_parser.add_argument("--mode", choices=ATTACHMENT_MODES, default="Other", help="attachment mode of the spreadsheet (default: Other, i.e. certificates)")
+    validate_parser.add_argument("--attachments", metavar="DIR", help="check that every attachment (or certificate, in Other mode) is in this directory")
+    validate_parser.add_argument("--attendance", action="store_true", help="require the 'Attendance' column and at least one attendee")
+    validate_parser.add_argument("--body", metavar="TEMPLATE", help="also check this HTML email body template")
+
+    importtime_parser = subparsers.add_parser("importtime", help="measure the start-up time of every command with -X importtime")
+    importtime_parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS, metavar="MS", help=f"start-up budget in milliseconds (default: {STARTUP_BUDGET_MS})")
+
+    args = parser.parse_args()
+
+    if args.command == "validate":
+        validate_spreadsheet(args.spreadsheet, args.mode, args.attachments, args.attendance, args.body)
+    elif args.command == "importtime":
+        sys.exit(0 if benchmark_startup(args.budget) else 1)
+    else:
+        parser.print_help()
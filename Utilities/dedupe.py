@@ -0,0 +1,383 @@
+import os
+import re
+import csv
+import sys
+import unicodedata
+from collections import defaultdict
+
+
+# Providers which ignore dots in the local part and deliver "+tag" aliases to the same inbox
+DOTLESS_DOMAINS = {"gmail.com", "googlemail.com"}
+DOMAIN_ALIASES = {"googlemail.com": "gmail.com"}
+
+MAX_POSTING_LENGTH = 50    # Skip segments shared by more names than this (very short or common ones)
+MAX_NAME_DISTANCE = 2
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to get a canonical key for an email address
+def normalize_email(email):
+    """
+    Reduces an email address to a canonical key so that aliases of one inbox compare equal.
+
+    Lowercases the address, drops any "+tag" suffix from the local part and, for providers
+    that ignore them (Gmail), removes the dots from the local part.
+
+    Args:
+        email (str): The email address as entered in the spreadsheet.
+
+    Returns:
+        str: The canonical email key, or an empty string for a blank address.
+    """
+
+    email = (email or "").strip().lower()
+    if "@" not in email:
+        return email
+
+    local, _, domain = email.rpartition("@")
+    domain = DOMAIN_ALIASES.get(domain, domain)
+    local = local.split("+", 1)[0]
+    if domain in DOTLESS_DOMAINS:
+        local = local.replace(".", "")
+
+    return f"{local}@{domain}"
+
+
+## --------------------------------------------------------------------------
+# Function to get a canonical key for a name
+def normalize_name(name):
+    """
+    Reduces a name to a canonical key by folding case, stripping accents and punctuation
+    and collapsing whitespace.
+
+    Args:
+        name (str): The name as entered in the spreadsheet.
+
+    Returns:
+        str: The canonical name key.
+    """
+
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    stripped = re.sub(r"[^\w\s]", " ", stripped.casefold())
+
+    return " ".join(stripped.split())
+
+
+## --------------------------------------------------------------------------
+# Function to compute the edit distance between two strings with an early cut-off
+def bounded_levenshtein(first, second, limit):
+    """
+    Computes the Levenshtein distance between two strings, giving up once it exceeds a limit.
+
+    Args:
+        first (str): The first string.
+        second (str): The second string.
+        limit (int): The largest distance of interest.
+
+    Returns:
+        int: The edit distance, or `limit + 1` if it is larger than `limit`.
+    """
+
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+
+    # Suspects usually share most of the name, and a shared prefix or suffix leaves the distance unchanged
+    prefix = 0
+    shortest = min(len(first), len(second))
+    while prefix < shortest and first[prefix] == second[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < shortest - prefix and first[-1 - suffix] == second[-1 - suffix]:
+        suffix += 1
+    first, second = first[prefix:len(first) - suffix], second[prefix:len(second) - suffix]
+    if not first or not second:
+        return min(len(first) + len(second), limit + 1)
+
+    # Each character of one name missing from the other costs at least one edit
+    first_chars, second_chars = set(first), set(second)
+    if len(first_chars - second_chars) > limit or len(second_chars - first_chars) > limit:
+        return limit + 1
+
+    if len(first) > len(second):
+        first, second = second, first
+
+    # Only cells within `limit` of the diagonal can hold a distance <= limit
+    out_of_band = limit + 1
+    previous = [column if column <= limit else out_of_band for column in range(len(first) + 1)]
+    for row in range(1, len(second) + 1):
+        second_char = second[row - 1]
+        low = max(1, row - limit)
+        high = min(len(first), row + limit)
+        current = [out_of_band] * (len(first) + 1)
+        current[0] = row if row <= limit else out_of_band
+        for column in range(low, high + 1):
+            current[column] = min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + (first[column - 1] != second_char),
+            )
+        if min(current[low - 1:high + 1]) > limit:
+            return out_of_band
+        previous = current
+
+    return min(previous[-1], out_of_band)
+
+
+## --------------------------------------------------------------------------
+# Function to split a name into the segments of the name index
+def name_segments(length, parts):
+    """
+    Splits a name of the given length into `parts` contiguous segments of (almost) equal length.
+
+    Edits touch at most one segment each, so when two names are within `parts - 1` edits, one
+    segment of either name appears unchanged in the other, shifted by at most `parts - 1`
+    characters (the pigeonhole principle). The name index only has to look those up.
+
+    Args:
+        length (int): Length of the name key.
+        parts (int): Number of segments, the largest edit distance of interest plus one.
+
+    Returns:
+        list: (start, length) of each segment; names shorter than `parts` get empty segments.
+    """
+
+    base, longer = divmod(length, parts)
+    segments = []
+    start = 0
+    for part in range(parts):
+        segment_length = base + (part >= parts - longer)
+        segments.append((start, segment_length))
+        start += segment_length
+
+    return segments
+
+
+## --------------------------------------------------------------------------
+# Function to get the index keys a name is looked up with
+def segment_probes(name_key, max_distance):
+    """
+    Lists the name index keys under which the names within `max_distance` edits of a name are found.
+
+    Args:
+        name_key (str): A name already reduced with `normalize_name`.
+        max_distance (int): Largest edit distance of interest.
+
+    Returns:
+        set: (length, part, segment) keys, see `name_segments`.
+    """
+
+    probes = set()
+    for length in range(max(len(name_key) - max_distance, 1), len(name_key) + max_distance + 1):
+        # The edits before segment `part` (at most `part`) and after it (at most `max_distance - part`)
+        # both bound its shift, which leaves only a few positions to look at (Pass-Join)
+        shift = len(name_key) - length
+        for part, (start, segment_length) in enumerate(name_segments(length, max_distance + 1)):
+            first = max(start - part, start + shift - (max_distance - part), 0)
+            last = min(start + part, start + shift + (max_distance - part), len(name_key) - segment_length)
+            for position in range(first, last + 1):
+                probes.add((length, part, name_key[position:position + segment_length]))
+
+    return probes
+
+
+## --------------------------------------------------------------------------
+# Function to find groups of likely duplicate rows
+def find_near_duplicates(rows, max_distance=MAX_NAME_DISTANCE):
+    """
+    Groups rows that are likely to describe the same person.
+
+    Rows whose canonical email keys or name keys match are always grouped. Rows whose names
+    are only close (at most `max_distance` edits apart) join a group only while every name of
+    the group stays within `max_distance` of every other, so a chain of small typos ("Ann Lee",
+    "Ann Lea", "Anna Lea", "Anna Leo", "Dana Leo") does not pull distant names together; a
+    close pair that does not fit into one group is reported as a group of its own.
+
+    Names are found through a hash index of their segments (see `name_segments`), so each
+    name is only verified against the handful of names sharing a segment with it instead of
+    every other row, which keeps the whole pass roughly linear in the number of rows.
+
+    Args:
+        rows (iterable): Tuples of (row_index, name, email).
+        max_distance (int, optional): Largest edit distance at which two names are suspects.
+
+    Returns:
+        list: Groups of suspect rows, each a list of (row_index, name, email) tuples sorted by row index.
+    """
+
+    def find(parent, node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(parent, first, second):
+        first_root, second_root = find(parent, first), find(parent, second)
+        if first_root != second_root:
+            parent[max(first_root, second_root)] = min(first_root, second_root)
+
+    records = []
+    name_keys = []
+    same_person = []    # Rows linked by an exact email or name key
+    email_owner = {}
+    name_owner = {}
+    name_chars = {}
+    segment_index = defaultdict(list)
+    close_pairs = []
+
+    for position, (row_index, name, email) in enumerate(rows):
+        records.append((row_index, name, email))
+        same_person.append(position)
+
+        email_key = normalize_email(email)
+        if email_key:
+            if email_key in email_owner:
+                union(same_person, position, email_owner[email_key])
+            else:
+                email_owner[email_key] = position
+
+        name_key = normalize_name(name)
+        name_keys.append(name_key)
+        if not name_key:
+            continue
+        if name_key in name_owner:
+            union(same_person, position, name_owner[name_key])
+            continue
+        name_owner[name_key] = position
+        name_chars[name_key] = chars = set(name_key)
+
+        candidates = set()
+        for probe in segment_probes(name_key, max_distance):
+            posting = segment_index.get(probe)
+            if posting and len(posting) <= MAX_POSTING_LENGTH:
+                candidates.update(posting)
+        for part, (start, segment_length) in enumerate(name_segments(len(name_key), max_distance + 1)):
+            segment_index[(len(name_key), part, name_key[start:start + segment_length])].append(name_key)
+
+        for candidate in candidates:
+            # Each character of one name missing from the other costs at least one edit
+            if len(chars - name_chars[candidate]) > max_distance or len(name_chars[candidate] - chars) > max_distance:
+                continue
+            distance = bounded_levenshtein(name_key, candidate, max_distance)
+            if distance <= max_distance:
+                close_pairs.append((distance, name_owner[candidate], position))
+
+    # Close names are merged closest first, and only into groups whose names are all close to them
+    people = [find(same_person, position) for position in range(len(records))]
+    group_of = list(people)
+    group_names = defaultdict(set)
+    for position, name_key in enumerate(name_keys):
+        if name_key:
+            group_names[people[position]].add(name_key)
+
+    separate_pairs = set()
+    for _, first, second in sorted(close_pairs):
+        first_group, second_group = find(group_of, people[first]), find(group_of, people[second])
+        if first_group == second_group:
+            continue
+        if all(bounded_levenshtein(first_name, second_name, max_distance) <= max_distance
+               for first_name in group_names[first_group] for second_name in group_names[second_group]):
+            union(group_of, first_group, second_group)
+            group_names[min(first_group, second_group)] = group_names.pop(first_group) | group_names.pop(second_group)
+        else:
+            separate_pairs.add((min(people[first], people[second]), max(people[first], people[second])))
+
+    groups = defaultdict(list)
+    person_rows = defaultdict(list)
+    for position, record in enumerate(records):
+        groups[find(group_of, people[position])].append(record)
+        person_rows[people[position]].append(record)
+
+    suspects = [sorted(group) for group in groups.values() if len(group) > 1]
+    suspects.extend(
+        sorted(person_rows[first] + person_rows[second])
+        for first, second in separate_pairs
+        if find(group_of, first) != find(group_of, second)
+    )
+
+    return sorted(suspects, key=lambda group: [record[0] for record in group])
+
+
+## --------------------------------------------------------------------------
+# Function to print the groups of likely duplicates for review
+def report_near_duplicates(groups):
+    """
+    Prints each group of suspected duplicate rows for manual review.
+
+    Args:
+        groups (list): Groups as returned by `find_near_duplicates`.
+
+    Returns:
+        None
+    """
+
+    if not groups:
+        return
+
+    print(f"\nWarning: {len(groups)} group(s) of possible duplicate recipients found, please review:")
+    for group_number, group in enumerate(groups, start=1):
+        print(f"\n  Group {group_number}:")
+        for row_index, name, email in group:
+            print(f"    Row Index '{row_index}' - {name.strip()} <{email.strip()}>")
+
+
+## --------------------------------------------------------------------------
+# Function to write the groups of likely duplicates to a CSV file
+def write_near_duplicates(groups, output_file_path):
+    """
+    Writes the groups of suspected duplicate rows to a CSV file for review.
+
+    Args:
+        groups (list): Groups as returned by `find_near_duplicates`.
+        output_file_path (str): Path of the CSV report to create.
+
+    Returns:
+        None
+    """
+
+    with open(output_file_path, "w", newline="", encoding="utf-8") as report_file:
+        writer = csv.writer(report_file)
+        writer.writerow(["Group", "Row Index", "Full Name", "Email"])
+        for group_number, group in enumerate(groups, start=1):
+            for row_index, name, email in group:
+                writer.writerow([group_number, row_index, name.strip(), email.strip()])
+
+
+### ===========================================================================
+## Main
+#
+
+if __name__ == "__main__":
+    """
+    Reports likely duplicate recipients in a spreadsheet.
+
+    Usage:
+        python dedupe.py <spreadsheet.csv> [report.csv]
+    """
+
+    if len(sys.argv) < 2:
+        print("\nUsage: python dedupe.py <spreadsheet.csv> [report.csv]\n")
+        sys.exit(1)
+
+    try:
+        with open(sys.argv[1], "r", encoding="utf-8") as csv_file:
+            reader = csv.DictReader(csv_file)
+            groups = find_near_duplicates(
+                (row_index, row.get("Full Name") or "", row.get("Email") or "")
+                for row_index, row in enumerate(reader, start=2)
+            )
+    except (OSError, UnicodeError) as e:
+        print(f"\nError in reading CSV file!\n{e}\n\nExiting...\n")
+        sys.exit(1)
+
+    if not groups:
+        print("\nNo possible duplicate recipients found.\n")
+        sys.exit(0)
+
+    report_near_duplicates(groups)
+    if len(sys.argv) > 2:
+        write_near_duplicates(groups, sys.argv[2])
+        print(f"\nReport written to '{os.path.basename(sys.argv[2])}'.\n")
@@ -0,0 +1,200 @@
+import os
+import sys
+import json
+import unicodedata
+
+# Get the parent directory, add it to python path and import the modules
+parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(parent_dir)
+
+from Utilities.asset_cache import DEFAULT_CACHE_DIR_PATH, file_identity
+
+
+DEFAULT_FONTS_DIR_PATH = os.path.join(parent_dir, "Fonts")
+DEFAULT_COVERAGE_INDEX_PATH = os.path.join(DEFAULT_CACHE_DIR_PATH, "glyph_coverage.json")
+COVERAGE_INDEX_VERSION = 1
+
+# Per-process copy of the index: (fonts directory, index path) -> {font filename: codepoints}
+_coverage = {}
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to read the codepoints a font has glyphs for
+def font_codepoints(font_file_path):
+    """
+    Returns the codepoints mapped to a glyph by the cmap of a TrueType font.
+
+    Args:
+        font_file_path (str): Path to the TTF file.
+
+    Returns:
+        set: The covered codepoints.
+
+    Raises:
+        Exception: Whatever reportlab raises for an invalid or unsupported font file.
+    """
+
+    from reportlab.pdfbase.ttfonts import TTFontFile
+
+    font_file = TTFontFile(font_file_path, validate=0)
+    return {codepoint for codepoint, glyph in font_file.charToGlyph.items() if glyph}
+
+
+## --------------------------------------------------------------------------
+# Function to pack codepoints into ranges
+def _to_ranges(codepoints):
+    """
+    Packs sorted codepoints into [first, last] ranges, which keeps the on-disk index small.
+    """
+
+    ranges = []
+    for codepoint in sorted(codepoints):
+        if ranges and codepoint == ranges[-1][1] + 1:
+            ranges[-1][1] = codepoint
+        else:
+            ranges.append([codepoint, codepoint])
+
+    return ranges
+
+
+## --------------------------------------------------------------------------
+# Function to load the glyph coverage of every font
+def load_coverage_index(fonts_dir_path=DEFAULT_FONTS_DIR_PATH, index_path=DEFAULT_COVERAGE_INDEX_PATH):
+    """
+    Returns the codepoints covered by each TTF font of a directory.
+
+    The cmap of a font is only parsed the first time it is seen (or after it changed); the
+    coverage is kept as codepoint ranges in `index_path`, so later runs only read a small
+    JSON file. Fonts reportlab cannot read (e.g. PostScript outlines) cover nothing.
+
+    Args:
+        fonts_dir_path (str, optional): Directory holding the fonts.
+        index_path (str, optional): Path to the on-disk coverage index, or None to keep it in memory.
+
+    Returns:
+        dict: Maps each TTF filename to the frozenset of codepoints it covers.
+    """
+
+    key = (fonts_dir_path, index_path)
+    font_files = sorted(file for file in os.listdir(fonts_dir_path) if file.lower().endswith(".ttf")) if os.path.isdir(fonts_dir_path) else []
+    identities = {file: list(file_identity(os.path.join(fonts_dir_path, file))[1:]) for file in font_files}
+    if key in _coverage and _coverage[key][0] == identities:
+        return _coverage[key][1]
+
+    entries = {}
+    if index_path and os.path.isfile(index_path):
+        try:
+            with open(index_path, "r", encoding="utf-8") as index_file:
+                index = json.load(index_file)
+            if index.get("version") == COVERAGE_INDEX_VERSION:
+                entries = index.get("fonts", {})
+        except (OSError, ValueError):
+            entries = {}
+
+    changed = set(entries) != set(font_files)
+    coverage = {}
+    for file in font_files:
+        entry = entries.get(file)
+        if entry is None or entry.get("identity") != identities[file]:
+            try:
+                ranges = _to_ranges(font_codepoints(os.path.join(fonts_dir_path, file)))
+            except Exception:
+                ranges = []
+            entry = entries[file] = {"identity": identities[file], "ranges": ranges}
+            changed = True
+        coverage[file] = frozenset(codepoint for first, last in entry["ranges"] for codepoint in range(first, last + 1))
+
+    if changed and index_path:
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            temp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as index_file:
+                json.dump({"version": COVERAGE_INDEX_VERSION, "fonts": {file: entries[file] for file in font_files}}, index_file)
+            os.replace(temp_path, index_path)
+        except OSError:
+            pass  # The disk cache is only an optimisation
+
+    _coverage[key] = (identities, coverage)
+    return coverage
+
+
+## --------------------------------------------------------------------------
+# Function to find the characters of a text a font has no glyph for
+def missing_characters(text, codepoints):
+    """
+    Returns the characters of a text that are not covered, in one pass over the text.
+
+    Whitespace is ignored, it is drawn as spacing.
+
+    Args:
+        text (str): The text to draw.
+        codepoints (frozenset): The codepoints covered by the font.
+
+    Returns:
+        list: The uncovered characters, each listed once.
+    """
+
+    missing = []
+    for char in text:
+        if ord(char) not in codepoints and not char.isspace() and char not in missing:
+            missing.append(char)
+
+    return missing
+
+
+## --------------------------------------------------------------------------
+# Function to pick the first font of a fallback chain covering a text
+def pick_covering_font(text, font_files, coverage):
+    """
+    Returns the first font of `font_files` that has a glyph for every character of `text`.
+
+    Args:
+        text (str): The text to draw.
+        font_files (list): TTF filenames, in order of preference.
+        coverage (dict): The coverage index, see `load_coverage_index`.
+
+    Returns:
+        str or None: The covering font filename, or None if no font of the chain covers the text.
+    """
+
+    for font_file in font_files:
+        if font_file in coverage and not missing_characters(text, coverage[font_file]):
+            return font_file
+
+    return None
+
+
+## --------------------------------------------------------------------------
+# Function to describe characters for error messages
+def describe_characters(chars):
+    """
+    Returns the characters with their codepoints and names, e.g. "'ß' (U+00DF LATIN SMALL LETTER SHARP S)".
+    """
+
+    return ", ".join(f"'{char}' (U+{ord(char):04X} {unicodedata.name(char, 'UNNAMED')})" for char in chars)
+
+
+### ===========================================================================
+## Main
+#
+
+if __name__ == "__main__":
+    """
+    Rebuilds the glyph coverage index of the Fonts directory and shows which fonts cover a text.
+
+    Usage:
+        python glyph_coverage.py ["<text>" ...]
+    """
+
+    coverage = load_coverage_index()
+    print("\nGlyph coverage of the fonts:")
+    for font_file, codepoints in coverage.items():
+        print(f"  {font_file}: {len(codepoints)} characters")
+
+    for text in sys.argv[1:]:
+        covering = [font_file for font_file, codepoints in coverage.items() if not missing_characters(text, codepoints)]
+        print(f"\n'{text}': {', '.join(covering) if covering else 'no font covers every character'}")
+    print()
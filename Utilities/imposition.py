@@ -0,0 +1,367 @@
+import os
+import io
+import sys
+import hashlib
+import argparse
+
+# Get the parent directory, add it to python path and import the modules
+parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(parent_dir)
+
+
+# Sheet sizes in points (portrait)
+SHEET_SIZES = {
+    "A4": (595.2756, 841.8898),
+    "LETTER": (612.0, 792.0),
+}
+
+SHEET_MARGIN = 36       # Half an inch around the grid
+CELL_GUTTER = 18        # Space between cells, room for the crop marks
+CROP_MARK_LENGTH = 9
+CROP_MARK_OFFSET = 3
+
+# Resource categories whose entries are shared between imposed pages
+SHARED_RESOURCES = ("/Font", "/XObject", "/ExtGState", "/ColorSpace", "/Pattern", "/Shading")
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to parse a grid such as "3x4"
+def parse_grid(grid):
+    """
+    Parses a "COLUMNSxROWS" grid specification.
+
+    Args:
+        grid (str): The grid, e.g. "3x4".
+
+    Returns:
+        tuple: (columns, rows)
+
+    Raises:
+        ValueError: If the grid is malformed or not positive.
+    """
+
+    try:
+        columns, rows = (int(part) for part in grid.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Invalid grid '{grid}', expected COLUMNSxROWS such as 3x4")
+    if columns < 1 or rows < 1:
+        raise ValueError(f"Invalid grid '{grid}', columns and rows must be at least 1")
+
+    return columns, rows
+
+
+## --------------------------------------------------------------------------
+# Function to get the sheet size of a paper name
+def get_sheet_size(sheet):
+    """
+    Returns the portrait size of a paper name.
+
+    Args:
+        sheet (str): "A4" or "Letter" (case-insensitive).
+
+    Returns:
+        tuple: (width, height) in points.
+
+    Raises:
+        ValueError: If the paper is unknown.
+    """
+
+    try:
+        return SHEET_SIZES[sheet.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown sheet '{sheet}', expected one of {', '.join(SHEET_SIZES)}")
+
+
+## --------------------------------------------------------------------------
+# Function to lay out the cells of a sheet
+def sheet_cells(sheet_size, columns, rows, margin=SHEET_MARGIN, gutter=CELL_GUTTER):
+    """
+    Splits a sheet into a grid of equal cells, in reading order (top-left first).
+
+    Args:
+        sheet_size (tuple): (width, height) of the sheet in points.
+        columns (int): Number of cells across.
+        rows (int): Number of cells down.
+        margin (float, optional): Space around the grid in points.
+        gutter (float, optional): Space between the cells in points.
+
+    Returns:
+        list: (x, y, width, height) of each cell, with (x, y) its bottom-left corner.
+    """
+
+    sheet_width, sheet_height = sheet_size
+    cell_width = (sheet_width - 2 * margin - (columns - 1) * gutter) / columns
+    cell_height = (sheet_height - 2 * margin - (rows - 1) * gutter) / rows
+
+    cells = []
+    for row in range(rows):
+        for column in range(columns):
+            x = margin + column * (cell_width + gutter)
+            y = sheet_height - margin - (row + 1) * cell_height - row * gutter
+            cells.append((x, y, cell_width, cell_height))
+
+    return cells
+
+
+## --------------------------------------------------------------------------
+# Function to fit an item into a cell
+def fit_rect(cell, width, height):
+    """
+    Scales an item to the largest size that fits a cell, keeping its aspect ratio, and centers it.
+
+    Args:
+        cell (tuple): (x, y, width, height) of the cell.
+        width (float): Width of the item.
+        height (float): Height of the item.
+
+    Returns:
+        tuple: (x, y, width, height) of the placed item.
+    """
+
+    cell_x, cell_y, cell_width, cell_height = cell
+    scale = min(cell_width / width, cell_height / height)
+    return (cell_x + (cell_width - width * scale) / 2, cell_y + (cell_height - height * scale) / 2, width * scale, height * scale)
+
+
+## --------------------------------------------------------------------------
+# Function to draw the crop marks around a rectangle
+def draw_crop_marks(canvas, cell, length=CROP_MARK_LENGTH, offset=CROP_MARK_OFFSET):
+    """
+    Draws hairline crop marks just outside the four corners of the rectangle to cut out.
+
+    Args:
+        canvas (reportlab.pdfgen.canvas.Canvas): The sheet canvas.
+        cell (tuple): (x, y, width, height) to cut out.
+        length (float, optional): Length of each mark in points.
+        offset (float, optional): Gap between the corner and the mark.
+
+    Returns:
+        None
+    """
+
+    x, y, width, height = cell
+    canvas.saveState()
+    canvas.setLineWidth(0.25)
+    canvas.setStrokeColorRGB(0, 0, 0)
+    for corner_x, direction_x in ((x, -1), (x + width, 1)):
+        for corner_y, direction_y in ((y, -1), (y + height, 1)):
+            # Horizontal mark level with the edge, vertical mark level with the side
+            canvas.line(corner_x + direction_x * offset, corner_y, corner_x + direction_x * (offset + length), corner_y)
+            canvas.line(corner_x, corner_y + direction_y * offset, corner_x, corner_y + direction_y * (offset + length))
+    canvas.restoreState()
+
+
+## --------------------------------------------------------------------------
+# Function to hash a PDF object with everything it references
+def resource_digest(obj, memo, visiting=None):
+    """
+    Returns a content hash of a PDF object, following its indirect references.
+
+    Args:
+        obj: A PyPDF2 object.
+        memo (dict): Digests of the indirect objects of one PDF hashed so far, keyed by object number.
+        visiting (set, optional): Indirect objects being hashed, to stop at reference cycles.
+
+    Returns:
+        bytes: The digest.
+    """
+
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+    visiting = set() if visiting is None else visiting
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key in memo:
+            return memo[key]
+        if key in visiting:
+            return b"cycle"
+        visiting.add(key)
+        memo[key] = resource_digest(obj.get_object(), memo, visiting)
+        visiting.discard(key)
+        return memo[key]
+
+    digest = hashlib.sha256(type(obj).__name__.encode("ascii"))
+    if isinstance(obj, DictionaryObject):
+        for key in sorted(obj):
+            digest.update(key.encode("utf-8", "surrogateescape"))
+            digest.update(resource_digest(obj.raw_get(key), memo, visiting))
+        if isinstance(obj, StreamObject):
+            digest.update(obj._data)
+    elif isinstance(obj, ArrayObject):
+        for item in obj:
+            digest.update(resource_digest(item, memo, visiting))
+    else:
+        digest.update(repr(obj).encode("utf-8", "surrogateescape"))
+
+    return digest.digest()
+
+
+## --------------------------------------------------------------------------
+# Function to point the resources of a page at identical ones already used
+def share_page_resources(page, shared):
+    """
+    Replaces the font files, images and other objects referenced by the resources of a page
+    with identical ones seen on earlier pages, so objects repeated across PDFs (e.g. the
+    embedded fonts of the certificates) are written to the imposed PDF only once.
+
+    Args:
+        page (PyPDF2.PageObject): The page, changed in place.
+        shared (dict): Maps object digests to the first indirect object seen with them.
+
+    Returns:
+        None
+    """
+
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject
+
+    memo, seen = {}, set()
+
+    def share(container):
+        keys = range(len(container)) if isinstance(container, ArrayObject) else list(container)
+        for key in keys:
+            value = container[key] if isinstance(container, ArrayObject) else container.raw_get(key)
+            if isinstance(value, IndirectObject):
+                if (value.idnum, value.generation) in seen:
+                    continue
+                seen.add((value.idnum, value.generation))
+                canonical = shared.setdefault(resource_digest(value, memo), value)
+                if canonical is value:
+                    share(value.get_object())
+                else:
+                    container[key] = canonical
+            elif isinstance(value, (DictionaryObject, ArrayObject)):
+                share(value)
+
+    resources = page.get("/Resources")
+    if resources is not None:
+        resources = resources.get_object()
+        categories = DictionaryObject({category: resources.raw_get(category) for category in SHARED_RESOURCES if category in resources})
+        share(categories)
+        resources.update(categories)
+
+
+## --------------------------------------------------------------------------
+# Function to impose PDF pages N-up onto sheets
+def impose_pdf_pages(pdf_file_paths, output_path, sheet="A4", columns=1, rows=2, crop_marks=True):
+    """
+    Packs the first page of each PDF (e.g. the generated certificates) N-up onto sheets.
+
+    Each page is scaled to fit its cell, keeping its aspect ratio, and centered. The crop
+    marks of a sheet are drawn into an overlay that is reused by every sheet with the same
+    placement, so a run of same-sized pages draws them only once. Fonts and images that are
+    identical across the PDFs are written once and shared by every sheet.
+
+    Args:
+        pdf_file_paths (list): Paths of the PDFs to impose, in order.
+        output_path (str): Path of the imposed PDF to write.
+        sheet (str, optional): "A4" or "Letter".
+        columns (int, optional): Number of pages across a sheet.
+        rows (int, optional): Number of pages down a sheet.
+        crop_marks (bool, optional): Whether to draw crop marks.
+
+    Returns:
+        int: Number of sheets written.
+
+    Raises:
+        ImportError: If PyPDF2 or reportlab is not installed.
+        ValueError: If the sheet is unknown.
+    """
+
+    from PyPDF2 import PageObject, PdfReader, PdfWriter, Transformation
+    from reportlab.pdfgen import canvas
+
+    sheet_size = get_sheet_size(sheet)
+    cells = sheet_cells(sheet_size, columns, rows)
+
+    def marks_overlay(rects):
+        marks = io.BytesIO()
+        marks_canvas = canvas.Canvas(marks, pagesize=sheet_size)
+        for rect in rects:
+            draw_crop_marks(marks_canvas, rect)
+        marks_canvas.save()
+        return PdfReader(marks).pages[0]
+
+    overlays = {}
+    shared = {}
+    writer = PdfWriter()
+    sheet_page = None
+    for index, pdf_file_path in enumerate(pdf_file_paths):
+        slot = index % len(cells)
+        if slot == 0:
+            sheet_page = PageObject.create_blank_page(width=sheet_size[0], height=sheet_size[1])
+            rects = []
+
+        page = PdfReader(pdf_file_path).pages[0]
+        share_page_resources(page, shared)
+        box = page.mediabox
+        rect = fit_rect(cells[slot], float(box.width), float(box.height))
+        scale = rect[2] / float(box.width)
+        page.add_transformation(Transformation().scale(scale, scale).translate(rect[0] - float(box.left) * scale, rect[1] - float(box.bottom) * scale))
+        sheet_page.merge_page(page)
+        rects.append(rect)
+
+        if slot == len(cells) - 1 or index == len(pdf_file_paths) - 1:
+            if crop_marks:
+                key = tuple(rects)
+                if key not in overlays:
+                    overlays[key] = marks_overlay(rects)
+                sheet_page.merge_page(overlays[key])
+            writer.add_page(sheet_page)
+
+    with open(output_path, "wb") as output_file:
+        writer.write(output_file)
+
+    return len(writer.pages)
+
+
+### ===========================================================================
+## Main
+#
+
+if __name__ == "__main__":
+    """
+    Imposes PDF pages (e.g. a Generated_Certificates folder) N-up onto print sheets.
+
+    Usage:
+        python imposition.py <folder or PDFs...> -o <output.pdf> [--sheet A4|Letter] [--grid 1x2] [--no-crop-marks]
+    """
+
+    parser = argparse.ArgumentParser(description="Impose PDF pages N-up onto A4/Letter sheets with crop marks.")
+    parser.add_argument("inputs", nargs="+", help="PDF files, or folders of PDF files")
+    parser.add_argument("-o", "--output", required=True, help="imposed PDF to write")
+    parser.add_argument("--sheet", choices=["A4", "Letter"], default="A4", help="sheet size (default: A4)")
+    parser.add_argument("--grid", default="1x2", help="COLUMNSxROWS per sheet (default: 1x2)")
+    parser.add_argument("--no-crop-marks", action="store_true", help="leave out the crop marks")
+    args = parser.parse_args()
+
+    pdf_file_paths = []
+    for input_path in args.inputs:
+        if os.path.isdir(input_path):
+            # Sharded output folders keep the certificates in subfolders
+            for dir_path, dir_names, file_names in os.walk(input_path):
+                dir_names.sort()
+                pdf_file_paths += [os.path.join(dir_path, file) for file in sorted(file_names) if file.lower().endswith(".pdf")]
+        else:
+            pdf_file_paths.append(input_path)
+
+    if not pdf_file_paths:
+        print("\nNo PDF files to impose.\n\nExiting...\n")
+        sys.exit(1)
+
+    try:
+        columns, rows = parse_grid(args.grid)
+        sheets = impose_pdf_pages(pdf_file_paths, args.output, args.sheet, columns, rows, not args.no_crop_marks)
+    except ValueError as e:
+        print(f"\nError: {e}\n\nExiting...\n")
+        sys.exit(1)
+    except ImportError:
+        print("\nImposing PDF pages requires the 'reportlab' and 'PyPDF2' modules.\n\nPlease install them using 'pip install reportlab PyPDF2' and try again.\n")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nFailed to impose the PDF pages: {e}\n\nExiting...\n")
+        sys.exit(1)
+
+    print(f"\n{len(pdf_file_paths)} page(s) imposed {columns}x{rows} onto {sheets} {args.sheet} sheet(s): \"{args.output}\"\n")
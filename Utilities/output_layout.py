@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+
+# Get the parent directory, add it to python path and import the modules
+parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(parent_dir)
+
+from Utilities.stage_cache import MANIFEST_FILENAME
+
+
+OUTPUT_LAYOUTS = ("auto", "flat", "sharded")
+SHARD_THRESHOLD = 2000      # Certificates above which the "auto" layout shards the output folder
+SHARD_PREFIX_LENGTH = 2     # Shard directories are named after the first characters of the ID (32 x 32 of them)
+
+# State of each output folder of the process: layout, claimed filenames and paths
+_output_folders = {}
+_output_folders_lock = threading.Lock()
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to add the output layout option to a parser
+def add_output_layout_argument(parser):
+    """
+    Adds the --output-layout option to an argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The script's parser.
+
+    Returns:
+        None
+    """
+
+    parser.add_argument("--output-layout", choices=OUTPUT_LAYOUTS, default="auto",
+                        help=f"write the certificates into one folder (flat) or into subfolders by certificate ID (sharded); auto shards runs of more than {SHARD_THRESHOLD} certificates (default: auto)")
+
+
+## --------------------------------------------------------------------------
+# Function to decide whether an output folder is sharded
+def is_sharded(output_layout, count=None):
+    """
+    Returns True if a run of `count` certificates is written into shard subfolders.
+
+    Args:
+        output_layout (str): "auto", "flat" or "sharded".
+        count (int, optional): Number of certificates of the run, None if unknown (watch mode).
+
+    Returns:
+        bool: True for a sharded output folder.
+    """
+
+    if output_layout == "auto":
+        return count is not None and count > SHARD_THRESHOLD
+
+    return output_layout == "sharded"
+
+
+## --------------------------------------------------------------------------
+# Function to get the state of an output folder
+def _folder_state(folder_path):
+    """
+    Returns the state of an output folder, flat unless it was opened with `open_output_folder`.
+    """
+
+    key = os.path.abspath(folder_path)
+    with _output_folders_lock:
+        if key not in _output_folders:
+            _output_folders[key] = {"sharded": False, "owners": {}, "paths": {}, "dirs": set(), "lock": threading.Lock()}
+        return _output_folders[key]
+
+
+## --------------------------------------------------------------------------
+# Function to create an output folder
+def open_output_folder(folder_path, sharded=False):
+    """
+    Creates the output folder of a run and sets its layout.
+
+    A sharded folder spreads the certificates over up to 1024 subfolders named after the
+    first characters of their certificate ID (`Generated_Certificates/XR/John_Doe_XRKPVYFEPP_certificate.pdf`),
+    so no directory grows past a few hundred entries even for 100k certificates.
+
+    Args:
+        folder_path (str): The output folder of the run.
+        sharded (bool, optional): Write the certificates into shard subfolders.
+
+    Returns:
+        str: The folder path.
+    """
+
+    os.makedirs(folder_path, exist_ok=True)
+    _folder_state(folder_path)["sharded"] = sharded
+
+    return folder_path
+
+
+## --------------------------------------------------------------------------
+# Function to get the shard of a certificate
+def shard_name(filename, cert_id=None):
+    """
+    Returns the shard subfolder of a certificate: the start of its certificate ID, or of the
+    hash of its filename without an ID.
+    """
+
+    prefix = cert_id or hashlib.sha1(filename.encode("utf-8")).hexdigest().upper()
+    return prefix[:SHARD_PREFIX_LENGTH]
+
+
+## --------------------------------------------------------------------------
+# Function to reserve the path of a certificate
+def claim_certificate_path(folder_path, filename, cert_id=None):
+    """
+    Returns the path a certificate is written to in an output folder.
+
+    A filename is owned by the certificate that claimed it first in the run: claiming it
+    again for the same certificate ID (a re-issue) returns the same path, while another
+    certificate with the same filename (ignoring case, for case-insensitive file systems)
+    gets a "_2", "_3", ... suffix instead of overwriting it. Safe to call from several threads.
+
+    Args:
+        folder_path (str): The output folder, see `open_output_folder`.
+        filename (str): The certificate filename, see `Utilities.utils.certificate_filename`.
+        cert_id (str, optional): The certificate ID.
+
+    Returns:
+        str: Path of the certificate, relative to the output folder with "/" separators.
+    """
+
+    state = _folder_state(folder_path)
+    with state["lock"]:
+        stem, extension = os.path.splitext(filename)
+        counter = 1
+        while True:
+            owner = state["owners"].get(filename.casefold())
+            if owner is None or (cert_id and owner == cert_id):
+                break
+            counter += 1
+            filename = f"{stem}_{counter}{extension}"
+        state["owners"][filename.casefold()] = cert_id or filename
+
+        relative_path = filename
+        if state["sharded"]:
+            shard = shard_name(filename, cert_id)
+            if shard not in state["dirs"]:
+                os.makedirs(os.path.join(folder_path, shard), exist_ok=True)
+                state["dirs"].add(shard)
+            relative_path = f"{shard}/{filename}"
+
+        state["paths"][cert_id or filename] = relative_path
+
+    return relative_path
+
+
+## --------------------------------------------------------------------------
+# Function to get the certificate paths of an output folder
+def certificate_paths(folder_path):
+    """
+    Returns the path of each certificate claimed in an output folder, keyed by certificate
+    ID (or filename without an ID), for the run manifest.
+    """
+
+    state = _folder_state(folder_path)
+    with state["lock"]:
+        return dict(state["paths"])
+
+
+## --------------------------------------------------------------------------
+# Function to write a file atomically
+def atomic_write(file_path, data):
+    """
+    Writes a file under a temporary name and renames it into place, so the path holds either
+    the previous or the complete new file, never a partly written one.
+
+    Args:
+        file_path (str): Path of the file.
+        data (bytes): Contents of the file.
+
+    Returns:
+        None
+    """
+
+    temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "wb") as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+## --------------------------------------------------------------------------
+# Function to load the certificate paths recorded in an output folder
+def load_certificate_paths(folder_path):
+    """
+    Reads the certificate paths from the manifest of an output folder.
+
+    Args:
+        folder_path (str): The output folder.
+
+    Returns:
+        dict: Maps each certificate ID (or filename) to its path relative to the folder;
+              empty if the folder has no manifest or it predates the paths.
+    """
+
+    try:
+        with open(os.path.join(folder_path, MANIFEST_FILENAME), "r", encoding="utf-8") as manifest_file:
+            paths = json.load(manifest_file).get("paths")
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+    return paths if isinstance(paths, dict) else {}
+
+
+## --------------------------------------------------------------------------
+# Function to find a certificate in an output folder
+def find_certificate(folder_path, filename, cert_id=None, paths=None):
+    """
+    Returns the path of a certificate in a flat or sharded output folder, without listing it.
+
+    The path recorded in the manifest is used when there is one (see `load_certificate_paths`),
+    otherwise the flat and the sharded locations are checked.
+
+    Args:
+        folder_path (str): The output folder.
+        filename (str): The certificate filename, see `Utilities.utils.certificate_filename`.
+        cert_id (str, optional): The certificate ID.
+        paths (dict, optional): The recorded paths of the folder.
+
+    Returns:
+        str: Path of the certificate; the flat location if it cannot be found.
+    """
+
+    relative_path = (paths or {}).get(cert_id or filename)
+    if relative_path:
+        return os.path.join(folder_path, relative_path)
+
+    flat_path = os.path.join(folder_path, filename)
+    sharded_path = os.path.join(folder_path, shard_name(filename, cert_id), filename)
+    if not os.path.exists(flat_path) and os.path.exists(sharded_path):
+        return sharded_path
+
+    return flat_path
@@ -0,0 +1,299 @@
+import os
+import io
+import sys
+import json
+import time
+import atexit
+import threading
+import contextlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+ROOT_REPO_PATH = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DEFAULT_PROFILES_DIR_PATH = os.path.join(ROOT_REPO_PATH, "Profiles")
+
+# Stage names used by the scripts
+STAGES = ("load", "validate", "sort", "render", "merge", "write", "encode", "send")
+
+TOP_ALLOCATIONS = 10    # Allocation sites listed per stage
+TOP_FUNCTIONS = 30      # cProfile entries listed in the report
+TRACEMALLOC_FRAMES = 1  # Only the allocating line is reported, deeper tracebacks cost more
+
+# State of the running profile, None when profiling is off
+_session = None
+# tracemalloc, imported by `start_profiling` only when memory is traced
+tracemalloc = None
+_lock = threading.Lock()
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to add the profiling options to a script's arguments
+def add_profile_arguments(parser):
+    """
+    Adds the --profile and --profile-cprofile options to an argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The script's parser.
+
+    Returns:
+        None
+    """
+
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="REPORT",
+                        help="write stage timings and memory peaks to a JSON report (default: Profiles/<script>_<time>.json)")
+    parser.add_argument("--profile-cprofile", action="store_true", help="with --profile, also capture a cProfile of the run")
+
+
+## --------------------------------------------------------------------------
+# Function to start profiling from the parsed arguments
+def start_profiling_from_args(args, entry_point):
+    """
+    Starts profiling if --profile was given. The report is written when the process exits.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments, see `add_profile_arguments`.
+        entry_point (str): Name of the script, used in the report and its default filename.
+
+    Returns:
+        str or None: Path of the report to be written, or None if profiling is off.
+    """
+
+    if args.profile is None and not args.profile_cprofile:
+        return None
+
+    return start_profiling(args.profile or None, entry_point, use_cprofile=args.profile_cprofile)
+
+
+## --------------------------------------------------------------------------
+# Function to start profiling the run
+def start_profiling(report_path=None, entry_point=None, use_cprofile=False, trace_memory=True):
+    """
+    Turns on the stage timers (and tracemalloc and cProfile), and writes the JSON report at exit.
+
+    Args:
+        report_path (str, optional): Path of the JSON report; `Profiles/<entry>_<time>.json` by default.
+        entry_point (str, optional): Name of the script being profiled.
+        use_cprofile (bool, optional): Also capture a cProfile of the main thread, saved next
+                                       to the report as a ".prof" file for snakeviz/pstats.
+        trace_memory (bool, optional): Track memory peaks and top allocations per stage.
+
+    Returns:
+        str: Path of the report to be written.
+    """
+
+    global _session, tracemalloc
+
+    entry_point = entry_point or os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    if not report_path:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_path = os.path.join(DEFAULT_PROFILES_DIR_PATH, f"{entry_point}_{timestamp}.json")
+
+    _session = {
+        "entry_point": entry_point,
+        "report_path": report_path,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "start_time": time.perf_counter(),
+        "stages": {},
+        "open_stages": [],
+        "peak_bytes": 0,
+        "profiler": None,
+        "trace_memory": trace_memory,
+    }
+
+    if trace_memory:
+        import tracemalloc
+
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    if use_cprofile:
+        import cProfile
+
+        _session["profiler"] = cProfile.Profile()
+        _session["profiler"].enable()
+
+    atexit.register(stop_profiling)
+    return report_path
+
+
+## --------------------------------------------------------------------------
+# Function to turn profiling off in forked worker processes
+def _forget_session():
+    """
+    Drops the profile inherited by a forked child (e.g. a ProcessPoolExecutor worker), so only
+    the parent records and writes the report and the workers do not pay for tracemalloc.
+    """
+
+    global _session
+
+    if _session is not None:
+        if _session["trace_memory"]:
+            tracemalloc.stop()
+        _session = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_session)
+
+
+## --------------------------------------------------------------------------
+# Function to check whether a run is being profiled
+def is_profiling():
+    """
+    Returns True while a profile is being recorded.
+    """
+
+    return _session is not None
+
+
+## --------------------------------------------------------------------------
+# Function to get the top allocation sites between two snapshots
+def _top_allocations(before, after):
+    """
+    Returns the allocation sites that grew the most between two tracemalloc snapshots.
+
+    Args:
+        before (tracemalloc.Snapshot): Snapshot at the start of the stage.
+        after (tracemalloc.Snapshot): Snapshot at the end of the stage.
+
+    Returns:
+        list: {"location", "size_bytes", "count"} dicts, largest first.
+    """
+
+    ignore = [tracemalloc.Filter(False, module_file) for module_file in (tracemalloc.__file__, contextlib.__file__, __file__)]
+    statistics = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    return [
+        {"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "size_bytes": stat.size_diff, "count": stat.count_diff}
+        for stat in statistics[:TOP_ALLOCATIONS] if stat.size_diff > 0
+    ]
+
+
+## --------------------------------------------------------------------------
+# Function to time (and trace the memory of) a named stage
+@contextmanager
+def profile_stage(name):
+    """
+    Records the wall time and memory peak of a stage while profiling; does nothing otherwise.
+
+    Stages can nest and repeat: calls, total and longest time are accumulated per name. The
+    allocation sites are compared between snapshots of the first call of each stage only,
+    as snapshots are too slow to take on every call. Stages running at the same time in
+    several threads share tracemalloc's process-wide peak.
+
+    Args:
+        name (str): Stage name, preferably one of STAGES.
+
+    Yields:
+        None
+    """
+
+    session = _session
+    if session is None:
+        yield
+        return
+
+    with _lock:
+        stats = session["stages"].setdefault(name, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "peak_bytes": 0, "top_allocations": None})
+        first_call = stats["top_allocations"] is None
+        if first_call:
+            stats["top_allocations"] = []
+        record = {"start": 0, "peak": 0, "snapshot": None}
+        if session["trace_memory"]:
+            current, peak = tracemalloc.get_traced_memory()
+            # Keep the peaks of the run and the enclosing stages before resetting it for this one
+            session["peak_bytes"] = max(session["peak_bytes"], peak)
+            for open_record in session["open_stages"]:
+                open_record["peak"] = max(open_record["peak"], peak)
+            tracemalloc.reset_peak()
+            record["start"] = record["peak"] = current
+            if first_call:
+                record["snapshot"] = tracemalloc.take_snapshot()
+        session["open_stages"].append(record)
+    start_time = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start_time
+        with _lock:
+            session["open_stages"] = [open_record for open_record in session["open_stages"] if open_record is not record]
+            stats["calls"] += 1
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+            if session["trace_memory"]:
+                _, peak = tracemalloc.get_traced_memory()
+                session["peak_bytes"] = max(session["peak_bytes"], peak)
+                for open_record in session["open_stages"] + [record]:
+                    open_record["peak"] = max(open_record["peak"], peak)
+                stats["peak_bytes"] = max(stats["peak_bytes"], record["peak"] - record["start"])
+                if record["snapshot"] is not None and tracemalloc.is_tracing():
+                    stats["top_allocations"] = _top_allocations(record["snapshot"], tracemalloc.take_snapshot())
+
+
+## --------------------------------------------------------------------------
+# Function to stop profiling and write the report
+def stop_profiling():
+    """
+    Stops profiling and writes the JSON report (and the cProfile data, if captured).
+
+    Called automatically when the process exits, including on `sys.exit`.
+
+    Returns:
+        str or None: Path of the written report, or None if profiling was not running.
+    """
+
+    global _session
+
+    session, _session = _session, None
+    if session is None:
+        return None
+
+    report = {
+        "entry_point": session["entry_point"],
+        "argv": sys.argv[1:],
+        "started_at": session["started_at"],
+        "wall_seconds": round(time.perf_counter() - session["start_time"], 6),
+        "stages": {
+            name: dict(stats, total_seconds=round(stats["total_seconds"], 6), max_seconds=round(stats["max_seconds"], 6))
+            for name, stats in session["stages"].items()
+        },
+    }
+
+    if session["trace_memory"]:
+        current, peak = tracemalloc.get_traced_memory()
+        report["memory"] = {"peak_bytes": max(session["peak_bytes"], peak), "current_bytes": current}
+        tracemalloc.stop()
+
+    os.makedirs(os.path.dirname(os.path.abspath(session["report_path"])), exist_ok=True)
+    profiler = session["profiler"]
+    if profiler is not None:
+        import pstats
+
+        profiler.disable()
+        prof_path = os.path.splitext(session["report_path"])[0] + ".prof"
+        profiler.dump_stats(prof_path)
+        statistics = pstats.Stats(profiler, stream=io.StringIO()).sort_stats("cumulative")
+        report["cprofile"] = {
+            "stats_file": prof_path,
+            "top_functions": [
+                {
+                    "function": f"{filename}:{lineno}({function})",
+                    "calls": primitive_calls,
+                    "total_seconds": round(total_time, 6),
+                    "cumulative_seconds": round(cumulative_time, 6),
+                }
+                for (filename, lineno, function), (primitive_calls, _, total_time, cumulative_time, _)
+                in sorted(statistics.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_FUNCTIONS]
+            ],
+        }
+
+    try:
+        with open(session["report_path"], "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"\nProfile report written to \"{session['report_path']}\".\n")
+    except OSError as e:
+        print(f"\nFailed to write the profile report: {e}\n")
+
+    return session["report_path"]
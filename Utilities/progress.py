@@ -0,0 +1,246 @@
+import sys
+import time
+import threading
+from collections import deque
+
+
+PROGRESS_INTERVAL = 0.5         # Seconds between two redraws of the status line on a terminal
+PROGRESS_LOG_INTERVAL = 10      # Seconds between two status lines when the output is not a terminal
+LATENCY_WINDOW = 100            # Rows in the moving-average latency
+
+# Progress whose status line is on screen, so other messages can be printed above it
+_active_progress = None
+_print_lock = threading.Lock()
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to format a number of bytes
+def format_bytes(size):
+    """
+    Returns a size in bytes as a short human readable string, e.g. "3.4 MB".
+    """
+
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+## --------------------------------------------------------------------------
+# Function to format a duration
+def format_duration(seconds):
+    """
+    Returns a duration as a short string, e.g. "42s", "9m 47s" or "1h 05m".
+    """
+
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+
+## --------------------------------------------------------------------------
+# Function to start reporting the progress of a loop
+def start_progress(label, total, bytes_label="written", stream=None):
+    """
+    Starts a progress report: a status line with the rows per second, the moving-average
+    latency, the ETA, the failures so far and the bytes written or sent.
+
+    On a terminal the line is redrawn in place at most every PROGRESS_INTERVAL seconds;
+    otherwise (a pipe or a log file) a new line is printed every PROGRESS_LOG_INTERVAL.
+    `update_progress` only updates counters between two redraws, so it can be called for
+    every row of a hot loop, from several threads.
+
+    Args:
+        label (str): What is being done, e.g. "Sending emails".
+        total (int): Number of rows expected.
+        bytes_label (str, optional): "written" or "sent", shown after the byte count.
+        stream (file, optional): Where to report; sys.stdout by default.
+
+    Returns:
+        dict: The progress state, passed to `update_progress` and `finish_progress`.
+    """
+
+    global _active_progress
+
+    stream = stream or sys.stdout
+    is_terminal = hasattr(stream, "isatty") and stream.isatty()
+    start_time = time.perf_counter()
+    progress = {
+        "label": label,
+        "total": total,
+        "bytes_label": bytes_label,
+        "stream": stream,
+        "is_terminal": is_terminal,
+        "interval": PROGRESS_INTERVAL if is_terminal else PROGRESS_LOG_INTERVAL,
+        "start_time": start_time,
+        "last_time": start_time,
+        "next_draw": start_time + (PROGRESS_INTERVAL if is_terminal else PROGRESS_LOG_INTERVAL),
+        "done": 0,
+        "failed": 0,
+        "bytes": 0,
+        "latencies": deque(),
+        "window_latency": 0.0,
+        "total_latency": 0.0,
+        "line_length": 0,
+        "lock": threading.Lock(),
+    }
+
+    if is_terminal:
+        _active_progress = progress
+        _draw_progress(progress, start_time)
+
+    return progress
+
+
+## --------------------------------------------------------------------------
+# Function to record finished rows
+def update_progress(progress, count=1, failed=False, latency=None, size=0):
+    """
+    Records finished rows, and redraws the status line if it is due.
+
+    Args:
+        progress (dict): Progress state from `start_progress`.
+        count (int, optional): Number of rows finished.
+        failed (bool, optional): Whether the rows failed.
+        latency (float, optional): Seconds one row took; the time since the previous update
+                                   by default, which is the latency of a sequential loop.
+        size (int, optional): Bytes written or sent for the rows.
+
+    Returns:
+        None
+    """
+
+    now = time.perf_counter()
+    with progress["lock"]:
+        if latency is None:
+            latency = (now - progress["last_time"]) / count
+        progress["last_time"] = now
+        progress["done"] += count
+        progress["failed"] += count if failed else 0
+        progress["bytes"] += size
+        progress["total_latency"] += latency * count
+        progress["window_latency"] += latency
+        progress["latencies"].append(latency)
+        if len(progress["latencies"]) > LATENCY_WINDOW:
+            progress["window_latency"] -= progress["latencies"].popleft()
+
+        if now < progress["next_draw"]:
+            return
+        progress["next_draw"] = now + progress["interval"]
+
+    with _print_lock:
+        _draw_progress(progress, now)
+
+
+## --------------------------------------------------------------------------
+# Function to build the status line
+def _status_line(progress, now, final=False):
+    """
+    Returns the status line of a progress state.
+    """
+
+    done, total = progress["done"], progress["total"]
+    elapsed = now - progress["start_time"]
+    rate = done / elapsed if elapsed > 0 else 0.0
+
+    parts = [f"{done}/{total} done" if final else f"{done}/{total} ({done * 100 // max(total, 1)}%)"]
+    parts.append(f"{rate:.1f}/s")
+    if done:
+        # The whole run in the summary, the last LATENCY_WINDOW updates while running
+        latency = progress["total_latency"] / done if final else progress["window_latency"] / len(progress["latencies"])
+        parts.append(f"avg {latency * 1000:.0f} ms")
+    if final:
+        parts.append(f"in {format_duration(elapsed)}")
+    elif done and done < total:
+        parts.append(f"ETA {format_duration((total - done) / rate)}")
+    if progress["failed"]:
+        parts.append(f"{progress['failed']} failed")
+    if progress["bytes"]:
+        parts.append(f"{format_bytes(progress['bytes'])} {progress['bytes_label']}")
+
+    return f"  {progress['label']}: " + " | ".join(parts)
+
+
+## --------------------------------------------------------------------------
+# Function to draw the status line
+def _draw_progress(progress, now):
+    """
+    Redraws the status line in place on a terminal, or prints it as a new line otherwise.
+    """
+
+    line = _status_line(progress, now)
+    stream = progress["stream"]
+    if progress["is_terminal"]:
+        stream.write("\r" + line.ljust(progress["line_length"]))
+        progress["line_length"] = len(line)
+    else:
+        stream.write(line + "\n")
+    stream.flush()
+
+
+## --------------------------------------------------------------------------
+# Function to print a message without breaking the status line
+def progress_print(message):
+    """
+    Prints a message (e.g. an error) above the status line of the running progress report,
+    and redraws the status line under it. Works like `print` when no report is running.
+
+    Args:
+        message (str): The message to print.
+
+    Returns:
+        None
+    """
+
+    with _print_lock:
+        progress = _active_progress
+        if progress is None:
+            print(message)
+            return
+
+        stream = progress["stream"]
+        stream.write("\r" + " " * progress["line_length"] + "\r")
+        progress["line_length"] = 0
+        print(message, file=stream)
+        _draw_progress(progress, time.perf_counter())
+
+
+## --------------------------------------------------------------------------
+# Function to finish a progress report
+def finish_progress(progress):
+    """
+    Replaces the status line with the final summary of the run.
+
+    Args:
+        progress (dict): Progress state from `start_progress`.
+
+    Returns:
+        dict: Summary of the run (done, failed, bytes, seconds, rate).
+    """
+
+    global _active_progress
+
+    now = time.perf_counter()
+    with _print_lock:
+        if _active_progress is progress:
+            _active_progress = None
+
+        line = _status_line(progress, now, final=True)
+        stream = progress["stream"]
+        stream.write(("\r" + line.ljust(progress["line_length"]) if progress["is_terminal"] else line) + "\n")
+        stream.flush()
+
+    elapsed = now - progress["start_time"]
+    return {
+        "done": progress["done"],
+        "failed": progress["failed"],
+        "bytes": progress["bytes"],
+        "seconds": elapsed,
+        "rate": progress["done"] / elapsed if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,325 @@
+import os
+import sys
+import sqlite3
+from datetime import datetime, timezone
+
+# Get the parent directory, add it to python path and import the modules
+parent_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(parent_dir)
+
+from Utilities.dedupe import normalize_email
+
+
+ROOT_REPO_PATH = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DEFAULT_INDEX_PATH = os.path.join(ROOT_REPO_PATH, "recipient_index.db")
+
+SUPPRESSION_REASONS = ("bounce", "opt-out")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipients (
+    email_key   TEXT PRIMARY KEY,
+    email       TEXT NOT NULL,
+    name        TEXT,
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS events (
+    event       TEXT PRIMARY KEY,
+    created_at  TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sends (
+    email_key   TEXT NOT NULL,
+    event       TEXT NOT NULL,
+    sent_at     TEXT NOT NULL,
+    PRIMARY KEY (email_key, event)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS suppressions (
+    email_key   TEXT PRIMARY KEY,
+    reason      TEXT NOT NULL,
+    recorded_at TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to get the current UTC timestamp
+def utc_timestamp():
+    """
+    Returns the current UTC time as an ISO 8601 string, as stored by the recipient and certificate indexes.
+    """
+
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+## --------------------------------------------------------------------------
+# Function to open (and create if needed) the recipient index
+def open_recipient_index(db_path=DEFAULT_INDEX_PATH):
+    """
+    Opens the local SQLite recipient index, creating the database and its tables if needed.
+
+    Args:
+        db_path (str, optional): Path to the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: An open connection to the index.
+
+    Exits:
+        Exits the program if the database cannot be opened.
+    """
+
+    try:
+        connection = sqlite3.connect(db_path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+    except sqlite3.Error as e:
+        print(f"\nError opening the recipient index '{os.path.basename(db_path)}'\n{e}\n\nExiting...\n")
+        exit(1)
+
+    return connection
+
+
+## --------------------------------------------------------------------------
+# Function to look up the history of many recipients at once
+def lookup_recipients(connection, emails, event=None):
+    """
+    Looks up suppressions and previous sends for a batch of email addresses in one query each.
+
+    The canonical keys are loaded into a temporary table and joined against the indexed
+    tables, so the cost grows with the batch size rather than with the size of the history.
+
+    Args:
+        connection (sqlite3.Connection): An open recipient index.
+        emails (iterable): Email addresses to look up.
+        event (str, optional): Event name to check previous sends against.
+
+    Returns:
+        tuple: (suppressed, already_sent) where `suppressed` maps email keys to their
+               suppression reason and `already_sent` is the set of email keys that were
+               already sent a message for `event`.
+    """
+
+    keys = {normalize_email(email) for email in emails}
+    keys.discard("")
+
+    connection.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_keys (email_key TEXT PRIMARY KEY) WITHOUT ROWID")
+    connection.execute("DELETE FROM lookup_keys")
+    connection.executemany("INSERT INTO lookup_keys VALUES (?)", ((key,) for key in keys))
+
+    suppressed = dict(connection.execute(
+        "SELECT s.email_key, s.reason FROM lookup_keys AS k JOIN suppressions AS s ON s.email_key = k.email_key"
+    ))
+
+    already_sent = set()
+    if event:
+        already_sent = {key for (key,) in connection.execute(
+            "SELECT s.email_key FROM lookup_keys AS k JOIN sends AS s ON s.email_key = k.email_key AND s.event = ?",
+            (event,),
+        )}
+
+    connection.execute("DELETE FROM lookup_keys")
+    connection.commit()
+
+    return suppressed, already_sent
+
+
+## --------------------------------------------------------------------------
+# Function to record a recipient in the index
+def record_recipient(connection, email, name=None, commit=True):
+    """
+    Inserts or refreshes a recipient entry.
+
+    Args:
+        connection (sqlite3.Connection): An open recipient index.
+        email (str): The recipient's email address.
+        name (str, optional): The recipient's name.
+        commit (bool, optional): Whether to commit immediately.
+
+    Returns:
+        str: The canonical email key of the recipient.
+    """
+
+    email_key = normalize_email(email)
+    timestamp = utc_timestamp()
+    connection.execute(
+        """INSERT INTO recipients (email_key, email, name, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT(email_key) DO UPDATE SET email = excluded.email,
+               name = COALESCE(excluded.name, recipients.name), last_seen = excluded.last_seen""",
+        (email_key, email.strip(), name, timestamp, timestamp),
+    )
+    if commit:
+        connection.commit()
+
+    return email_key
+
+
+## --------------------------------------------------------------------------
+# Function to record a successful send
+def record_send(connection, email, name, event, commit=True):
+    """
+    Records that a recipient was sent the message for an event.
+
+    Args:
+        connection (sqlite3.Connection): An open recipient index.
+        email (str): The recipient's email address.
+        name (str): The recipient's name.
+        event (str): The event the message belongs to.
+        commit (bool, optional): Whether to commit immediately.
+
+    Returns:
+        None
+    """
+
+    email_key = record_recipient(connection, email, name, commit=False)
+    timestamp = utc_timestamp()
+    connection.execute("INSERT OR IGNORE INTO events (event, created_at) VALUES (?, ?)", (event, timestamp))
+    connection.execute("INSERT OR REPLACE INTO sends (email_key, event, sent_at) VALUES (?, ?, ?)", (email_key, event, timestamp))
+    if commit:
+        connection.commit()
+
+
+## --------------------------------------------------------------------------
+# Function to add or remove an address from the suppression list
+def record_suppression(connection, email, reason):
+    """
+    Adds an address to the suppression list, or removes it when `reason` is None.
+
+    Args:
+        connection (sqlite3.Connection): An open recipient index.
+        email (str): The email address.
+        reason (str or None): One of SUPPRESSION_REASONS, or None to lift the suppression.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the reason is not a known suppression reason.
+    """
+
+    email_key = record_recipient(connection, email, commit=False)
+    if reason is None:
+        connection.execute("DELETE FROM suppressions WHERE email_key = ?", (email_key,))
+    elif reason in SUPPRESSION_REASONS:
+        connection.execute("INSERT OR REPLACE INTO suppressions (email_key, reason, recorded_at) VALUES (?, ?, ?)", (email_key, reason, utc_timestamp()))
+    else:
+        raise ValueError(f"Unknown suppression reason '{reason}', expected one of {', '.join(SUPPRESSION_REASONS)}")
+    connection.commit()
+
+
+## --------------------------------------------------------------------------
+# Function to drop suppressed and already-sent rows before processing
+def filter_recipients(rows, db_path, event, email_column="Email"):
+    """
+    Splits spreadsheet rows into those to process and those to skip, using one batched lookup.
+
+    Args:
+        rows (list): Rows (dicts) read from the spreadsheet.
+        db_path (str): Path to the recipient index.
+        event (str): Event name used for re-send protection.
+        email_column (str, optional): Column holding the email address.
+
+    Returns:
+        tuple: (kept_rows, skipped) where `skipped` is a list of (row, reason) tuples.
+    """
+
+    connection = open_recipient_index(db_path)
+    try:
+        suppressed, already_sent = lookup_recipients(connection, (row.get(email_column, "") for row in rows), event)
+    finally:
+        connection.close()
+
+    kept_rows = []
+    skipped = []
+    for row in rows:
+        email_key = normalize_email(row.get(email_column, ""))
+        if email_key in suppressed:
+            skipped.append((row, suppressed[email_key]))
+        elif email_key in already_sent:
+            skipped.append((row, "already sent"))
+        else:
+            kept_rows.append(row)
+
+    return kept_rows, skipped
+
+
+## --------------------------------------------------------------------------
+# Function to print the rows skipped by the recipient index
+def report_skipped_recipients(skipped, email_column="Email"):
+    """
+    Prints (and logs) a summary of the recipients skipped because of suppressions or previous sends.
+
+    Args:
+        skipped (list): (row, reason) tuples as returned by `filter_recipients`.
+        email_column (str, optional): Column holding the email address.
+
+    Returns:
+        None
+    """
+
+    if not skipped:
+        return
+
+    # Loaded here, the certificate generator imports this module (through the certificate index) without logging
+    import logging
+    from Utilities.structured_log import log_fields
+
+    print(f"\nSkipping {len(skipped)} recipient(s) found in the recipient index:")
+    for row, reason in skipped:
+        email = row.get(email_column, '').strip()
+        print(f"  {email} ({reason})")
+        logging.info(f"Skipped {email} ({reason})", extra=log_fields("filter", "skipped", row.get("_row_index"), email))
+
+
+### ===========================================================================
+## Main
+#
+
+if __name__ == "__main__":
+    """
+    Manages the suppression list of the recipient index.
+
+    Usage:
+        python recipient_index.py suppress <email> <bounce|opt-out>
+        python recipient_index.py unsuppress <email>
+        python recipient_index.py status <email>
+    """
+
+    usage = "\nUsage:\n  python recipient_index.py suppress <email> <bounce|opt-out>\n  python recipient_index.py unsuppress <email>\n  python recipient_index.py status <email>\n"
+    if len(sys.argv) < 3 or sys.argv[1] not in ["suppress", "unsuppress", "status"]:
+        print(usage)
+        sys.exit(1)
+
+    command, email = sys.argv[1], sys.argv[2]
+    connection = open_recipient_index()
+
+    if command == "suppress":
+        reason = sys.argv[3] if len(sys.argv) > 3 else "opt-out"
+        try:
+            record_suppression(connection, email, reason)
+        except ValueError as e:
+            print(f"\nError: {e}\n")
+            sys.exit(1)
+        print(f"\n'{email}' added to the suppression list ({reason}).\n")
+
+    elif command == "unsuppress":
+        record_suppression(connection, email, None)
+        print(f"\n'{email}' removed from the suppression list.\n")
+
+    else:
+        email_key = normalize_email(email)
+        suppression = connection.execute("SELECT reason, recorded_at FROM suppressions WHERE email_key = ?", (email_key,)).fetchone()
+        sends = connection.execute("SELECT event, sent_at FROM sends WHERE email_key = ? ORDER BY sent_at", (email_key,)).fetchall()
+        print(f"\nRecipient '{email_key}':")
+        print(f"  Suppressed: {'{} since {}'.format(*suppression) if suppression else 'No'}")
+        print(f"  Sends: {len(sends)}")
+        for event, sent_at in sends:
+            print(f"    {sent_at} - {event}")
+        print()
+
+    connection.close()
@@ -0,0 +1,405 @@
+import os
+import csv
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+
+SPREADSHEET_EXTENSIONS = ("CSV", "XLSX", "ODS")
+
+XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+XLSX_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+ODS_TABLE_NS = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+ODS_OFFICE_NS = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+ODS_TEXT_NS = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to clean a header cell the same way as `clean_csv_fieldnames`
+def clean_fieldname(field):
+    """
+    Strips whitespace and trailing colons from a header cell.
+
+    Args:
+        field (str): The raw header cell.
+
+    Returns:
+        str: The cleaned field name.
+    """
+
+    return (field or "").strip().rstrip(":").strip()
+
+
+## --------------------------------------------------------------------------
+# Function to convert a cell reference column (e.g. "AB") to an index
+def column_index(cell_reference):
+    """
+    Converts the column letters of a cell reference such as "AB12" to a zero based index.
+
+    Args:
+        cell_reference (str): The cell reference.
+
+    Returns:
+        int: The zero based column index.
+    """
+
+    index = 0
+    for char in cell_reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + (ord(char.upper()) - 64)
+
+    return index - 1
+
+
+## --------------------------------------------------------------------------
+# Function to find the path of the first worksheet inside an XLSX archive
+def _first_xlsx_sheet(archive):
+    """
+    Resolves the archive path of the first worksheet listed in the workbook.
+
+    Args:
+        archive (zipfile.ZipFile): The opened XLSX archive.
+
+    Returns:
+        str: The archive path of the worksheet XML.
+    """
+
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    first_sheet = workbook.find(f"{XLSX_NS}sheets/{XLSX_NS}sheet")
+    relation_id = first_sheet.get(f"{XLSX_REL_NS}id")
+
+    relations = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for relation in relations.iter(f"{PACKAGE_REL_NS}Relationship"):
+        if relation.get("Id") == relation_id:
+            target = relation.get("Target")
+            return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+
+    return "xl/worksheets/sheet1.xml"
+
+
+## --------------------------------------------------------------------------
+# Function to stream the raw cells of each XLSX row
+def _iter_xlsx_cells(archive, sheet_path, wanted_columns=None):
+    """
+    Streams the worksheet XML and yields the raw cells of each row.
+
+    Args:
+        archive (zipfile.ZipFile): The opened XLSX archive.
+        sheet_path (str): The archive path of the worksheet XML.
+        wanted_columns (set, optional): Column indices to keep; all columns if None.
+
+    Yields:
+        dict: Maps column indices to (type, raw value) tuples for each row.
+    """
+
+    with archive.open(sheet_path) as sheet_file:
+        sheet_data = None
+        for event, element in ET.iterparse(sheet_file, events=("start", "end")):
+            if event == "start":
+                if element.tag == f"{XLSX_NS}sheetData":
+                    sheet_data = element
+                continue
+            if element.tag != f"{XLSX_NS}row":
+                continue
+
+            cells = {}
+            next_index = 0
+            for cell in element.iter(f"{XLSX_NS}c"):
+                reference = cell.get("r")
+                index = column_index(reference) if reference else next_index
+                next_index = index + 1
+                if wanted_columns is not None and index not in wanted_columns:
+                    continue
+
+                cell_type = cell.get("t", "n")
+                if cell_type == "inlineStr":
+                    value = "".join(text.text or "" for text in cell.iter(f"{XLSX_NS}t"))
+                else:
+                    value_element = cell.find(f"{XLSX_NS}v")
+                    value = value_element.text if value_element is not None else None
+                if value is not None:
+                    cells[index] = (cell_type, value)
+
+            # Drop the parsed row so memory stays bounded on large sheets
+            element.clear()
+            if sheet_data is not None:
+                sheet_data.clear()
+
+            yield cells
+
+
+## --------------------------------------------------------------------------
+# Function to load only the shared strings that are needed
+def _load_shared_strings(archive, wanted_indices):
+    """
+    Streams the shared string table and keeps only the requested entries.
+
+    Args:
+        archive (zipfile.ZipFile): The opened XLSX archive.
+        wanted_indices (set): Indices of the shared strings to keep.
+
+    Returns:
+        dict: Maps the wanted indices to their strings.
+    """
+
+    strings = {}
+    if not wanted_indices or "xl/sharedStrings.xml" not in archive.namelist():
+        return strings
+
+    last_wanted = max(wanted_indices)
+    with archive.open("xl/sharedStrings.xml") as strings_file:
+        index = 0
+        for _, element in ET.iterparse(strings_file, events=("end",)):
+            if element.tag != f"{XLSX_NS}si":
+                continue
+            if index in wanted_indices:
+                # Rich text is split into runs, phonetic hints (rPh) are not part of the value
+                strings[index] = "".join(
+                    text.text or "" for run in element if run.tag != f"{XLSX_NS}rPh" for text in run.iter(f"{XLSX_NS}t")
+                )
+            element.clear()
+            index += 1
+            if index > last_wanted:
+                break
+
+    return strings
+
+
+## --------------------------------------------------------------------------
+# Function to convert a raw XLSX cell to text
+def _xlsx_cell_text(cell, shared_strings):
+    """
+    Converts a raw (type, value) XLSX cell to the text shown in a CSV export.
+
+    Args:
+        cell (tuple): The (type, raw value) tuple.
+        shared_strings (dict): The loaded shared strings.
+
+    Returns:
+        str: The cell text.
+    """
+
+    cell_type, value = cell
+    if cell_type == "s":
+        return shared_strings.get(int(value), "")
+    if cell_type == "b":
+        return "TRUE" if value == "1" else "FALSE"
+    if cell_type == "n" and value.endswith(".0"):
+        return value[:-2]
+
+    return value
+
+
+## --------------------------------------------------------------------------
+# Function to stream the rows of an XLSX workbook
+def iter_xlsx_rows(file_path, columns=None):
+    """
+    Streams the rows of the first worksheet of an XLSX workbook as dictionaries.
+
+    The worksheet XML is parsed iteratively and each row is discarded once read. Only the
+    projected columns are materialised, and only the shared strings they reference are
+    loaded: the header row is resolved first, a second pass collects the string indices
+    of the projected columns, and a final pass yields the rows.
+
+    Args:
+        file_path (str): Path to the XLSX file.
+        columns (list, optional): Cleaned header names to keep; all columns if None.
+
+    Yields:
+        dict: Maps each (cleaned) header name to the cell text of a row.
+    """
+
+    with zipfile.ZipFile(file_path) as archive:
+        sheet_path = _first_xlsx_sheet(archive)
+
+        header_cells = next(_iter_xlsx_cells(archive, sheet_path), {})
+        header_strings = _load_shared_strings(archive, {int(value) for cell_type, value in header_cells.values() if cell_type == "s"})
+        header = {index: clean_fieldname(_xlsx_cell_text(cell, header_strings)) for index, cell in header_cells.items()}
+        projection = {index: name for index, name in header.items() if name and (columns is None or name in columns)}
+        if not projection:
+            return
+
+        wanted_columns = set(projection)
+        wanted_strings = set()
+        for cells in _iter_xlsx_cells(archive, sheet_path, wanted_columns):
+            wanted_strings.update(int(value) for cell_type, value in cells.values() if cell_type == "s")
+        shared_strings = _load_shared_strings(archive, wanted_strings)
+
+        rows = _iter_xlsx_cells(archive, sheet_path, wanted_columns)
+        next(rows, None)    # Skip the header row
+        for cells in rows:
+            if not cells:
+                continue
+            yield {name: _xlsx_cell_text(cells[index], shared_strings) if index in cells else "" for index, name in projection.items()}
+
+
+## --------------------------------------------------------------------------
+# Function to get the text of an ODS cell
+def _ods_cell_text(cell):
+    """
+    Converts an ODS table cell to the text shown in a CSV export.
+
+    Args:
+        cell (xml.etree.ElementTree.Element): The table:table-cell element.
+
+    Returns:
+        str: The cell text.
+    """
+
+    if cell.get(f"{ODS_OFFICE_NS}value-type") == "boolean":
+        return "TRUE" if cell.get(f"{ODS_OFFICE_NS}boolean-value") == "true" else "FALSE"
+
+    return "\n".join("".join(paragraph.itertext()) for paragraph in cell.iter(f"{ODS_TEXT_NS}p"))
+
+
+## --------------------------------------------------------------------------
+# Function to stream the rows of an ODS spreadsheet
+def iter_ods_rows(file_path, columns=None):
+    """
+    Streams the rows of the first table of an ODS spreadsheet as dictionaries.
+
+    content.xml is parsed iteratively and each row is discarded once read. Repeated
+    cells and rows are expanded only as far as the projected columns require, so the
+    trailing blank area that spreadsheet apps emit costs nothing.
+
+    Args:
+        file_path (str): Path to the ODS file.
+        columns (list, optional): Cleaned header names to keep; all columns if None.
+
+    Yields:
+        dict: Maps each (cleaned) header name to the cell text of a row.
+    """
+
+    cell_tags = {f"{ODS_TABLE_NS}table-cell", f"{ODS_TABLE_NS}covered-table-cell"}
+    projection = None
+    last_column = None
+
+    with zipfile.ZipFile(file_path) as archive, archive.open("content.xml") as content_file:
+        table = None
+        for event, element in ET.iterparse(content_file, events=("start", "end")):
+            if event == "start":
+                if element.tag == f"{ODS_TABLE_NS}table" and table is None:
+                    table = element
+                continue
+            if element.tag == f"{ODS_TABLE_NS}table" and element is table:
+                break
+            if element.tag != f"{ODS_TABLE_NS}table-row" or table is None:
+                continue
+
+            cells = {}
+            index = 0
+            for cell in element:
+                if cell.tag not in cell_tags:
+                    continue
+                repeat = int(cell.get(f"{ODS_TABLE_NS}number-columns-repeated", "1"))
+                text = _ods_cell_text(cell)
+                if text:
+                    for offset in range(repeat):
+                        if last_column is not None and index + offset > last_column:
+                            break
+                        if projection is None or index + offset in projection:
+                            cells[index + offset] = text
+                index += repeat
+                if last_column is not None and index > last_column:
+                    break
+
+            row_repeat = int(element.get(f"{ODS_TABLE_NS}number-rows-repeated", "1"))
+            element.clear()
+            table.clear()
+
+            if projection is None:
+                header = {column: clean_fieldname(text) for column, text in cells.items()}
+                projection = {column: name for column, name in header.items() if name and (columns is None or name in columns)}
+                if not projection:
+                    return
+                last_column = max(projection)
+                continue
+
+            if not cells:
+                continue
+            row = {name: cells.get(column, "") for column, name in projection.items()}
+            for _ in range(row_repeat):
+                yield dict(row)
+
+
+## --------------------------------------------------------------------------
+# Function to stream the rows of a CSV file
+def iter_csv_rows(file_path, columns=None):
+    """
+    Streams the rows of a CSV file as dictionaries with cleaned header names.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        columns (list, optional): Cleaned header names to keep; all columns if None.
+
+    Yields:
+        dict: Maps each (cleaned) header name to the cell text of a row.
+    """
+
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as csv_file:
+        reader = csv.reader(csv_file)
+        header = [clean_fieldname(field) for field in next(reader, [])]
+        projection = {index: name for index, name in enumerate(header) if name and (columns is None or name in columns)}
+        for values in reader:
+            if not any(value.strip() for value in values):
+                continue
+            yield {name: values[index] if index < len(values) else "" for index, name in projection.items()}
+
+
+## --------------------------------------------------------------------------
+# Function to stream the rows of any supported spreadsheet
+def iter_spreadsheet_rows(file_path, columns=None):
+    """
+    Streams the rows of a CSV, XLSX or ODS file as dictionaries, picking the reader from the extension.
+
+    Args:
+        file_path (str): Path to the spreadsheet.
+        columns (list, optional): Cleaned header names to keep; all columns if None.
+
+    Returns:
+        iterator: Rows as dictionaries of (cleaned) header name to cell text.
+
+    Raises:
+        ValueError: If the extension is not supported.
+    """
+
+    extension = os.path.splitext(file_path)[1].lstrip(".").upper()
+    readers = {"CSV": iter_csv_rows, "XLSX": iter_xlsx_rows, "ODS": iter_ods_rows}
+    if extension not in readers:
+        raise ValueError(f"Unsupported spreadsheet format '.{extension.lower()}', expected one of {', '.join(SPREADSHEET_EXTENSIONS)}")
+
+    return readers[extension](file_path, columns)
+
+
+## --------------------------------------------------------------------------
+# Function to convert a workbook to a UTF-8 CSV file
+def export_to_csv(file_path, csv_file_path, columns=None):
+    """
+    Streams the rows of a spreadsheet into a UTF-8 CSV file.
+
+    Args:
+        file_path (str): Path to the CSV, XLSX or ODS spreadsheet.
+        csv_file_path (str): Path of the CSV file to write.
+        columns (list, optional): Cleaned header names to keep; all columns if None.
+
+    Returns:
+        int: The number of data rows written.
+    """
+
+    row_count = 0
+    with open(csv_file_path, "w", encoding="utf-8", newline="") as csv_file:
+        writer = None
+        for row in iter_spreadsheet_rows(file_path, columns):
+            if writer is None:
+                writer = csv.DictWriter(csv_file, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            row_count += 1
+
+    return row_count
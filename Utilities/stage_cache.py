@@ -0,0 +1,157 @@
+import os
+import json
+import glob
+import shutil
+import hashlib
+
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to hash the contents of a file
+def file_digest(file_path, chunk_size=1 << 20):
+    """
+    Returns the SHA-256 digest of a file, read in chunks.
+
+    Args:
+        file_path (str): Path to the file.
+        chunk_size (int, optional): Number of bytes read at a time.
+
+    Returns:
+        str: The hex digest of the file contents.
+    """
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+## --------------------------------------------------------------------------
+# Function to compute the cache key of a certificate
+def certificate_key(name, layout, name_case, template_digest, font_digest, qr_payload=None, texts=None):
+    """
+    Returns the content address of a certificate: a hash of everything that changes its output.
+
+    Args:
+        name (str): Name printed on the certificate.
+        layout (dict): Layout profile of the certificate.
+        name_case (str): "upper" or "title".
+        template_digest (str): Digest of the template PDF.
+        font_digest (str): Digest of the font file.
+        qr_payload (str, optional): Text of the verification QR code.
+        texts (list, optional): Filled in texts of the layout fields (event, date, columns, ...).
+
+    Returns:
+        str: The hex digest identifying the certificate.
+    """
+
+    inputs = [name.strip(), layout, name_case, template_digest, font_digest, qr_payload]
+    if texts is not None:
+        inputs.append(texts)
+    inputs = json.dumps(inputs, sort_keys=True, default=list)
+    return hashlib.sha256(inputs.encode("utf-8")).hexdigest()
+
+
+## --------------------------------------------------------------------------
+# Function to load the manifest of the latest previous run
+def load_previous_manifest(output_dir_path):
+    """
+    Finds the most recent output folder of `output_dir_path` (including its "(n)" variants)
+    that has a manifest, and returns which certificate file holds each key.
+
+    Args:
+        output_dir_path (str): The preferred output directory path.
+
+    Returns:
+        tuple: (folder_path, entries) where `entries` maps certificate keys to their paths
+               relative to the folder. (None, {}) if there is no previous run.
+    """
+
+    candidates = [output_dir_path] + glob.glob(glob.escape(output_dir_path) + "(*)")
+    manifests = [os.path.join(folder, MANIFEST_FILENAME) for folder in candidates]
+    manifests = [manifest for manifest in manifests if os.path.isfile(manifest)]
+    if not manifests:
+        return None, {}
+
+    manifest_path = max(manifests, key=os.path.getmtime)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return None, {}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None, {}
+
+    entries = {key: filename for filename, key in manifest.get("certificates", {}).items()}
+    return os.path.dirname(manifest_path), entries
+
+
+## --------------------------------------------------------------------------
+# Function to reuse a previously generated file
+def reuse_file(source_path, destination_path):
+    """
+    Places a previously generated file at a new path, as a hard link where possible.
+
+    The link or copy is made under a temporary name and renamed into place, so the
+    destination never holds a partly copied file.
+
+    Args:
+        source_path (str): Path of the existing file.
+        destination_path (str): Path the file is needed at.
+
+    Returns:
+        bool: True if the file was reused, False if it could not be (e.g. it was deleted).
+    """
+
+    if not os.path.isfile(source_path):
+        return False
+
+    temp_path = f"{destination_path}.{os.getpid()}.tmp"
+    try:
+        try:
+            os.link(source_path, temp_path)
+        except OSError:
+            shutil.copy2(source_path, temp_path)
+        os.replace(temp_path, destination_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+    return True
+
+
+## --------------------------------------------------------------------------
+# Function to write the manifest of a run
+def write_manifest(folder_path, inputs, certificates, paths=None):
+    """
+    Writes the run manifest into the output folder, atomically.
+
+    Args:
+        folder_path (str): The output folder of the run.
+        inputs (dict): Digests and settings the run was made with.
+        certificates (dict): Maps the path of each certificate (relative to the folder) to its key.
+        paths (dict, optional): Maps each certificate ID to its path relative to the folder,
+                                so the tools find a certificate without listing the folder.
+
+    Returns:
+        None
+    """
+
+    manifest = {"version": MANIFEST_VERSION, "inputs": inputs, "certificates": certificates}
+    if paths is not None:
+        manifest["paths"] = paths
+    manifest_path = os.path.join(folder_path, MANIFEST_FILENAME)
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
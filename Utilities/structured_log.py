@@ -0,0 +1,230 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+
+
+LOG_MAX_BYTES = 5 * 1024 * 1024     # Size at which the log file is rotated
+LOG_BACKUP_COUNT = 5                # Rotated files kept (email_log.jsonl.1 ... .5)
+
+# Fields copied from the `extra` of a log call into the JSON record, see `log_fields`
+STRUCTURED_FIELDS = ("row_index", "email", "stage", "latency", "outcome", "error_class")
+
+# Listener writing the queued records, None when structured logging is off
+_listener = None
+
+
+## ===========================================================================
+### Classes
+
+## --------------------------------------------------------------------------
+# Formatter writing one JSON object per line
+class JSONLinesFormatter(logging.Formatter):
+    """
+    Formats a log record as a single line JSON object: timestamp, level, message and the
+    STRUCTURED_FIELDS given through `extra`.
+    """
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+
+        return json.dumps(entry, ensure_ascii=False)
+
+
+## ===========================================================================
+### Functions
+
+## --------------------------------------------------------------------------
+# Function to build the structured fields of a log call
+def log_fields(stage, outcome, row_index=None, email=None, latency=None, error=None):
+    """
+    Returns the `extra` of a log call, e.g. `logging.info("Email sent", extra=log_fields(...))`.
+
+    Args:
+        stage (str): Stage of the row, e.g. "render" or "send".
+        outcome (str): "sent", "failed", "skipped", "error" or "interrupted".
+        row_index (int, optional): Row index in the spreadsheet.
+        email (str, optional): The recipient's email address.
+        latency (float, optional): Seconds the stage took for the row.
+        error (BaseException, optional): The error, logged by its class name.
+
+    Returns:
+        dict: The structured fields.
+    """
+
+    return {
+        "stage": stage,
+        "outcome": outcome,
+        "row_index": row_index,
+        "email": email,
+        "latency": round(latency, 4) if latency is not None else None,
+        "error_class": type(error).__name__ if error is not None else None,
+    }
+
+
+## --------------------------------------------------------------------------
+# Function to start logging JSON lines from a background thread
+def start_structured_logging(log_file_path, level=logging.INFO, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """
+    Sends the records of the root logger through a queue to a background thread, which
+    writes them as JSON lines to a size-rotated log file.
+
+    Logging calls only put the record on the queue, so senders never wait for the disk.
+    The queue is flushed when the process exits (or on `stop_structured_logging`).
+
+    Args:
+        log_file_path (str): Path to the log file.
+        level (int, optional): Minimum level of the records to write.
+        max_bytes (int, optional): Size at which the file is rotated.
+        backup_count (int, optional): Number of rotated files to keep.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener.
+
+    Exits:
+        Exits the program if the log file cannot be opened.
+    """
+
+    from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+    global _listener
+
+    stop_structured_logging()
+
+    try:
+        file_handler = RotatingFileHandler(log_file_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    except OSError as e:
+        print(f"\nError opening the log file '{os.path.basename(log_file_path)}'\n{e}\n\nExiting...\n")
+        exit(1)
+    file_handler.setFormatter(JSONLinesFormatter())
+
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(QueueHandler(log_queue))
+    root_logger.setLevel(level)
+
+    _listener = QueueListener(log_queue, file_handler)
+    _listener.start()
+    atexit.register(stop_structured_logging)
+
+    return _listener
+
+
+## --------------------------------------------------------------------------
+# Function to flush and stop the background log writer
+def stop_structured_logging():
+    """
+    Writes the queued records, then stops the background thread and closes the log file.
+
+    Returns:
+        None
+    """
+
+    global _listener
+
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+## --------------------------------------------------------------------------
+# Function to summarize a JSON-lines log
+def summarize_log(log_file_path):
+    """
+    Counts the outcomes, stages and error classes of a JSON-lines log, and the latency
+    percentiles of each stage, with a single pass over the file.
+
+    Args:
+        log_file_path (str): Path to the log file.
+
+    Returns:
+        dict: {"records", "outcomes", "errors", "latency"} where "latency" maps each stage
+              to its count, median, 95th percentile and maximum in seconds.
+    """
+
+    import statistics
+
+    outcomes = Counter()
+    errors = Counter()
+    latencies = {}
+    records = 0
+    with open(log_file_path, "r", encoding="utf-8") as log_file:
+        for line in log_file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Free text lines of older logs
+            records += 1
+            if "outcome" in entry:
+                outcomes[(entry.get("stage"), entry["outcome"])] += 1
+            if "error_class" in entry:
+                errors[entry["error_class"]] += 1
+            if "latency" in entry:
+                latencies.setdefault(entry.get("stage"), []).append(entry["latency"])
+
+    latency = {}
+    for stage, values in latencies.items():
+        values.sort()
+        latency[stage] = {
+            "count": len(values),
+            "p50": statistics.median(values),
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max": values[-1],
+        }
+
+    return {"records": records, "outcomes": dict(outcomes), "errors": dict(errors), "latency": latency}
+
+
+### ===========================================================================
+## Main
+#
+
+if __name__ == "__main__":
+    """
+    Prints a summary of a JSON-lines email log.
+
+    Usage:
+        python structured_log.py <email_log.jsonl>
+    """
+
+    if len(sys.argv) != 2:
+        print("\nUsage:\n  python structured_log.py <email_log.jsonl>\n")
+        sys.exit(1)
+
+    try:
+        summary = summarize_log(sys.argv[1])
+    except OSError as e:
+        print(f"\nError reading '{sys.argv[1]}': {e}\n")
+        sys.exit(1)
+
+    print(f"\n{summary['records']} record(s) in '{os.path.basename(sys.argv[1])}'\n")
+    print("Outcomes:")
+    for (stage, outcome), count in sorted(summary["outcomes"].items(), key=lambda item: (str(item[0][0]), item[0][1])):
+        print(f"  {stage or '-'} / {outcome}: {count}")
+    if summary["errors"]:
+        print("Errors:")
+        for error_class, count in sorted(summary["errors"].items(), key=lambda item: -item[1]):
+            print(f"  {error_class}: {count}")
+    if summary["latency"]:
+        print("Latency (seconds):")
+        for stage, stats in summary["latency"].items():
+            print(f"  {stage or '-'}: {stats['count']} rows, p50 {stats['p50']:.3f}, p95 {stats['p95']:.3f}, max {stats['max']:.3f}")
+    print()
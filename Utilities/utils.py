@@ -2,10 +2,10 @@ import os
 import re
 import csv
 import json
-import logging
-from email import encoders
-from email.mime.base import MIMEBase
-from string import ascii_letters
+import unicodedata
+from collections import Counter
+
+from Utilities.progress import finish_progress, progress_print, start_progress, update_progress
 
 
 default_html_code = """<!-- <html>
@@ -38,32 +38,62 @@ def add_attachment(msg, attachment_path):
         FileNotFoundError: Logs an error if the file is not found and displays an error message.
     """
 
+    from email import encoders
+    from email.mime.base import MIMEBase
+
     try:
         attachment = MIMEBase("application", "octet-stream")
         with open(attachment_path.strip(), "rb") as file:
             attachment.set_payload(file.read())
         encoders.encode_base64(attachment)
+        # Non-ASCII filenames are encoded as RFC 2231 parameters
         attachment.add_header(
             "Content-Disposition",
-            f"attachment; filename={os.path.basename(attachment_path)}",
+            "attachment",
+            filename=os.path.basename(attachment_path),
         )
         msg.attach(attachment)
     except FileNotFoundError:
+        import logging
         logging.error(f"Attachment not found: {attachment_path}")
         print(f"Attachment not found: {attachment_path}")
 
 
+## --------------------------------------------------------------------------
+# Function to get the certificate filename of a name
+def certificate_filename(name, cert_id=None):
+    """
+    Returns the filename of the certificate generated for a name.
+
+    The certificate ID keeps the files of two recipients with the same name apart.
+
+    Args:
+        name (str): The recipient's name.
+        cert_id (str, optional): The certificate ID, see `Utilities.certificate_index`.
+
+    Returns:
+        str: The certificate filename.
+    """
+
+    stem = "_".join(unicodedata.normalize("NFC", name).title().split())
+    if cert_id:
+        stem += f"_{cert_id}"
+
+    return stem + "_certificate.pdf"
+
+
 ## --------------------------------------------------------------------------
 # Function to check the attachment's presence
-def check_attachments(csv_file_path, attachments_dir_path=None, attachment_mode=None, automation_dir_path=None):
+def check_attachments(csv_file_path, attachments_dir_path=None, attachment_mode=None, quiet=False):
     """
     Validates the presence of attachments as specified in a CSV file based on the selected attachment mode.
 
     Args:
         csv_file_path (str): Path to the CSV file containing attachment details.
-        attachments_dir_path (str, optional): Directory path where attachments are stored.
+        attachments_dir_path (str, optional): Directory path where attachments are stored
+                                              (the generated certificates directory in "Other" mode).
         attachment_mode (str, optional): Mode of attachment ("Common", "Respective", "Other").
-        automation_dir_path (str, optional): Directory path for automation-specific files.
+        quiet (bool, optional): Suppress the progress messages (used by the automation script).
 
     Returns:
         None
@@ -71,7 +101,7 @@ def check_attachments(csv_file_path, attachments_dir_path=None, attachment_mode=
     Exits:
         Exits the program if attachments are missing or improperly specified.
     """
-    if not automation_dir_path:
+    if not quiet:
         print("\nChecking the attachments as per the provided Attachment Mode in config file...")
 
     with open(csv_file_path, "r", encoding="utf-8") as csv_file:
@@ -98,8 +128,10 @@ def check_attachments(csv_file_path, attachments_dir_path=None, attachment_mode=
                         print(f"Error:\nCommon attachment of first row not found in the Attachments Directory - {attachment}")
 
         elif attachment_mode == "Respective":
+            rows = list(reader)
+            progress = None if quiet else start_progress("Checking attachments", len(rows))
             missing_files =[]
-            for row_index, row in enumerate(reader, start=2):
+            for row_index, row in enumerate(rows, start=2):
                 if row.get("Attachments", ""):
                     attachments = row.get("Attachments", "").split(";")
                     missing_files = [path.strip() for path in attachments if path.strip() and not os.path.exists(os.path.join(attachments_dir_path,path.strip()))]
@@ -108,26 +140,35 @@ def check_attachments(csv_file_path, attachments_dir_path=None, attachment_mode=
 
                 if missing_files:
                     is_missing = True
-                    print(f"Attachment not found - Row Index \'{row_index}\' - {missing_files}")
+                    progress_print(f"Attachment not found - Row Index \'{row_index}\' - {missing_files}")
+                if progress:
+                    update_progress(progress, failed=bool(missing_files))
+            if progress:
+                finish_progress(progress)
 
         elif attachment_mode == "Other":
-            for row_index, row in enumerate(reader, start=2):
-                name = row.get("Full Name", "").title().strip()
-                attachments = f"{name.title().strip().replace(' ', '_')}_certificate.pdf"
-
-                gen_certs_dir_path = os.path.join(automation_dir_path, "gen_certs_dir_path.txt")
-                with open(gen_certs_dir_path, "r") as file:
-                    gen_certs_dir_path = file.read()
-
-                attachment_path = os.path.join(gen_certs_dir_path, attachments)
-                if not os.path.exists(attachment_path):
+            rows = list(reader)
+            progress = None if quiet else start_progress("Checking attachments", len(rows))
+            # Paths recorded by the certificate generator, for sharded output folders
+            from Utilities.output_layout import find_certificate, load_certificate_paths
+            paths = load_certificate_paths(attachments_dir_path)
+            for row_index, row in enumerate(rows, start=2):
+                attachments = certificate_filename(row.get("Full Name", ""), row.get("Certificate ID"))
+
+                attachment_path = find_certificate(attachments_dir_path, attachments, row.get("Certificate ID"), paths)
+                is_found = os.path.exists(attachment_path)
+                if not is_found:
                     is_missing = True
-                    print(f"Attachment not found: Row Index \'{row_index}\' - {attachments}")
+                    progress_print(f"Attachment not found: Row Index \'{row_index}\' - {attachments}")
+                if progress:
+                    update_progress(progress, failed=not is_found)
+            if progress:
+                finish_progress(progress)
 
         if is_missing:
             print("\nExiting...\n")
             exit(1)
-    if not automation_dir_path:
+    if not quiet:
         print("Attachments check completed successfully!\nDONE!")
 
 
@@ -156,7 +197,7 @@ def clean_csv_fieldnames(file_path):
         cleaned_header = [field.strip().rstrip(":").strip() for field in header.split(",")]
 
         # Check for duplicate fieldnames
-        duplicates = set([field for field in cleaned_header if cleaned_header.count(field) > 1 and field != ""])
+        duplicates = [field for field, count in Counter(cleaned_header).items() if count > 1 and field != ""]
         if duplicates:
             print(f"Error: Duplicate fieldnames found in header: [{', '.join(duplicates)}]\n\nExiting...\n")
             exit(1)
@@ -196,6 +237,36 @@ def clean_csv_fieldnames(file_path):
         exit(1)
 
 
+## --------------------------------------------------------------------------
+# Function to check active participants or valid attendance
+def check_attendance(csv_file_path):
+    """
+    Function to check active participants or valid attendance
+
+    Args:
+        csv_file_path (str): Path to the CSV file containing participant data.
+
+    Returns:
+        None
+
+    Exits:
+        Exits the program if no participant is marked 'Present' (i.e., "TRUE")
+        under the 'Attendance' column.
+    """
+    attendance_data = []
+
+    with open(csv_file_path, mode='r', newline='', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            attendance_data.append(row["Attendance"])
+
+    attendance_data = [item.strip().upper() for item in attendance_data]
+
+    if "TRUE" not in attendance_data:
+        print("\nError: No Active participants found in Spreadsheet\nNo participant is marked 'Present' under 'Attendance' column.\n\nExiting...\n")
+        exit(1)
+
+
 ## --------------------------------------------------------------------------
 # Function to check the html body file contents
 def check_body_template(body_template_path):
@@ -289,6 +360,7 @@ def check_csv(csv_file_path, attachment_mode, additional_column=None):
         duplicate_emails = []
         email_map = {}
         invalid_rows = []
+        recipients = []
         for row_index, row in enumerate(reader, start=2):
             if not row.get("Full Name", "") or not row.get("Email", ""):
                 invalid_rows.append(row_index)
@@ -304,6 +376,7 @@ def check_csv(csv_file_path, attachment_mode, additional_column=None):
                 email_map[email] = {"indices": [], "names": set()}
             email_map[email]["indices"].append(row_index)
             email_map[email]["names"].add(row.get("Full Name", ""))
+            recipients.append((row_index, row.get("Full Name", ""), email))
 
         duplicate_emails = {email: details for email, details in email_map.items() if len(details["indices"]) > 1}
 
@@ -323,6 +396,10 @@ def check_csv(csv_file_path, attachment_mode, additional_column=None):
 
             print("\nExiting...\n")
             exit(1)
+
+        # Exact duplicates are fatal, near duplicates (aliases, typos) are only reported for review
+        from Utilities.dedupe import find_near_duplicates, report_near_duplicates
+        report_near_duplicates(find_near_duplicates(recipients))
         print("CSV file check completed successfully!\nDONE!")
 
 
@@ -418,6 +495,56 @@ def get_single_file(directory_name, directory, extension):
     exit(1)
 
 
+## --------------------------------------------------------------------------
+# Function to get the single spreadsheet (CSV, XLSX or ODS) from a directory as a CSV file
+def get_spreadsheet_file(directory_name, directory, converted_dir_path, columns=None):
+    """
+    Ensures a single CSV, XLSX or ODS spreadsheet exists in a directory and returns it as a CSV file.
+
+    XLSX and ODS workbooks are streamed into a UTF-8 CSV file in `converted_dir_path`, so the
+    rest of the CSV based workflow runs unchanged without a manual export. Only the `columns`
+    the tool reads are converted, which skips the other cells of wide workbooks and keeps
+    unrelated attendee data out of the converted file.
+
+    Args:
+        directory_name (str): Name of the directory (used for error messages).
+        directory (str): Path to the directory.
+        converted_dir_path (str): Directory where converted workbooks are written.
+        columns (list, optional): Cleaned header names to convert; all columns if None.
+
+    Returns:
+        str: Path to the CSV file to process.
+
+    Exits:
+        Exits the program if no spreadsheet or multiple spreadsheets are found, or a workbook cannot be read.
+    """
+
+    # The workbook readers pull in zipfile and xml.etree, so they are only loaded when needed
+    from Utilities.spreadsheet_readers import SPREADSHEET_EXTENSIONS, export_to_csv
+
+    files = [file for extension in SPREADSHEET_EXTENSIONS for file in get_files(directory, extension) if not file.startswith("~$")]
+    if len(files) != 1:
+        print(f"\n{'Cannot read multiple spreadsheet' if files else 'Failed to read from spreadsheet'} files.")
+        print(f"Please provide a single CSV, XLSX or ODS file within the \"{directory_name}\" directory.\n")
+        exit(1)
+
+    spreadsheet_file_path = os.path.join(directory, files[0])
+    if files[0].lower().endswith(".csv"):
+        return spreadsheet_file_path
+
+    os.makedirs(converted_dir_path, exist_ok=True)
+    csv_file_path = os.path.join(converted_dir_path, f"{os.path.splitext(files[0])[0]}.csv")
+    print(f"\nConverting '{files[0]}' to CSV...")
+    try:
+        row_count = export_to_csv(spreadsheet_file_path, csv_file_path, columns)
+    except Exception as e:
+        print(f"\nError in reading spreadsheet '{files[0]}'!\nPlease ensure that the file is not corrupted.\n{e}\n\nExiting...\n")
+        exit(1)
+    print(f"{row_count} rows converted to '{os.path.basename(csv_file_path)}'.\nDONE!")
+
+    return csv_file_path
+
+
 ## --------------------------------------------------------------------------
 # Function to initialize files
 def initialize_necessary_files(body_template_file=None, log_file=None):
@@ -466,7 +593,8 @@ def load_config(filename):
     config = {
             "sender_email": "",
             "gmail_app_password": "",
-            "email_subject": ""
+            "email_subject": "",
+            "event_name": ""
         }
     if os.path.basename(filename) != "cert-email_config.json":
         config["attachment_mode"] = ""
@@ -503,11 +631,29 @@ def read_email_body_template(body_template_file):
         with open(body_template_file, "r", encoding="utf-8") as file:
             return file.read()
     except Exception as e:
+        import logging
         logging.error(f"Error reading HTML body template file\n{e}")
         print(f"\nError reading HTML body template file\n{e}\n\nExiting...\n")
         exit(1)
 
 
+## --------------------------------------------------------------------------
+# Function to validate a name
+def is_valid_name(name):
+    """
+    Returns True if a name only has letters of any script, their combining marks (accents,
+    vowel signs) and spaces, e.g. "José Müller" or "李小龍".
+
+    Args:
+        name (str): The name to validate.
+
+    Returns:
+        bool: True if the name is valid.
+    """
+
+    return bool(name.strip()) and all(char == " " or unicodedata.category(char)[0] in "LM" for char in name)
+
+
 ## --------------------------------------------------------------------------
 # Function to read the contents of the file
 def read_wordlist(file_path):
@@ -524,10 +670,8 @@ def read_wordlist(file_path):
         Exits the program if the wordlist contains invalid characters or is empty.
     """
 
-    valid_chars = set(ascii_letters + " ")
-
     try:
-        with open(file_path, "r") as file:
+        with open(file_path, "r", encoding="utf-8-sig") as file:
             lines = file.readlines()
     except UnicodeError as e:
         print(f"\nError in reading TXT wordlist!\nThe file has some invalid characters or is not UTF-8 encoded. Please review the file and try again.\n\nExiting...\n")
@@ -544,11 +688,11 @@ def read_wordlist(file_path):
 
     errors = []
     for index, name in enumerate(non_empty_lines, start=1):
-        if not all(char in valid_chars for char in name):
+        if not is_valid_name(name):
             errors.append(f"Line {index}: '{name}'")
 
     if errors:
-        print("\nError: Invalid names in wordlist (only alphabets and spaces allowed):")
+        print("\nError: Invalid names in wordlist (only letters and spaces allowed):")
         print("\n".join(errors))
         print("\nExiting...\n")
         exit(1)
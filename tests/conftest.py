@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Get the repository root, add it to python path so the tests import the modules like the scripts do
+root_repo_path = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, root_repo_path)
@@ -0,0 +1,63 @@
+import os
+import random
+import tarfile
+import zipfile
+
+import pytest
+
+from Utilities.bundle import add_to_bundle, close_bundle, open_bundle, parse_size
+
+
+def read_members(path, bundle_format):
+    if bundle_format == "zip":
+        with zipfile.ZipFile(path) as archive:
+            assert archive.testzip() is None
+            return {name: archive.read(name) for name in archive.namelist()}
+    with tarfile.open(path) as archive:
+        return {member.name: archive.extractfile(member).read() for member in archive.getmembers()}
+
+
+@pytest.mark.parametrize("bundle_format, compression", [("zip", "stored"), ("zip", "deflate"), ("tar", "stored"), ("tar", "deflate")])
+def test_volumes_stay_under_their_size_and_hold_whole_files(tmp_path, bundle_format, compression):
+    generator = random.Random(7)
+    files = {f"certificates/{number:03d}_Zoë_certificate.pdf": bytes(generator.getrandbits(8) for _ in range(generator.randint(1000, 9000))) for number in range(40)}
+    volume_size = 32 * 1024
+
+    bundle = open_bundle(str(tmp_path / "Generated_Certificates"), bundle_format, compression, volume_size)
+    for arcname, data in files.items():
+        add_to_bundle(bundle, arcname, data)
+    volume_paths = close_bundle(bundle)
+
+    assert len(volume_paths) > 1
+    assert [os.path.basename(path).split(".")[1] for path in volume_paths] == [f"part{number:03d}" for number in range(1, len(volume_paths) + 1)]
+    members = {}
+    for path in volume_paths:
+        assert os.path.getsize(path) <= volume_size
+        assert not os.path.exists(f"{path}.partial")
+        members.update(read_members(path, bundle_format))
+    assert members == files
+
+
+@pytest.mark.parametrize("bundle_format", ["zip", "tar"])
+def test_a_file_larger_than_a_volume_gets_its_own_volume(tmp_path, bundle_format):
+    bundle = open_bundle(str(tmp_path / "Generated_Certificates"), bundle_format, "stored", 4096)
+    add_to_bundle(bundle, "small.pdf", b"s" * 100)
+    add_to_bundle(bundle, "large.pdf", b"l" * 10000)
+    add_to_bundle(bundle, "after.pdf", b"a" * 100)
+    volume_paths = close_bundle(bundle)
+
+    assert [sorted(read_members(path, bundle_format)) for path in volume_paths] == [["small.pdf"], ["large.pdf"], ["after.pdf"]]
+
+
+def test_without_a_volume_size_there_is_one_archive(tmp_path):
+    bundle = open_bundle(str(tmp_path / "Generated_Certificates"), "zip")
+    add_to_bundle(bundle, "one.pdf", b"1" * 5000)
+    add_to_bundle(bundle, "two.pdf", b"2" * 5000)
+
+    assert close_bundle(bundle) == [str(tmp_path / "Generated_Certificates.zip")]
+
+
+def test_parse_size_accepts_the_unit_suffixes():
+    assert parse_size("500M") == 500 << 20
+    assert parse_size("2g") == 2 << 30
+    assert parse_size("4096") == 4096
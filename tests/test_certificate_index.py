@@ -0,0 +1,75 @@
+import pytest
+
+import Utilities.certificate_index as certificate_index
+from Utilities.certificate_index import (
+    CERTIFICATE_ID_LENGTH, assign_certificate_id, certificate_row_key, lookup_certificate, lookup_certificate_file,
+    open_certificate_index, record_certificate,
+)
+from Utilities.stage_cache import file_digest
+
+
+@pytest.fixture
+def connection(tmp_path):
+    connection = open_certificate_index(str(tmp_path / "certificate_index.db"))
+    yield connection
+    connection.close()
+
+
+def write_file(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_row_keys_prefer_the_normalized_email():
+    assert certificate_row_key("John Doe", " John.Doe+x@Gmail.com ") == "email:johndoe@gmail.com"
+    assert certificate_row_key(" John  Doe ", None, 2) == "name:john doe#2"
+
+
+def test_the_same_row_keeps_its_id(connection):
+    row_key = certificate_row_key("John Doe", "john@example.com")
+    cert_id = assign_certificate_id(connection, "Hackathon 2025", row_key)
+
+    assert len(cert_id) == CERTIFICATE_ID_LENGTH
+    assert assign_certificate_id(connection, "Hackathon 2025", row_key) == cert_id
+
+
+def test_the_same_name_at_two_events_gets_two_ids(connection):
+    row_key = certificate_row_key("John Smith")
+
+    assert assign_certificate_id(connection, "Hackathon 2025", row_key) != assign_certificate_id(connection, "Workshop 2025", row_key)
+
+
+def test_a_taken_id_is_lengthened(connection, monkeypatch):
+    monkeypatch.setattr(certificate_index, "make_certificate_id", lambda event, row_key, length=CERTIFICATE_ID_LENGTH: "A" * length)
+
+    first = assign_certificate_id(connection, "Hackathon 2025", certificate_row_key("John Doe"))
+    second = assign_certificate_id(connection, "Hackathon 2025", certificate_row_key("Jane Roe"))
+
+    assert first == "A" * CERTIFICATE_ID_LENGTH
+    assert second == "A" * (CERTIFICATE_ID_LENGTH + 1)
+
+
+def test_a_regenerated_certificate_keeps_the_first_file_verifiable(connection, tmp_path):
+    cert_id = assign_certificate_id(connection, "Hackathon 2025", certificate_row_key("John Doe", "john@example.com"))
+    first_path = write_file(tmp_path / "first.pdf", b"%PDF first")
+    second_path = write_file(tmp_path / "second.pdf", b"%PDF second")
+
+    record_certificate(connection, cert_id, "John  Doe", "john@example.com", "template-1", first_path)
+    record_certificate(connection, cert_id, "John Doe", "john@example.com", "template-2", second_path)
+
+    record = lookup_certificate(connection, cert_id.lower())
+    assert record["name"] == "John Doe"
+    assert record["output_hash"] == file_digest(first_path)
+    assert record["template_hash"] == "template-1"
+    assert lookup_certificate_file(connection, cert_id, file_digest(first_path))["template_hash"] == "template-1"
+    assert lookup_certificate_file(connection, cert_id, file_digest(second_path))["filename"] == "second.pdf"
+
+
+def test_an_unknown_file_or_id_does_not_verify(connection, tmp_path):
+    cert_id = assign_certificate_id(connection, "Hackathon 2025", certificate_row_key("John Doe"))
+    issued_path = write_file(tmp_path / "issued.pdf", b"%PDF issued")
+    record_certificate(connection, cert_id, "John Doe", None, "template-1", issued_path)
+
+    assert lookup_certificate_file(connection, cert_id, file_digest(write_file(tmp_path / "forged.pdf", b"%PDF forged"))) is None
+    assert lookup_certificate_file(connection, "AAAAAAAAAA", file_digest(issued_path)) is None
+    assert lookup_certificate(connection, "AAAAAAAAAA") is None
@@ -0,0 +1,48 @@
+from Utilities.dedupe import bounded_levenshtein, find_near_duplicates, normalize_email
+
+
+def names_of(groups):
+    return [[name for _, name, _ in group] for group in groups]
+
+
+def rows_of(names, emails=None):
+    return [(index + 2, name, (emails or {}).get(index, f"row{index}@example.com")) for index, name in enumerate(names)]
+
+
+def test_normalize_email_folds_gmail_aliases():
+    assert normalize_email(" John.Doe+event@GoogleMail.com ") == "johndoe@gmail.com"
+    assert normalize_email("john.doe+event@example.com") == "john.doe@example.com"
+
+
+def test_bounded_levenshtein_stops_at_the_limit():
+    assert bounded_levenshtein("john smith", "jahn smyth", 2) == 2
+    assert bounded_levenshtein("john smith", "jane smith", 2) == 3
+    assert bounded_levenshtein("john smith", "joan smyth", 1) == 2
+    assert bounded_levenshtein("ann", "ann", 0) == 0
+
+
+def test_names_two_edits_apart_are_grouped():
+    assert names_of(find_near_duplicates(rows_of(["John Smith", "Alice Wong", "Jahn Smyth"]))) == [["John Smith", "Jahn Smyth"]]
+
+
+def test_case_accents_and_punctuation_are_ignored():
+    assert names_of(find_near_duplicates(rows_of(["José O'Neil", "jose oneil", "Bob Stone"]))) == [["José O'Neil", "jose oneil"]]
+
+
+def test_aliases_of_one_inbox_are_grouped():
+    rows = rows_of(["Bob Stone", "Alice Wong"], {0: "bob.stone@gmail.com", 1: "BobStone+cert@gmail.com"})
+    assert names_of(find_near_duplicates(rows)) == [["Bob Stone", "Alice Wong"]]
+
+
+def test_a_chain_of_typos_is_not_one_group():
+    names = ["Ann Lee", "Ann Lea", "Anna Lea", "Anna Leo", "Dana Leo"]
+    groups = names_of(find_near_duplicates(rows_of(names)))
+
+    assert groups == [["Ann Lee", "Ann Lea", "Anna Lea", "Anna Leo"], ["Anna Leo", "Dana Leo"]]
+    for group in groups:
+        keys = [name.lower() for name in group]
+        assert all(bounded_levenshtein(first, second, 2) <= 2 for first in keys for second in keys)
+
+
+def test_distant_names_are_not_grouped():
+    assert find_near_duplicates(rows_of(["John Smith", "Jane Smythe", "Mary Jones"])) == []
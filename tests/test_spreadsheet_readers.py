@@ -0,0 +1,123 @@
+import zipfile
+
+from Utilities.spreadsheet_readers import iter_ods_rows, iter_spreadsheet_rows, iter_xlsx_rows
+
+
+WORKBOOK = """<?xml version="1.0" encoding="UTF-8"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+          xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+  <sheets><sheet name="Responses" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/responses.xml"/>
+</Relationships>"""
+
+SHARED_STRINGS = """<?xml version="1.0" encoding="UTF-8"?>
+<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+  <si><t>Full Name:</t></si>
+  <si><t>Email</t></si>
+  <si><t>Notes</t></si>
+  <si><r><t>John </t></r><r><t>Doe</t></r><rPh><t>ジョン</t></rPh></si>
+  <si><t>not projected</t></si>
+</sst>"""
+
+SHEET = """<?xml version="1.0" encoding="UTF-8"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+  <sheetData>
+    <row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c><c r="C1" t="s"><v>2</v></c><c r="D1" t="inlineStr"><is><t>Attendance</t></is></c></row>
+    <row r="2"><c r="A2" t="s"><v>3</v></c><c r="B2" t="inlineStr"><is><t>john@example.com</t></is></c><c r="C2" t="s"><v>4</v></c><c r="D2" t="b"><v>1</v></c></row>
+    <row r="3"/>
+    <row r="4"><c r="A4" t="inlineStr"><is><t>Jane Roe</t></is></c><c r="D4"><v>3.0</v></c></row>
+  </sheetData>
+</worksheet>"""
+
+CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+                         xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+                         xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0">
+  <office:body><office:spreadsheet>
+    <table:table table:name="Responses">
+      <table:table-row>
+        <table:table-cell><text:p>Full Name:</text:p></table:table-cell>
+        <table:table-cell><text:p>Email</text:p></table:table-cell>
+        <table:table-cell><text:p>Attendance</text:p></table:table-cell>
+        <table:table-cell table:number-columns-repeated="1020"/>
+      </table:table-row>
+      <table:table-row>
+        <table:table-cell><text:p>John <text:span>Doe</text:span></text:p></table:table-cell>
+        <table:table-cell><text:p>john@example.com</text:p></table:table-cell>
+        <table:table-cell office:value-type="boolean" office:boolean-value="true"><text:p>TRUE</text:p></table:table-cell>
+        <table:table-cell table:number-columns-repeated="1020"/>
+      </table:table-row>
+      <table:table-row table:number-rows-repeated="2">
+        <table:table-cell table:number-columns-repeated="2"><text:p>Same</text:p></table:table-cell>
+      </table:table-row>
+      <table:table-row table:number-rows-repeated="1048570">
+        <table:table-cell table:number-columns-repeated="1024"/>
+      </table:table-row>
+    </table:table>
+    <table:table table:name="Other">
+      <table:table-row><table:table-cell><text:p>Ignored</text:p></table:table-cell></table:table-row>
+    </table:table>
+  </office:spreadsheet></office:body>
+</office:document-content>"""
+
+
+def write_xlsx(path):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("xl/workbook.xml", WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+        archive.writestr("xl/sharedStrings.xml", SHARED_STRINGS)
+        archive.writestr("xl/worksheets/responses.xml", SHEET)
+    return str(path)
+
+
+def write_ods(path):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("mimetype", "application/vnd.oasis.opendocument.spreadsheet")
+        archive.writestr("content.xml", CONTENT)
+    return str(path)
+
+
+def test_xlsx_rows_resolve_shared_inline_and_typed_cells(tmp_path):
+    rows = list(iter_xlsx_rows(write_xlsx(tmp_path / "responses.xlsx")))
+
+    assert rows == [
+        {"Full Name": "John Doe", "Email": "john@example.com", "Notes": "not projected", "Attendance": "TRUE"},
+        {"Full Name": "Jane Roe", "Email": "", "Notes": "", "Attendance": "3"},
+    ]
+
+
+def test_xlsx_rows_keep_only_the_projected_columns(tmp_path):
+    rows = list(iter_xlsx_rows(write_xlsx(tmp_path / "responses.xlsx"), ["Full Name", "Attendance"]))
+
+    assert rows == [{"Full Name": "John Doe", "Attendance": "TRUE"}, {"Full Name": "Jane Roe", "Attendance": "3"}]
+
+
+def test_xlsx_without_projected_columns_has_no_rows(tmp_path):
+    assert list(iter_xlsx_rows(write_xlsx(tmp_path / "responses.xlsx"), ["Phone"])) == []
+
+
+def test_ods_rows_expand_repeats_and_skip_the_blank_area(tmp_path):
+    rows = list(iter_ods_rows(write_ods(tmp_path / "responses.ods")))
+
+    assert rows == [
+        {"Full Name": "John Doe", "Email": "john@example.com", "Attendance": "TRUE"},
+        {"Full Name": "Same", "Email": "Same", "Attendance": ""},
+        {"Full Name": "Same", "Email": "Same", "Attendance": ""},
+    ]
+
+
+def test_ods_rows_keep_only_the_projected_columns(tmp_path):
+    rows = list(iter_ods_rows(write_ods(tmp_path / "responses.ods"), ["Email"]))
+
+    assert rows == [{"Email": "john@example.com"}, {"Email": "Same"}, {"Email": "Same"}]
+
+
+def test_spreadsheet_rows_pick_the_reader_by_extension(tmp_path):
+    xlsx_rows = list(iter_spreadsheet_rows(write_xlsx(tmp_path / "responses.XLSX"), ["Email"]))
+    ods_rows = list(iter_spreadsheet_rows(write_ods(tmp_path / "responses.ods"), ["Email"]))
+
+    assert xlsx_rows[0] == ods_rows[0] == {"Email": "john@example.com"}